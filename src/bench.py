@@ -0,0 +1,144 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from workload import generate_workload
+from simulation import SCHEDULERS, FAST_SCHEDULERS
+
+# Scaling benchmark over synthetic workloads.  Every (scheduler, engine, size) case
+# runs in a fresh worker process so peak RSS belongs to that case alone, and cases
+# run one at a time so they don't compete for the CPU.  Results go to a JSON file;
+# --baseline compares them with an earlier file and exits non-zero on regressions.
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# metric -> +1 if higher is better, -1 if lower is better
+COMPARED_METRICS = {"jobs_per_sec": 1, "slices_per_sec": 1, "peak_rss_mb": -1}
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench_case(scheduler_name, size, engine="simpy", seed=42):
+    from simulation import simulate
+
+    start = time.perf_counter()
+    workload = generate_workload(size, seed=seed)
+    generate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scheduler, core_stats = simulate(scheduler_name, workload, engine=engine, batch_size=None,
+                                     detail="summary", verbose=False)
+    wall_time = time.perf_counter() - start
+
+    completed = scheduler.completed_jobs
+    slices = scheduler.execution_log.slices
+    return {
+        "scheduler": scheduler_name,
+        "engine": engine,
+        "size": size,
+        "jobs": completed.rows,
+        "slices": slices,
+        "wall_time": wall_time,
+        "generate_time": generate_time,
+        "jobs_per_sec": completed.rows / wall_time if wall_time > 0 else 0.0,
+        "slices_per_sec": slices / wall_time if wall_time > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "avg_waiting": completed.waiting_total / completed.rows if completed.rows else None,
+        "p99_waiting": scheduler.metrics.waiting.quantile(0.99) if completed.rows else None,
+    }
+
+
+def build_cases(schedulers=SCHEDULERS, sizes=SIZES, engines=("simpy",)):
+    return [(name, size, engine) for engine in engines for name in schedulers for size in sizes
+            if engine == "simpy" or name in FAST_SCHEDULERS]
+
+
+def run_bench(cases, seed=42):
+    results = []
+    for i, (name, size, engine) in enumerate(cases, 1):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(bench_case, name, size, engine, seed).result()
+        results.append(result)
+        print(f"[{i}/{len(cases)}] {name:<14} {engine:<5} {size:>9} jobs: {result['wall_time']:8.2f}s "
+              f"{result['jobs_per_sec']:10.0f} jobs/s {result['slices_per_sec']:10.0f} slices/s "
+              f"{result['peak_rss_mb']:8.1f} MB")
+    return results
+
+
+def case_key(result):
+    return result["scheduler"], result["engine"], result["size"]
+
+
+def compare(results, baseline, tolerance=0.2):
+    # A metric regresses when it is more than tolerance (relative) worse than the baseline.
+    base = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = base.get(case_key(result))
+        if old is None:
+            continue
+        for metric, direction in COMPARED_METRICS.items():
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if direction * change < -tolerance:
+                regressions.append({
+                    "scheduler": result["scheduler"], "engine": result["engine"], "size": result["size"],
+                    "metric": metric, "baseline": before, "current": after, "change": change,
+                })
+    return regressions
+
+
+def environment_info(seed):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "seed": seed,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schedulers on synthetic workloads.")
+    parser.add_argument("--schedulers", nargs="+", default=SCHEDULERS, choices=SCHEDULERS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--engines", nargs="+", default=["simpy"], choices=["simpy", "fast"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown / growth")
+    args = parser.parse_args(argv)
+
+    results = run_bench(build_cases(args.schedulers, args.sizes, args.engines), args.seed)
+    report = {"environment": environment_info(args.seed), "results": results}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        report["baseline"] = args.baseline
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['scheduler']} {r['engine']} {r['size']}: {r['metric']} "
+                  f"{r['baseline']:.1f} -> {r['current']:.1f} ({r['change'] * 100:+.1f}%)")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import sys
+import argparse
+from simulation import SCHEDULERS
+
+# Command-line entry point:
+#
+#   python cli.py ingest   build the memory-mapped trace cache for a Borg CSV
+#   python cli.py run      simulate one scheduler on the trace or a synthetic workload
+#   python cli.py sweep    parameter sweep over a process pool (sweep.py)
+#   python cli.py bench    scaling benchmark (bench.py)
+#   python cli.py replay   whole-trace replay (replay.py)
+#   python cli.py cluster  machine-partitioned parallel cluster replay (cluster.py)
+#   python cli.py tune     RoundRobin / AdaptiveRR parameter tuning (tune.py)
+#   python cli.py online   incremental simulation of a growing trace (online.py)
+#   python cli.py serve    launch the Streamlit dashboard
+#   python cli.py service  local HTTP/JSON simulation service (service.py)
+#
+# Every subcommand imports what it needs when it runs.  The scheduler names come
+# from simulation, so SimPy, NumPy and the schedulers are always loaded; pandas is
+# only pulled in for CSV ingest and --out.
+
+# subcommands that keep their own argument parsers
+DELEGATED = {"sweep": "sweep", "bench": "bench", "replay": "replay", "cluster": "cluster", "tune": "tune",
+             "online": "online", "service": "service"}
+
+
+def ingest(args):
+    from trace_cache import open_trace
+
+    store = open_trace(args.trace, args.cache_dir)
+    meta = store.meta
+    print(f"{args.trace}: {meta['rows']} rows, {meta['unique_jobs']} unique jobs, "
+          f"t={meta['start_time']}..{meta['end_time']}")
+    print(f"Cached at {store.path} (sha256 {meta['sha256'][:12]})")
+    return 0
+
+
+def run(args):
+    from simulation import simulate, print_summary, load_kaggle_trace, synthetic_workload
+
+    if args.synthetic is not None:
+        workload = synthetic_workload(args.synthetic, seed=args.seed)
+    else:
+        workload = load_kaggle_trace(args.scheduler, args.trace, args.start_time, args.end_time, stream=args.stream)
+
+    instruments = None
+    if args.progress is not None:
+        from scheduler.instrumentation import Instrumentation
+        instruments = Instrumentation(progress_interval=args.progress)
+
+    print(f"\n Running {args.scheduler} Simulation ({args.engine} engine, {args.cores} core(s), {args.queue} queue)...")
+    scheduler, core_stats = simulate(args.scheduler, workload, engine=args.engine, cores=args.cores,
+                                     queue=args.queue, balancing=args.balancing, time_quantum=args.time_quantum,
+                                     initial_time_quantum=args.initial_time_quantum,
+                                     batch_size=args.batch_size or None, detail=args.detail,
+                                     log_dir=args.log_dir, log_format=args.log_format, verbose=not args.quiet,
+                                     instruments=instruments, smoothing=args.smoothing,
+                                     min_quantum=args.min_quantum)
+    print_summary(scheduler, core_stats, instruments)
+
+    if args.out:
+        scheduler.execution_log.to_dataframe().to_csv(args.out, index=False)
+        print(f"Execution log written to {args.out}")
+    return 0
+
+
+def serve(args):
+    import os
+    import subprocess
+
+    dashboard = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.py")
+    return subprocess.call([sys.executable, "-m", "streamlit", "run", dashboard, "--server.port", str(args.port)])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="CPU scheduling simulator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("ingest", help="cache a Borg trace CSV for fast loading")
+    p.add_argument("--trace", default="borg_traces_data.csv")
+    p.add_argument("--cache-dir", default=None)
+    p.set_defaults(handler=ingest)
+
+    p = commands.add_parser("run", help="simulate one scheduler")
+    p.add_argument("scheduler", nargs="?", default="RoundRobin", choices=SCHEDULERS)
+    p.add_argument("--trace", default="borg_traces_data.csv")
+    p.add_argument("--synthetic", type=int, default=None, metavar="JOBS",
+                   help="run a seeded synthetic workload of this many jobs instead of the trace")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--start-time", type=float, default=None)
+    p.add_argument("--end-time", type=float, default=None)
+    p.add_argument("--stream", action="store_true",
+                   help="read the trace CSV in bounded memory instead of through the trace cache")
+    p.add_argument("--batch-size", type=int, default=25, help="jobs to simulate; 0 runs all of them")
+    p.add_argument("--engine", default="simpy", choices=["simpy", "fast"])
+    p.add_argument("--cores", type=int, default=1)
+    p.add_argument("--queue", default="global", choices=["global", "per_core"])
+    p.add_argument("--balancing", default="steal", choices=["steal", "rebalance", "none"])
+    p.add_argument("--time-quantum", type=float, default=3)
+    p.add_argument("--initial-time-quantum", type=float, default=2)
+    p.add_argument("--smoothing", type=float, default=0.6, help="AdaptiveRR: weight of the previous quantum")
+    p.add_argument("--min-quantum", type=float, default=5, help="AdaptiveRR: smallest quantum")
+    p.add_argument("--detail", default="full", choices=["full", "summary", "sampled", "metrics"])
+    p.add_argument("--log-dir", default=None, help="stream the logs to partitioned files here")
+    p.add_argument("--log-format", default=None, choices=["parquet", "arrow", "npy"])
+    p.add_argument("--out", default=None, help="write the execution log to this CSV")
+    p.add_argument("--quiet", action="store_true", help="no per-job output")
+    p.add_argument("--progress", type=float, default=None, metavar="SECONDS",
+                   help="instrument the run and print progress every SECONDS")
+    p.set_defaults(handler=run)
+
+    for name, module in DELEGATED.items():
+        commands.add_parser(name, add_help=False, help=f"see `cli.py {name} --help` ({module}.py)")
+
+    p = commands.add_parser("serve", help="launch the Streamlit dashboard")
+    p.add_argument("--port", type=int, default=8501)
+    p.set_defaults(handler=serve)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        module = __import__(DELEGATED[argv[0]])
+        result = module.main(argv[1:])
+        return result if isinstance(result, int) else 0
+
+    args = build_parser().parse_args(argv)
+    if getattr(args, "balancing", None) == "none":
+        args.balancing = None
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import os
+import csv
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from sweep import SharedWorkload, attach_workload
+from trace_stream import RECORD_DTYPE
+from scheduler.metrics import RunMetrics
+from simulation import SCHEDULERS
+
+# Machine-partitioned cluster replay.  load_kaggle_trace feeds every SCHEDULE event
+# to one simulated CPU; here the workload is split into partitions that are simulated
+# independently, one per pool task, and merged into cluster-wide figures:
+#
+#   by="machine"  one partition per machine_id in the trace (rows without a machine
+#                 are spread over the machines by a hash of collection_id)
+#   by="hash"     `partitions` partitions by a hash of collection_id, for traces (or
+#                 synthetic workloads) without machines
+#   by="auto"     machine when the trace has machine ids, else hash
+#
+# Each partition keeps its arrival times relative to the whole workload's first
+# arrival (process_generator's last_completion_time), so the partitions' RunMetrics
+# share one timeline and merge with shard=True: sketches add up exactly, the cores of
+# all machines count towards utilization.  The workload sits in shared memory once,
+# sorted by partition; workers copy out only the rows of the partition they run, and
+# partitions are handed out largest first so the last ones to finish are small.
+# With log_dir every partition streams its logs to <log_dir>/partition=<id>/ (see
+# log_writer.py) and read_cluster_log reads them back as one table.
+
+PARTITION_FIELDS = ["partition", "jobs", "start_time", "end_time", "makespan", "avg_turnaround", "avg_waiting",
+                    "p95_waiting", "p99_waiting", "max_waiting", "slices", "utilization", "wall_time"]
+
+_worker_records = None
+_worker_block = None
+
+
+def hash_partition(collection_ids, partitions):
+    # Fibonacci hashing of the ids onto 0..partitions-1, stable across runs
+    ids = np.asarray(collection_ids).astype(np.uint64)
+    return ((ids * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)) % np.uint64(partitions)
+
+
+def partition_keys(collection_ids, machine_ids=None, by="auto", partitions=8):
+    # One partition id per row.
+    if by not in ("auto", "machine", "hash"):
+        raise ValueError("by must be 'auto', 'machine' or 'hash'")
+    has_machines = machine_ids is not None and bool((np.asarray(machine_ids) >= 0).any())
+    if by == "machine" and not has_machines:
+        raise ValueError("The workload has no machine ids; partition with by='hash'")
+    if by == "hash" or not has_machines:
+        return hash_partition(collection_ids, partitions).astype(np.int64)
+
+    machine_ids = np.asarray(machine_ids, dtype=np.int64)
+    missing = machine_ids < 0
+    if not missing.any():
+        return machine_ids
+    machines = np.unique(machine_ids[~missing])
+    keys = machine_ids.copy()
+    keys[missing] = machines[hash_partition(np.asarray(collection_ids)[missing], len(machines)).astype(np.int64)]
+    return keys
+
+
+def trace_records(scheduler_name, file_path="borg_traces_data.csv", start_time=None, end_time=None,
+                  cache_dir=None):
+    # (records, machine ids) for a trace window; records hold the same values as
+    # load_kaggle_trace's tuples
+    from trace_cache import open_trace, burst_percentile
+
+    store = open_trace(file_path, cache_dir)
+    percentile = burst_percentile(scheduler_name)
+    lo, hi, bursts = store.burst_times([percentile], start_time, end_time)
+
+    records = np.empty(hi - lo, dtype=RECORD_DTYPE)
+    records["time"] = np.round(store.time[lo:hi], 6)
+    records["collection_id"] = store.collection_id[lo:hi]
+    records["priority"] = store.priority[lo:hi]
+    records["burst_time"] = bursts[percentile]
+    return records, np.asarray(store.machine_id[lo:hi])
+
+
+def split(records, keys):
+    # records regrouped by partition (time order kept within each) and
+    # [(partition, start, stop)] row ranges, largest partition first
+    order = np.argsort(keys, kind="stable")
+    grouped = records[order]
+    partitions, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    ranges = [(int(p), int(s), int(s + c)) for p, s, c in zip(partitions, starts, counts)]
+    ranges.sort(key=lambda r: r[1] - r[2])
+    return grouped, ranges
+
+
+def _init_worker(spec):
+    global _worker_records, _worker_block
+    _worker_block, _worker_records = attach_workload(spec)
+
+
+def simulate_partition(scheduler_name, partition, start, stop, origin, log_dir=None, records=None, **params):
+    from simulation import simulate
+
+    records = _worker_records if records is None else records
+    workload = records[start:stop].tolist()
+    # keep the partition's place on the cluster's timeline
+    offset = workload[0][0] - origin
+    partition_log_dir = os.path.join(log_dir, f"partition={partition}") if log_dir else None
+
+    started = time.perf_counter()
+    scheduler, core_stats = simulate(scheduler_name, workload, batch_size=None,
+                                     detail="full" if log_dir else "metrics", log_dir=partition_log_dir,
+                                     verbose=False, last_completion_time=offset, **params)
+    metrics = scheduler.metrics
+    summary = metrics.summary()
+    end_time = metrics.last_completion if metrics.jobs else offset
+    makespan = end_time - offset
+    busy = sum(stats["busy_time"] for stats in core_stats)
+
+    return {
+        "partition": partition,
+        "jobs": metrics.jobs,
+        "start_time": offset,
+        "end_time": end_time,
+        "makespan": makespan,
+        "avg_turnaround": summary["avg_turnaround"],
+        "avg_waiting": summary["avg_waiting"],
+        "p95_waiting": summary["p95_waiting"],
+        "p99_waiting": summary["p99_waiting"],
+        "max_waiting": summary["max_waiting"],
+        "slices": scheduler.execution_log.slices,
+        "utilization": busy / (len(core_stats) * makespan) if makespan > 0 and core_stats else 0.0,
+        "wall_time": time.perf_counter() - started,
+        "metrics": metrics,
+    }
+
+
+def cluster_replay(scheduler_name, records, keys, processes=1, log_dir=None, **params):
+    # Yields one summary per partition as it finishes.
+    if not len(records):
+        return
+    grouped, ranges = split(records, keys)
+    origin = float(records["time"].min())
+
+    if processes <= 1:
+        for partition, start, stop in ranges:
+            yield simulate_partition(scheduler_name, partition, start, stop, origin, log_dir, grouped, **params)
+        return
+
+    block = SharedWorkload(grouped)
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(block.spec,)) as pool:
+            futures = [pool.submit(simulate_partition, scheduler_name, partition, start, stop, origin, log_dir,
+                                   **params)
+                       for partition, start, stop in ranges]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        block.close()
+
+
+class ClusterTotals:
+    # Cluster-wide figures merged from partition summaries.
+    def __init__(self):
+        self.partitions = 0
+        self.slices = 0
+        self.wall_time = 0.0
+        self.metrics = None
+
+    def add(self, summary):
+        self.partitions += 1
+        self.slices += summary["slices"]
+        self.wall_time += summary["wall_time"]
+        metrics = summary["metrics"]
+        if self.metrics is None:
+            self.metrics = RunMetrics(0)
+        self.metrics.merge(metrics, shard=True)
+
+    def result(self):
+        merged = self.metrics.summary() if self.metrics is not None else {}
+        return {
+            "partitions": self.partitions,
+            "cores": self.metrics.cores if self.metrics is not None else 0,
+            **merged,
+            "slices": self.slices,
+            "partition_time": self.wall_time,
+        }
+
+
+def read_cluster_log(log_dir, table="slices", scheduler_name=None):
+    # Every partition's log as one table, with the partition as a column.
+    import pandas as pd
+    from log_writer import read_log
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "partition=*"))):
+        frame = read_log(path, table, scheduler_name)
+        frame.insert(0, "partition", int(os.path.basename(path).split("=", 1)[1]))
+        frames.append(frame)
+    if not frames:
+        frame = read_log(log_dir, table, scheduler_name)
+        frame.insert(0, "partition", pd.Series(dtype=np.int64))
+        return frame
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a cluster trace partitioned by machine, in parallel.")
+    parser.add_argument("--scheduler", default="RoundRobin", choices=SCHEDULERS)
+    parser.add_argument("--trace", default="borg_traces_data.csv")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="JOBS",
+                        help="replay a synthetic workload of this many jobs instead of the trace (hash partitions)")
+    parser.add_argument("--start-time", type=float, default=None)
+    parser.add_argument("--end-time", type=float, default=None)
+    parser.add_argument("--by", default="auto", choices=["auto", "machine", "hash"])
+    parser.add_argument("--partitions", type=int, default=None, help="hash partitions; default 4 per process")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--engine", default="simpy", choices=["simpy", "fast"])
+    parser.add_argument("--cores", type=int, default=1, help="cores per machine")
+    parser.add_argument("--log-dir", default=None, help="stream every partition's logs under this directory")
+    parser.add_argument("--out", default="cluster_partitions.csv")
+    args = parser.parse_args(argv)
+
+    if args.synthetic is not None:
+        from workload import generate_workload
+        records = np.array(generate_workload(args.synthetic), dtype=RECORD_DTYPE)
+        machine_ids = None
+    else:
+        records, machine_ids = trace_records(args.scheduler, args.trace, args.start_time, args.end_time)
+    keys = partition_keys(records["collection_id"], machine_ids, args.by, args.partitions or 4 * args.processes)
+
+    started = time.perf_counter()
+    totals = ClusterTotals()
+    with open(args.out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PARTITION_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for summary in cluster_replay(args.scheduler, records, keys, args.processes, args.log_dir,
+                                      engine=args.engine, cores=args.cores):
+            writer.writerow(summary)
+            totals.add(summary)
+    result = totals.result()
+    wall_time = time.perf_counter() - started
+
+    print(f"\nReplayed {result.get('jobs', 0)} jobs on {result['partitions']} partitions "
+          f"({result['cores']} cores) with {args.scheduler}")
+    if result.get("jobs"):
+        print(f"   - Avg Turnaround Time: {result['avg_turnaround']:.2f} sec")
+        print(f"   - Avg Waiting Time: {result['avg_waiting']:.2f} sec")
+        print(f"   - Waiting Time p50/p95/p99: {result['p50_waiting']:.2f} / {result['p95_waiting']:.2f} / "
+              f"{result['p99_waiting']:.2f} sec")
+        print(f"   - Slowdown: {result['avg_slowdown']:.2f} avg | Jain Fairness: {result['fairness']:.3f}")
+        print(f"   - Makespan: {result['makespan']:.2f} sec | Utilization: {result['utilization'] * 100:.1f}%")
+    print(f"   - Wall Time: {wall_time:.2f}s for {result['partition_time']:.2f}s of partition runs "
+          f"({args.processes} process(es))")
+    print(f"Partition summaries written to {args.out}")
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -1,149 +1,247 @@
+import os
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import simpy
-from scheduler.fcfs import FCFSScheduler
-from scheduler.sjf import SJFScheduler
-from scheduler.round_robin import RoundRobinScheduler
-from scheduler.adaptive_rr import AdaptiveRoundRobinScheduler
-from simulation import load_kaggle_trace, process_generator
-
-def get_scheduler(scheduler_name, env, cpu):
-    if scheduler_name == "FCFS":
-        return FCFSScheduler(env, cpu)
-    elif scheduler_name == "SJF":
-        return SJFScheduler(env, cpu)
-    elif scheduler_name == "RoundRobin":
-        return RoundRobinScheduler(env, cpu, time_quantum=3)
-    elif scheduler_name == "AdaptiveRR":
-        return AdaptiveRoundRobinScheduler(env, cpu, initial_time_quantum=2)
+from dashboard_worker import ingest_trace, run_dashboard_job, run_replay_job, result_metrics
+from gantt import slice_bounds, level_of_detail, gantt_figure
+from simulation import SCHEDULERS
+
+TRACE = "borg_traces_data.csv"
+MAX_CACHED_RUNS = 32
+MAX_DETAIL_ROWS = 10_000
+POLL_INTERVAL = 0.5  # seconds between progress redraws while runs are going
+
+# Runs and replays go to a process pool that outlives Streamlit's reruns and is shared
+# by every session.  Each run is keyed by (trace hash, scheduler, parameters) and its
+# future is kept, so repeating a run, or clicking again while it is still going, reuses
+# it.  The trace is hashed (and ingested into the trace cache the first time) on the
+# pool as well, once something needs it, and that waits until the hash is known.  The
+# script never waits on a future: while any are going, a fragment redraws their
+# progress every POLL_INTERVAL and reruns the page once they are all done, so the
+# sidebar and the other buttons stay usable during long runs.
+
+
+@st.cache_resource
+def worker_pool():
+    # spawn: forking the multi-threaded Streamlit server is not safe
+    return ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+@st.cache_resource
+def run_cache():
+    return OrderedDict()
+
+
+@st.cache_resource
+def progress_board():
+    # run key -> fraction of jobs done, written by the workers
+    return multiprocessing.get_context("spawn").Manager().dict()
+
+
+def submit(key, fn, *args):
+    runs = run_cache()
+    future = runs.get(key)
+    if future is None or (future.done() and future.exception() is not None):
+        future = worker_pool().submit(fn, *args, progress_board(), key)
+        runs[key] = future
+        while len(runs) > MAX_CACHED_RUNS:
+            runs.popitem(last=False)
     else:
-        raise ValueError("Invalid scheduler selected!")
+        runs.move_to_end(key)
+    return key, future
+
+
+def trace_digest():
+    # The trace's hash, or None and a progress bar while it is still being worked
+    # out.  Keyed by the file's size and mtime, so an updated trace is ingested again.
+    stat = os.stat(TRACE)
+    key, future = submit(("trace", TRACE, stat.st_size, stat.st_mtime_ns), ingest_trace, TRACE)
+    if not future.done():
+        wait_for({"Loading trace": (key, future)})
+        return None
+    return future.result()
+
+
+def submit_run(digest, scheduler_name, params):
+    key = (digest, scheduler_name, tuple(sorted(params.items())))
+    return submit(key, run_dashboard_job, TRACE, digest, scheduler_name, params)
+
+
+def submit_replay(digest, scheduler_name, window_jobs, processes, params):
+    key = ("replay", digest, scheduler_name, window_jobs, processes, tuple(sorted(params.items())))
+    return submit(key, run_replay_job, TRACE, digest, scheduler_name, window_jobs, processes, params)
+
+
+def run_progress(key, future):
+    return 1.0 if future.done() else progress_board().get(key, 0.0)
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def wait_for(runs, partial=None):
+    # runs: label -> (key, future).  Only this fragment reruns on the timer; once
+    # every future is done the whole page reruns and shows the results.
+    if all(future.done() for _, future in runs.values()):
+        st.rerun()
+    for label, (key, future) in runs.items():
+        st.progress(run_progress(key, future), text=f"{label} {'done' if future.done() else 'running...'}")
+    if partial is not None:
+        partial({label: future.result() for label, (_, future) in runs.items() if future.done()})
+
+
+def comparison_table(results):
+    rows = [result_metrics(result) for result in results.values() if result is not None]
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    return rows
+
+
+def gantt_window(t_min, t_max):
+    # The time range the Gantt chart is queried for: the slider, or a box selected
+    # on the chart, which moves the slider.  Both rerun the script, so a narrower
+    # window is re-aggregated at full detail for that range.
+    if t_max <= t_min:
+        return t_min, t_max
+    event = st.session_state.get("gantt")
+    boxes = event["selection"]["box"] if event else []
+    if boxes and boxes[0].get("x"):
+        box = tuple(sorted(boxes[0]["x"]))
+        if box != st.session_state.get("gantt_box"):
+            st.session_state["gantt_box"] = box
+            st.session_state["gantt_window"] = (max(t_min, box[0]), min(t_max, box[1]))
+    if st.button("Reset Zoom") or "gantt_window" not in st.session_state:
+        st.session_state["gantt_window"] = (t_min, t_max)
+    lo, hi = st.session_state["gantt_window"]
+    st.session_state["gantt_window"] = (min(max(t_min, lo), t_max), max(min(t_max, hi), t_min))
+    return st.slider("Time Window", min_value=t_min, max_value=t_max, key="gantt_window")
 
-st.title("CPU Scheduling Simulation Dashboard")
-
-scheduler_name = st.sidebar.selectbox(
-    "Choose Scheduler",
-    ["FCFS", "SJF", "RoundRobin", "AdaptiveRR"]
-)
-
-if st.button("Run Simulation"):
-    workload = load_kaggle_trace(scheduler_name, "borg_traces_data.csv")
 
-    workload.sort(key=lambda x: x[0])
-
-    workload = [job for job in workload if job[0] > 0]
-
-    env = simpy.Environment()
-    cpu = simpy.Resource(env, capacity=1)
-    scheduler = get_scheduler(scheduler_name, env, cpu)
+st.title("CPU Scheduling Simulation Dashboard")
 
-    seen_jobs = set()
-    batch = []
-    batch_size = 25
-    last_completion_time = 0
+scheduler_name = st.sidebar.selectbox("Choose Scheduler", SCHEDULERS)
+cores = st.sidebar.number_input("CPU Cores", min_value=1, max_value=128, value=1)
+queue_mode = st.sidebar.selectbox("Run Queue", ["global", "per_core"])
+balancing = st.sidebar.selectbox("Load Balancing", ["steal", "rebalance", None],
+                                 disabled=queue_mode == "global")
+window_jobs = st.sidebar.number_input("Replay Window (jobs)", min_value=1, value=25)
+replay_workers = st.sidebar.number_input("Replay Workers", min_value=1, max_value=64, value=1)
+compared = st.sidebar.multiselect("Compare Schedulers", SCHEDULERS, default=SCHEDULERS)
+gantt_lanes = st.sidebar.number_input("Gantt Lanes (top jobs)", min_value=1, max_value=200, value=30)
 
-    for job in workload:
-        arrival_time, job_id, priority, burst_time = job
-        if job_id not in seen_jobs:
-            seen_jobs.add(job_id)
-            batch.append(job)
-            if len(batch) >= batch_size:
-                break
+params = {"cores": int(cores), "queue": queue_mode, "balancing": balancing, "batch_size": 25,
+          "time_quantum": 3, "initial_time_quantum": 2}
 
-    if not batch:
+if st.button("Run Simulation"):
+    # the run stays on screen across reruns, so the Gantt chart can be re-queried
+    st.session_state["run"] = (scheduler_name, params)
+    st.session_state.pop("gantt_window", None)
+
+digest = trace_digest() if "run" in st.session_state else None
+if digest is not None:
+    run_name, run_params = st.session_state["run"]
+    key, future = submit_run(digest, run_name, run_params)
+    result = future.result() if future.done() else None
+
+    if not future.done():
+        wait_for({run_name: (key, future)})
+    elif result is None:
         st.error("No jobs found after filtering duplicates and zero arrival times.")
     else:
-        print("Batch workload:", batch)
-        env.process(process_generator(env, cpu, scheduler, scheduler_name, batch, last_completion_time))
-        env.run()
-
-        if scheduler_name == "AdaptiveRR":
-            execution_df = pd.DataFrame(scheduler.execution_log)
-            execution_df.to_csv("adaptive_rr_execution.csv", index=False)
-            print("Execution log saved as adaptive_rr_execution.csv. Upload it here.")
-
-            if execution_df.empty:
-                st.error("No execution log data available for Adaptive RR.")
-            else:
-                execution_df['Start'] = pd.to_numeric(execution_df['Start'], errors='coerce')
-                execution_df['Finish'] = pd.to_numeric(execution_df['Finish'], errors='coerce')
-                execution_df['Time Slice'] = execution_df['Finish'] - execution_df['Start']
-                execution_df['Remaining Time'] = pd.to_numeric(execution_df['Remaining Time'], errors='coerce')
-                execution_df['Quantum Used'] = pd.to_numeric(execution_df['Quantum Used'], errors='coerce')
-                execution_df["width"] = execution_df["Time Slice"]
-
-                fig = px.bar(
-                    execution_df,
-                    x="width",
-                    y="Job",
-                    orientation='h',
-                    color="Quantum Used", 
-                    base="Start",
-                    hover_data=["Time Slice", "Remaining Time", "Quantum Used"],  
-                    title=f"{scheduler_name} Scheduling Gantt Chart",
-                    labels={'width': 'Time Slice (Duration)', 'Start': 'Start Time', 'Job': 'Job'}
-                )
-
-        elif scheduler_name == "RoundRobin":
-            execution_df = pd.DataFrame(scheduler.execution_log)
-
-            if execution_df.empty:
-                st.error("No execution log data available for Round Robin.")
-            else:
-                execution_df['Start'] = pd.to_numeric(execution_df['Start'], errors='coerce')
-                execution_df['Finish'] = pd.to_numeric(execution_df['Finish'], errors='coerce')
-                execution_df['Time Slice'] = execution_df['Finish'] - execution_df['Start']
-                execution_df['Remaining Time'] = pd.to_numeric(execution_df['Remaining Time'], errors='coerce')
-                execution_df['Completed'] = execution_df['Remaining Time'] <= 0  
-                execution_df["width"] = execution_df["Time Slice"]  
-
-                fig = px.bar(
-                    execution_df,
-                    x="width",  
-                    y="Job",
-                    orientation='h',
-                    color="Job",
-                    base="Start",  
-                    hover_data=["Time Slice", "Remaining Time", "Completed"],
-                    title=f"{scheduler_name} Scheduling Gantt Chart",
-                    labels={'width': 'Time Slice (Duration)', 'Start': 'Start Time', 'Job': 'Job'}
-                )
-        
+        jobs_df = result["jobs"]
+        slices_df = result["slices"]
+
+        if slices_df.empty:
+            st.error(f"No execution log data available for {run_name}.")
+            window = (None, None)
         else:
-            execution_df = pd.DataFrame(scheduler.completed_jobs)
-
-            if execution_df.empty:
-                st.error("No data was collected from the simulation.")
-            else:
-                execution_df['start_time'] = pd.to_numeric(execution_df['start_time'], errors='coerce')
-                execution_df['completion_time'] = pd.to_numeric(execution_df['completion_time'], errors='coerce')
-                execution_df["duration"] = execution_df["completion_time"] - execution_df["start_time"]
-
-                fig = px.bar(
-                    execution_df,
-                    x="duration",
-                    y="name",
-                    orientation='h',
-                    color="name",
-                    base="start_time",
-                    title=f"{scheduler_name} Scheduling Gantt Chart",
-                    labels={'duration': 'Completion Time', 'start_time': 'Start Time', 'name': 'Job'}
-                )
-
-        fig.update_layout(
-            xaxis_title="Time (seconds)",
-            yaxis_title="Job",
-            height=600
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        avg_turnaround = execution_df["turnaround_time"].mean()
-        avg_waiting = execution_df["waiting_time"].mean()
+            window = gantt_window(*slice_bounds(slices_df))
+            # ARR and MLFQ bars are coloured by the quantum they ran with, the others by job
+            value = "Quantum Used" if run_name in ("AdaptiveRR", "MLFQ") else None
+            gantt_bars, lanes = level_of_detail(slices_df, *window, top_n=int(gantt_lanes), value=value)
+            fig = gantt_figure(gantt_bars, lanes, f"{run_name} Scheduling Gantt Chart", value)
+            st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="box", key="gantt")
+            st.caption(f"{int(gantt_bars['slices'].sum())} slices in the window, drawn as {len(gantt_bars)} bars. "
+                       "Box-select a range to zoom in.")
+
+        avg_turnaround = jobs_df["turnaround_time"].mean()
+        avg_waiting = jobs_df["waiting_time"].mean()
 
         col1, col2 = st.columns(2)
         col1.metric("Average Turnaround Time (sec)", f"{avg_turnaround:.2f}")
         col2.metric("Average Waiting Time (sec)", f"{avg_waiting:.2f}")
 
+        metrics = result["metrics"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("p50 / p95 / p99 Waiting (sec)",
+                    f"{metrics['p50_waiting']:.1f} / {metrics['p95_waiting']:.1f} / {metrics['p99_waiting']:.1f}")
+        col2.metric("Average Slowdown", f"{metrics['avg_slowdown']:.2f}")
+        col3.metric("Jain Fairness", f"{metrics['fairness']:.3f}")
+        col4.metric("Throughput (jobs/sec)", f"{metrics['throughput']:.3f}")
+
+        st.subheader("Throughput and Utilization over Time")
+        st.line_chart(result["timeline"].set_index("time")[["throughput", "utilization"]])
+
+        st.subheader("Per-Core Utilization")
+        st.dataframe(pd.DataFrame(result["core_stats"]), use_container_width=True)
+
+        st.subheader("Run Statistics")
+        st.dataframe(pd.DataFrame([result["stats"]]), use_container_width=True)
+
         st.subheader("Detailed Simulation Data")
-        st.dataframe(execution_df, use_container_width=True)
+        if run_name in ("FCFS", "SJF"):
+            st.dataframe(jobs_df, use_container_width=True)
+        else:
+            t0, t1 = window
+            shown = slices_df if t0 is None else slices_df[(slices_df["Finish"] >= t0) & (slices_df["Start"] <= t1)]
+            st.dataframe(shown.head(MAX_DETAIL_ROWS), use_container_width=True)
+
+if st.button("Compare Schedulers"):
+    st.session_state["compare"] = (list(compared), params)
+
+digest = trace_digest() if "compare" in st.session_state else None
+if digest is not None:
+    # every selected scheduler runs at once; the table grows as each one finishes
+    compare_names, compare_params = st.session_state["compare"]
+    runs = {name: submit_run(digest, name, compare_params) for name in compare_names}
+    if not all(future.done() for _, future in runs.values()):
+        wait_for(runs, comparison_table)
+    else:
+        for name, (_, future) in runs.items():
+            if future.result() is None:
+                st.warning(f"{name}: no jobs in the batch")
+        rows = comparison_table({name: future.result() for name, (_, future) in runs.items()})
+        if rows:
+            comparison_df = pd.DataFrame(rows).set_index("scheduler")
+            st.subheader("Average Times per Scheduler")
+            st.bar_chart(comparison_df[["avg_waiting", "avg_turnaround"]])
+
+if st.button("Replay Full Trace"):
+    st.session_state["replay"] = (scheduler_name, int(window_jobs), int(replay_workers),
+                                  {"cores": int(cores), "queue": queue_mode, "balancing": balancing})
+
+digest = trace_digest() if "replay" in st.session_state else None
+if digest is not None:
+    # every job in the trace, as a chain of window_jobs-sized windows (see replay.py)
+    replay_name, replay_window, replay_processes, replay_params = st.session_state["replay"]
+    key, future = submit_replay(digest, replay_name, replay_window, replay_processes, replay_params)
+    if not future.done():
+        wait_for({f"Replaying {replay_name}": (key, future)})
+    else:
+        replayed = future.result()
+        result = replayed["result"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jobs Replayed", f"{result['jobs']}")
+        col2.metric("Average Turnaround Time (sec)", f"{result['avg_turnaround']:.2f}")
+        col3.metric("Average Waiting Time (sec)", f"{result['avg_waiting']:.2f}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("p95 / p99 Waiting (sec)", f"{result['p95_waiting']:.1f} / {result['p99_waiting']:.1f}")
+        col2.metric("Average Slowdown", f"{result['avg_slowdown']:.2f}")
+        col3.metric("Jain Fairness", f"{result['fairness']:.3f}")
+
+        windows_df = pd.DataFrame(replayed["windows"])
+        st.subheader("Average Waiting Time per Window")
+        st.line_chart(windows_df.set_index("window")[["avg_waiting", "avg_turnaround"]])
+        st.subheader("Window Summaries")
+        st.dataframe(windows_df, use_container_width=True)
@@ -0,0 +1,125 @@
+import functools
+import simpy
+from scheduler.multicore import MultiCoreCPU
+from scheduler.instrumentation import Instrumentation
+from simulation import create_scheduler, process_generator
+from log_writer import LogWriter, read_log
+from replay import replay, iter_trace, ReplayTotals
+from trace_cache import open_trace
+
+# The dashboard's simulation and replay runs, executed in its background process pool.  They
+# live in an importable module (not dashboard.py, which Streamlit runs as a script)
+# so worker processes can unpickle them.  Everything is keyed by the trace's content
+# hash, so a cached batch or result stays valid until the CSV itself changes.
+
+LOG_DIR = "execution_logs"
+
+
+def trace_hash(file_path="borg_traces_data.csv"):
+    # the sha256 the trace cache already stores; cheap once the trace is ingested
+    return open_trace(file_path).meta["sha256"]
+
+
+def ingest_trace(file_path, progress=None, key=None):
+    # trace_hash as a pool job: the first call ingests the trace, which takes a while
+    return trace_hash(file_path)
+
+
+@functools.lru_cache(maxsize=32)
+def dashboard_batch(file_path, digest, scheduler_name, batch_size=25):
+    # The first batch_size distinct jobs arriving after time 0.  digest is only part
+    # of the cache key: the trace cache hands out time-sorted rows, so the scan stops
+    # as soon as the batch is full instead of building the whole workload.
+    seen_jobs = set()
+    batch = []
+    for job in iter_trace(scheduler_name, file_path, block_rows=4096):
+        arrival_time, job_id, priority, burst_time = job
+        if arrival_time > 0 and job_id not in seen_jobs:
+            seen_jobs.add(job_id)
+            batch.append(job)
+            if len(batch) >= batch_size:
+                break
+    return tuple(batch)
+
+
+def run_dashboard_job(file_path, digest, scheduler_name, params, progress=None, key=None):
+    # One "Run Simulation" run.  progress, if given, is a shared dict (a
+    # multiprocessing.Manager proxy) where progress[key] goes from 0 to 1.
+    batch = dashboard_batch(file_path, digest, scheduler_name, params.get("batch_size", 25))
+    if not batch:
+        return None
+
+    env = simpy.Environment()
+    cpu = MultiCoreCPU(env, cores=params["cores"], queue=params["queue"], balancing=params["balancing"])
+    scheduler = create_scheduler(scheduler_name, env, cpu, params["time_quantum"], params["initial_time_quantum"],
+                                 verbose=False)
+
+    callback = None
+    if progress is not None:
+        progress[key] = 0.0
+
+        def callback(stats):
+            progress[key] = min(1.0, stats["completed_jobs"] / len(batch))
+
+    instruments = Instrumentation(progress_interval=0.25 if callback else None, callback=callback)
+    instruments.attach(env, scheduler)
+    env.process(process_generator(env, cpu, scheduler, scheduler_name, batch, 0, verbose=False))
+    # the logs stream to execution_logs/ while the run goes, in the schema every scheduler shares
+    with LogWriter(LOG_DIR, scheduler_name).attach(scheduler) as writer:
+        instruments.run()
+
+    return {
+        "scheduler": scheduler_name,
+        "params": params,
+        "run_id": writer.run_id,
+        "jobs": read_log(LOG_DIR, "jobs", scheduler_name, writer.run_id),
+        "slices": read_log(LOG_DIR, "slices", scheduler_name, writer.run_id),
+        "core_stats": cpu.core_stats(),
+        "stats": instruments.snapshot(),
+        "metrics": scheduler.metrics.summary(),
+        "timeline": scheduler.metrics.timeline(),
+    }
+
+
+def run_replay_job(file_path, digest, scheduler_name, window_jobs, processes, params, progress=None, key=None):
+    # One "Replay Full Trace" run: every job in the trace, as a chain of
+    # window_jobs-sized windows (see replay.py).  progress[key] is the fraction of
+    # windows done.
+    total_windows = -(-len(open_trace(file_path)) // window_jobs)
+    if progress is not None:
+        progress[key] = 0.0
+    totals = ReplayTotals()
+    windows = []
+    for summary in replay(scheduler_name, iter_trace(scheduler_name, file_path), window_jobs, processes,
+                          cores=params["cores"], queue=params["queue"], balancing=params["balancing"]):
+        totals.add(summary)
+        # the merged metrics live in totals; don't keep one RunMetrics per window
+        windows.append({name: value for name, value in summary.items() if name != "metrics"})
+        if progress is not None and (totals.windows % 20 == 0 or totals.windows == total_windows):
+            progress[key] = min(1.0, totals.windows / max(1, total_windows))
+    return {"result": totals.result(), "windows": windows}
+
+
+def result_metrics(result):
+    # One row of the comparison table.
+    jobs = result["jobs"]
+    stats = result["stats"]
+    metrics = result["metrics"]
+    core_stats = result["core_stats"]
+    makespan = float(jobs["completion_time"].max()) if len(jobs) else 0.0
+    return {
+        "scheduler": result["scheduler"],
+        "jobs": len(jobs),
+        "avg_turnaround": jobs["turnaround_time"].mean(),
+        "avg_waiting": jobs["waiting_time"].mean(),
+        "p95_waiting": metrics["p95_waiting"],
+        "p99_waiting": metrics["p99_waiting"],
+        "max_waiting": jobs["waiting_time"].max(),
+        "avg_slowdown": metrics["avg_slowdown"],
+        "fairness": metrics["fairness"],
+        "makespan": makespan,
+        "utilization": sum(s["utilization"] for s in core_stats) / len(core_stats) if core_stats else 0.0,
+        "context_switches": stats["context_switches"],
+        "preemptions": stats["preemptions"],
+        "wall_time": stats["wall_time"],
+    }
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+# Level-of-detail Gantt charts for big execution logs.  Instead of one bar per slice,
+# the slices inside the visible time window are cut down to at most about
+# `pixels` bars per lane before anything is sent to the browser:
+#
+#   lanes    the top_n jobs by busy time in the window get a lane each, every other
+#            job shares an "other" lane
+#   binning  slice ends are rounded out to a grid of (t1 - t0) / pixels, so slices
+#            shorter than a pixel still show up as one pixel
+#   merging  overlapping or touching bars in a lane become one bar that carries the
+#            number of slices and busy time it covers
+#
+# When the window holds at most exact_rows slices nothing is rounded, and only
+# slices that touch are merged.  The figure uses Scattergl lines, one trace per
+# lane or colour bucket, so it is drawn with WebGL.  Zooming in is a new query with
+# a narrower window (see the dashboard's time window and box selection).
+
+OTHER_LANE = "other"
+
+
+def slice_bounds(df, start="Start", finish="Finish"):
+    starts = df[start].to_numpy(dtype=np.float64)
+    finishes = df[finish].to_numpy(dtype=np.float64)
+    if not len(starts):
+        return 0.0, 0.0
+    return float(starts.min()), float(finishes.max())
+
+
+def level_of_detail(df, t0=None, t1=None, pixels=1200, top_n=30, exact_rows=5000, job="Job", start="Start",
+                    finish="Finish", value=None):
+    # Returns (bars, lanes): bars has lane, start, finish, slices, busy (and value, the
+    # busy-weighted mean of the value column), lanes lists the lane names top-down.
+    columns = ["lane", "start", "finish", "slices", "busy"] + (["value"] if value else [])
+    lo, hi = slice_bounds(df, start, finish)
+    t0 = lo if t0 is None else t0
+    t1 = hi if t1 is None else t1
+
+    starts = df[start].to_numpy(dtype=np.float64)
+    finishes = df[finish].to_numpy(dtype=np.float64)
+    inside = (finishes >= t0) & (starts <= t1)
+    if not inside.any():
+        return pd.DataFrame(columns=columns), []
+
+    starts = np.clip(starts[inside], t0, t1)
+    finishes = np.clip(finishes[inside], t0, t1)
+    busy = finishes - starts
+    codes, names = pd.factorize(df[job].to_numpy()[inside])
+
+    # top_n jobs by busy time, everyone else in the last lane
+    job_busy = np.bincount(codes, weights=busy, minlength=len(names))
+    ranked = np.argsort(-job_busy, kind="stable")
+    lane_of_job = np.full(len(names), min(top_n, len(names)), dtype=np.int64)
+    lane_of_job[ranked[:top_n]] = np.arange(min(top_n, len(names)))
+    lanes = [str(name) for name in names[ranked[:top_n]]]
+    if len(names) > top_n:
+        lanes.append(OTHER_LANE)
+    lane = lane_of_job[codes]
+
+    if len(starts) > exact_rows and t1 > t0:
+        width = (t1 - t0) / pixels
+        begin = np.floor((starts - t0) / width)
+        end = np.maximum(np.ceil((finishes - t0) / width), begin + 1)
+    else:
+        width = None
+        begin, end = starts, finishes
+
+    values = df[value].to_numpy(dtype=np.float64)[inside] if value else None
+    parts = []
+    for index in range(len(lanes)):
+        rows = np.flatnonzero(lane == index)
+        rows = rows[np.argsort(begin[rows], kind="stable")]
+        a, b = begin[rows], end[rows]
+        # a new bar starts wherever a slice begins after everything before it has ended
+        reach = np.maximum.accumulate(b)
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = a[1:] > reach[:-1]
+        heads = np.flatnonzero(first)
+
+        part = {
+            "lane": np.full(len(heads), lanes[index], dtype=object),
+            "start": a[heads],
+            "finish": np.maximum.reduceat(b, heads),
+            "slices": np.diff(np.append(heads, len(rows))),
+            "busy": np.add.reduceat(busy[rows], heads),
+        }
+        if values is not None:
+            weighted = np.add.reduceat(values[rows] * busy[rows], heads)
+            plain = np.add.reduceat(values[rows], heads) / part["slices"]
+            # zero-length slices have no weight; fall back to the plain mean
+            part["value"] = np.where(part["busy"] > 0, weighted / np.where(part["busy"] > 0, part["busy"], 1),
+                                     plain)
+        if width is not None:
+            part["start"] = t0 + part["start"] * width
+            part["finish"] = np.minimum(t0 + part["finish"] * width, t1)
+        parts.append(pd.DataFrame(part))
+
+    return pd.concat(parts, ignore_index=True)[columns], lanes
+
+
+def _segments(bars):
+    # x/y/text arrays for one Scattergl trace: a line per bar, NaN-separated
+    count = len(bars)
+    x = np.column_stack([bars["start"], bars["finish"], np.full(count, np.nan)]).ravel()
+    lane = bars["lane"].to_numpy(dtype=object)
+    y = np.column_stack([lane, lane, np.full(count, None, dtype=object)]).ravel()
+    label = (bars["lane"].astype(str) + ": " + bars["slices"].astype(str) + " slice(s), "
+             + bars["busy"].round(3).astype(str) + "s busy").to_numpy(dtype=object)
+    if "value" in bars:
+        label = label + (", " + bars["value"].round(3).astype(str)).to_numpy(dtype=object)
+    text = np.column_stack([label, label, np.full(count, None, dtype=object)]).ravel()
+    return x, y, text
+
+
+def gantt_figure(bars, lanes, title, value_name=None, color_levels=8):
+    # value_name colours the bars by the value column in color_levels buckets
+    # (Scattergl lines have one colour per trace); otherwise each lane has its colour.
+    import plotly.graph_objects as go
+    from plotly.colors import sample_colorscale
+
+    fig = go.Figure()
+    thickness = max(2, min(20, 400 // max(1, len(lanes))))
+    if value_name and len(bars):
+        edges = np.unique(np.quantile(bars["value"], np.linspace(0, 1, color_levels + 1)))
+        bucket = np.clip(np.searchsorted(edges, bars["value"], side="right") - 1, 0, max(0, len(edges) - 2))
+        colors = sample_colorscale("Viridis", np.linspace(0, 1, max(1, len(edges) - 1)))
+        groups = [(f"{value_name} {edges[i]:.2f}-{edges[min(i + 1, len(edges) - 1)]:.2f}", colors[i],
+                   bars[bucket == i]) for i in range(max(1, len(edges) - 1))]
+    else:
+        groups = [(name, None, bars[bars["lane"] == name]) for name in lanes]
+
+    for name, color, group in groups:
+        if not len(group):
+            continue
+        x, y, text = _segments(group)
+        fig.add_trace(go.Scattergl(x=x, y=y, text=text, mode="lines", name=name, hoverinfo="text",
+                                   line={"width": thickness, "color": color}))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Time (seconds)",
+        yaxis_title="Job",
+        yaxis={"categoryorder": "array", "categoryarray": lanes[::-1], "type": "category"},
+        height=600,
+        dragmode="select",
+    )
+    return fig
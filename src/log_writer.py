@@ -0,0 +1,152 @@
+import os
+import glob
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from scheduler.execution_log import ExecutionLog, CompletedJobs
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; the npy format works without it
+    pa = None
+    pq = None
+
+# Streams scheduler logs to disk while a simulation runs.  Attached logs hand over
+# every batch_rows rows as one record batch, which is written to its own part file:
+#
+#   <root>/slices/scheduler=<name>/part-<run_id>-<n>.<ext>   per-slice log
+#   <root>/jobs/scheduler=<name>/part-<run_id>-<n>.<ext>     per-job records
+#
+# Parts are written to a temporary name and renamed into place, so a killed run
+# leaves only complete parts behind (everything but its last unflushed batch).
+# Every scheduler writes the same columns (TABLE_SCHEMAS; "Quantum Used" is NaN
+# where the policy has no quantum), so runs can be read back together with read_log.
+#
+# format="parquet" and "arrow" (Arrow IPC file) need pyarrow; "npy" stores each
+# batch as a NumPy structured array.
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "npy": ".npy"}
+TABLE_SCHEMAS = {
+    "slices": ExecutionLog.slice_columns + (ExecutionLog.quantum_column,),
+    "jobs": CompletedJobs.columns,
+}
+
+
+def default_format():
+    return "parquet" if pa is not None else "npy"
+
+
+def _arrow_type(dtype):
+    return {np.float64: pa.float64(), np.int32: pa.int32(), np.int16: pa.int16(), np.bool_: pa.bool_()}[dtype]
+
+
+class LogWriter:
+    def __init__(self, root, scheduler_name, format=None, batch_rows=65536):
+        format = format or default_format()
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {list(FORMATS)}")
+        if format != "npy" and pa is None:
+            raise ImportError(f"format='{format}' needs pyarrow; install it or use format='npy'")
+        if batch_rows < 1:
+            raise ValueError("batch_rows must be at least 1")
+
+        self.root = root
+        self.scheduler_name = scheduler_name
+        self.format = format
+        self.batch_rows = batch_rows
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.parts = {table: 0 for table in TABLE_SCHEMAS}
+        self.rows = {table: 0 for table in TABLE_SCHEMAS}
+        self._logs = []
+
+    def attach(self, scheduler):
+        for table, log in (("slices", scheduler.execution_log), ("jobs", scheduler.completed_jobs)):
+            log.spill_to(self, table)
+            self._logs.append(log)
+        return self
+
+    def close(self):
+        # write out what the attached logs still hold
+        for log in self._logs:
+            log.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _batch(self, table, log):
+        names = log.job_names.names
+        rows = len(log)
+        batch = {}
+        for i, (name, _, dtype) in enumerate(TABLE_SCHEMAS[table]):
+            if i == 0:
+                batch[name] = [names[code] for code in log.column(name).tolist()]
+            elif any(column == name for column, _, _ in log.columns):
+                batch[name] = log.column(name)
+            else:
+                batch[name] = np.full(rows, np.nan, dtype=dtype)
+        return batch
+
+    def write(self, table, log):
+        batch = self._batch(table, log)
+        part_dir = os.path.join(self.root, table, f"scheduler={self.scheduler_name}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{self.run_id}-{self.parts[table]:06d}{FORMATS[self.format]}")
+        tmp_path = path + ".tmp"
+
+        if self.format == "npy":
+            columns = TABLE_SCHEMAS[table]
+            job_width = max(1, max(map(len, batch[columns[0][0]]), default=1))
+            dtype = np.dtype([(columns[0][0], f"U{job_width}")] + [(name, dtype) for name, _, dtype in columns[1:]])
+            records = np.empty(len(log), dtype=dtype)
+            for name in dtype.names:
+                records[name] = batch[name]
+            with open(tmp_path, "wb") as f:
+                np.save(f, records)
+        else:
+            schema = pa.schema([(name, pa.string() if i == 0 else _arrow_type(dtype))
+                                for i, (name, _, dtype) in enumerate(TABLE_SCHEMAS[table])])
+            record_batch = pa.record_batch([pa.array(batch[name], type=schema.field(name).type)
+                                            for name in schema.names], schema=schema)
+            if self.format == "parquet":
+                pq.write_table(pa.Table.from_batches([record_batch]), tmp_path)
+            else:
+                with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_batch(record_batch)
+        os.replace(tmp_path, path)
+
+        self.parts[table] += 1
+        self.rows[table] += len(log)
+
+
+def _read_part(path):
+    if path.endswith(".npy"):
+        return pd.DataFrame(np.load(path))
+    if pa is None:
+        raise ImportError(f"reading {path} needs pyarrow")
+    if path.endswith(".parquet"):
+        return pq.read_table(path).to_pandas()
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def read_log(root, table="slices", scheduler_name=None, run_id=None):
+    # Concatenate the part files of one table, oldest first, with the scheduler as a column.
+    if table not in TABLE_SCHEMAS:
+        raise ValueError(f"table must be one of {list(TABLE_SCHEMAS)}")
+    pattern = os.path.join(root, table, f"scheduler={scheduler_name or '*'}", f"part-{run_id or '*'}-*")
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        if not path.endswith(tuple(FORMATS.values())):
+            continue  # e.g. a .tmp left by a killed run
+        frame = _read_part(path)
+        frame.insert(0, "scheduler", os.path.basename(os.path.dirname(path)).split("=", 1)[1])
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=["scheduler"] + [name for name, _, _ in TABLE_SCHEMAS[table]])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,344 @@
+import io
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+from collections import deque
+import simpy
+from simulation import SCHEDULERS, create_scheduler
+from scheduler.multicore import MultiCoreCPU
+from scheduler.metrics import RunMetrics
+from trace_cache import parse_cpu_usage, pack_usage, burst_times, burst_percentile
+
+# Online mode: one long-lived SimPy environment and scheduler that new arrivals are
+# pushed into as they show up, instead of reloading the trace and simulating it all
+# again.  Records are the (arrival_time, job_id, priority, burst_time) tuples of
+# load_kaggle_trace, from a TraceTail following a growing Borg CSV or pushed directly.
+#
+#   push(records)   queue arrivals (in time order) for the feeder process, which
+#                   submits them exactly as process_generator does
+#   advance()       run the simulation up to the latest arrival pushed: nothing after
+#                   it can be decided before the next arrivals are known, so events at
+#                   that instant are left for the next advance
+#   finish()        no more data for now: run until every job is done
+#
+# Each advance publishes an update with the window's RunMetrics (the jobs and slices
+# finished since the previous update) and running totals that the window is merged
+# into (see scheduler/metrics.py), so an update costs time in the new data, not the
+# history.  Arrival times are relative to the first record pushed.  A record older
+# than what has already been pushed or simulated cannot be placed in the past: it
+# arrives at that point instead and is counted as late.
+#
+# TraceTail remembers its byte offset and on every poll parses only the complete rows
+# appended since, with the same filtering and burst times as trace_cache.
+
+REQUIRED_COLUMNS = ["time", "collection_id", "priority", "event", "cpu_usage_distribution"]
+
+
+def _complete_length(data):
+    # bytes up to the last newline that is not inside a quoted field: one with an
+    # even number of quotes before it, searching back from the end
+    newline = data.rfind(b"\n")
+    quotes = data.count(b'"', 0, newline) if newline >= 0 else 0
+    while newline >= 0 and quotes % 2:
+        previous = data.rfind(b"\n", 0, newline)
+        quotes -= data.count(b'"', previous + 1, newline)
+        newline = previous
+    return newline + 1
+
+
+def jsonable(value):
+    # numpy scalars to Python numbers, NaN/inf to null
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and (value != value or value in (float("inf"), float("-inf"))):
+        return None
+    return value
+
+
+class TraceTail:
+    def __init__(self, file_path="borg_traces_data.csv", scheduler_name="RoundRobin"):
+        self.file_path = file_path
+        self.percentile = burst_percentile(scheduler_name)
+        self.offset = 0
+        self.columns = None
+        self.rows = 0
+        self.records = 0
+
+    def skip(self):
+        # start from the end of the file as it is now: the header is read, the rows
+        # up to the last complete one are passed over unparsed
+        data = self._read()
+        length = _complete_length(data)
+        if length and self.columns is None:
+            self._read_header(data[:data.find(b"\n") + 1])
+        self.offset += length
+        return self
+
+    def _read(self):
+        # the bytes appended since the last poll
+        if not os.path.exists(self.file_path):
+            raise FileNotFoundError(f"Dataset file '{self.file_path}' not found.")
+        if os.path.getsize(self.file_path) < self.offset:
+            # truncated or replaced: start over
+            self.offset = 0
+            self.columns = None
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self.offset)
+            return f.read()
+
+    def _read_header(self, line):
+        header = next(csv.reader(io.StringIO(line.decode())), [])
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"'{self.file_path}' has no {', '.join(missing)} column(s)")
+        self.columns = [header.index(name) for name in REQUIRED_COLUMNS]
+
+    def poll(self):
+        # Records from the rows appended since the last poll, in time order.
+        data = self._read()
+        length = _complete_length(data)
+        if not length:
+            return []
+        self.offset += length
+
+        if self.columns is None:
+            header_length = data.find(b"\n") + 1
+            self._read_header(data[:header_length])
+            data = data[header_length:]
+            length -= header_length
+        reader = csv.reader(io.StringIO(data[:length].decode()))
+
+        rows = []
+        t, c, p, e, u = self.columns
+        for row in reader:
+            self.rows += 1
+            if len(row) <= max(self.columns) or row[e] != "SCHEDULE" or not row[u]:
+                continue
+            try:
+                record = (float(row[t]) / 1e9, int(row[c]), int(row[p]), row[u])
+            except ValueError:
+                continue
+            if record[0] > 0:
+                rows.append(record)
+        if not rows:
+            return []
+
+        offsets, values = pack_usage([parse_cpu_usage(row[3]) for row in rows])
+        bursts = burst_times(offsets, values, [self.percentile])[self.percentile].tolist()
+        records = sorted(((round(row[0], 6), row[1], row[2], burst) for row, burst in zip(rows, bursts)),
+                         key=lambda record: record[0])
+        self.records += len(records)
+        return records
+
+
+class OnlineSimulation:
+    def __init__(self, scheduler_name, cores=1, queue="global", balancing="steal", rebalance_interval=10,
+                 time_quantum=3, initial_time_quantum=2, quantum_statistic="median", statistic_param=None,
+                 detail="metrics", sample_every=100, log_dir=None, log_format=None, log_batch_rows=65536,
+                 smoothing=0.6, min_quantum=5):
+        self.scheduler_name = scheduler_name
+        self.env = simpy.Environment()
+        self.cpu = MultiCoreCPU(self.env, cores=cores, queue=queue, balancing=balancing,
+                                rebalance_interval=rebalance_interval)
+        self.scheduler = create_scheduler(scheduler_name, self.env, self.cpu, time_quantum, initial_time_quantum,
+                                          quantum_statistic, statistic_param, detail, sample_every, False,
+                                          smoothing, min_quantum)
+        self.totals = RunMetrics(self.scheduler.cores)
+        self.writer = None
+        if log_dir is not None:
+            from log_writer import LogWriter
+            self.writer = LogWriter(log_dir, scheduler_name, log_format, log_batch_rows).attach(self.scheduler)
+
+        self.base_time = None
+        self.watermark = 0.0  # latest arrival pushed, on the simulation's clock
+        self.pushed = 0
+        self.late = 0
+        self.updates = 0
+        self._window_pushed = 0
+        self._window_start = 0.0
+        self._pending = deque()
+        self._more = self.env.event()
+        self.env.process(self._feeder())
+
+    def _feeder(self):
+        env, pending, submit = self.env, self._pending, self.scheduler.submit
+        while True:
+            if not pending:
+                if self._more.triggered:
+                    self._more = env.event()
+                yield self._more  # sleep until something is pushed
+                continue
+            arrival_time, job_id, priority, burst_time = pending.popleft()
+            yield env.timeout(max(0, arrival_time - env.now))
+            submit(f"Job-{job_id}", burst_time, priority)
+
+    def push(self, records):
+        # records: (arrival_time, job_id, priority, burst_time) tuples in time order
+        floor = max(self.watermark, self.env.now)
+        count = 0
+        for arrival_time, job_id, priority, burst_time in records:
+            if self.base_time is None:
+                self.base_time = arrival_time
+            arrival = arrival_time - self.base_time
+            if arrival < floor:
+                self.late += 1
+                arrival = floor
+            self._pending.append((arrival, job_id, priority, burst_time))
+            floor = arrival
+            count += 1
+        if count:
+            self.watermark = floor
+            self.pushed += count
+            self._window_pushed += count
+            if not self._more.triggered:
+                self._more.succeed()
+        return count
+
+    def advance(self, until=None):
+        # Runs up to the latest arrival (or until, if later) and returns the update.
+        until = self.watermark if until is None else max(until, self.watermark)
+        if until > self.env.now:
+            self.env.run(until=until)
+        return self.publish()
+
+    def finish(self):
+        self.env.run()
+        return self.publish()
+
+    def publish(self):
+        window = self.scheduler.metrics
+        self.scheduler.metrics = RunMetrics(self.scheduler.cores)
+        self.totals.merge(window)
+        self.updates += 1
+        update = {
+            "update": self.updates,
+            "time": self.env.now,
+            "window_start": self._window_start,
+            "arrived": self._window_pushed,
+            "pushed": self.pushed,
+            "late": self.late,
+            "in_system": self.pushed - self.totals.jobs,
+            "window": window.summary(),
+            "totals": self.totals.summary(),
+        }
+        self._window_pushed = 0
+        self._window_start = self.env.now
+        return update
+
+    def core_stats(self):
+        return self.cpu.core_stats()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def format_update(update):
+    window, totals = update["window"], update["totals"]
+    line = (f"[{update['time']:.2f}] +{update['arrived']} arrived, {window['jobs']} done, "
+            f"{update['in_system']} in system")
+    if window["jobs"]:
+        line += f" | window wait {window['avg_waiting']:.2f} avg {window['p99_waiting']:.2f} p99"
+    if totals["jobs"]:
+        line += (f" | total {totals['jobs']} jobs, wait {totals['avg_waiting']:.2f} avg "
+                 f"{totals['p99_waiting']:.2f} p99, utilization {totals['utilization'] * 100:.1f}%")
+    return line
+
+
+def read_pushed(stream):
+    # one record per line: a JSON [arrival_time, job_id, priority, burst_time] list or
+    # {"time", "collection_id", "priority", "burst_time"} object
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, dict):
+            record = (record["time"], record["collection_id"], record.get("priority", 0), record["burst_time"])
+        yield tuple(record)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a growing trace incrementally and publish rolling metrics.")
+    parser.add_argument("--scheduler", default="RoundRobin", choices=SCHEDULERS)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--follow", metavar="TRACE", help="tail this Borg CSV as rows are appended")
+    source.add_argument("--stdin", action="store_true",
+                        help="read pushed records from stdin, one JSON [time, job_id, priority, burst_time] per line")
+    parser.add_argument("--from-end", action="store_true", help="--follow: skip the rows already in the file")
+    parser.add_argument("--interval", type=float, default=1.0, help="--follow: seconds between polls")
+    parser.add_argument("--idle-exit", type=float, default=None, metavar="SECONDS",
+                        help="--follow: finish once nothing was appended for this long (default: run until Ctrl-C)")
+    parser.add_argument("--every", type=int, default=1000, help="--stdin: records per update")
+    parser.add_argument("--cores", type=int, default=1)
+    parser.add_argument("--queue", default="global", choices=["global", "per_core"])
+    parser.add_argument("--time-quantum", type=float, default=3)
+    parser.add_argument("--initial-time-quantum", type=float, default=2)
+    parser.add_argument("--detail", default="metrics", choices=["full", "summary", "sampled", "metrics"])
+    parser.add_argument("--log-dir", default=None, help="stream the logs to partitioned files here")
+    parser.add_argument("--out", default=None, help="append every update to this file as a JSON line")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "a") if args.out else None
+
+    def publish(update):
+        print(format_update(update))
+        if out is not None:
+            out.write(json.dumps(jsonable(update)) + "\n")
+            out.flush()
+
+    simulation = OnlineSimulation(args.scheduler, cores=args.cores, queue=args.queue, time_quantum=args.time_quantum,
+                                  initial_time_quantum=args.initial_time_quantum, detail=args.detail,
+                                  log_dir=args.log_dir)
+    try:
+        if args.stdin:
+            batch = []
+            for record in read_pushed(sys.stdin):
+                batch.append(record)
+                if len(batch) >= args.every:
+                    simulation.push(batch)
+                    publish(simulation.advance())
+                    batch = []
+            simulation.push(batch)
+        else:
+            tail = TraceTail(args.follow, args.scheduler)
+            if args.from_end:
+                tail.skip()
+            print(f"Following {args.follow} with {args.scheduler} (Ctrl-C to stop)...")
+            idle_since = time.monotonic()
+            while args.idle_exit is None or time.monotonic() - idle_since < args.idle_exit:
+                if simulation.push(tail.poll()):
+                    publish(simulation.advance())
+                    idle_since = time.monotonic()
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        update = simulation.finish()
+        simulation.close()
+        publish(update)
+        if out is not None:
+            out.close()
+
+    print(f"\n{update['pushed']} jobs in {update['update']} updates ({update['late']} late), "
+          f"simulated to t={update['time']:.2f}")
+    return update
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+import csv
+import sys
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from trace_cache import open_trace, burst_times, burst_percentile
+from scheduler.metrics import RunMetrics
+from simulation import SCHEDULERS
+
+# Whole-trace replay.  The trace is cut into windows of window_jobs jobs and every
+# window is simulated on its own, starting at the previous window's last completion
+# time (process_generator's last_completion_time), so the windows form one timeline.
+# Only one window (or one per worker) is in memory at a time and each run keeps just
+# its per-job records, so memory does not grow with the trace; replay() yields one
+# summary per window as it finishes.  Each summary also carries the window's
+# RunMetrics (scheduler/metrics.py) under "metrics"; ReplayTotals merges them, so the
+# whole-trace waiting-time percentiles are within the sketches' 1%, not averages of
+# per-window figures.
+#
+# A window's schedule does not depend on where it starts: shifting every arrival by
+# the same offset shifts every completion by that offset.  So with processes > 1 the
+# windows run in parallel from time 0 and are chained afterwards by adding up their
+# makespans, which gives the same timeline as running them one after another.
+
+SUMMARY_FIELDS = ["window", "jobs", "trace_start", "trace_end", "start_time", "end_time", "makespan",
+                  "avg_turnaround", "avg_waiting", "p95_waiting", "p99_waiting", "max_waiting", "slices",
+                  "utilization"]
+
+
+def iter_trace(scheduler_name, file_path="borg_traces_data.csv", start_time=None, end_time=None,
+               cache_dir=None, block_rows=65536):
+    # Workload tuples straight from the memory-mapped trace cache, block_rows at a time.
+    store = open_trace(file_path, cache_dir)
+    percentile = burst_percentile(scheduler_name)
+    lo, hi = store.window(start_time, end_time)
+    for start in range(lo, hi, block_rows):
+        stop = min(hi, start + block_rows)
+        bursts = burst_times(store.usage_offsets[start:stop + 1], store.usage_values, [percentile])[percentile]
+        times = [round(t, 6) for t in store.time[start:stop].tolist()]
+        yield from zip(times, store.collection_id[start:stop].tolist(), store.priority[start:stop].tolist(),
+                       bursts.tolist())
+
+
+def iter_windows(workload, window_jobs):
+    workload = iter(workload)
+    while True:
+        window = list(itertools.islice(workload, window_jobs))
+        if not window:
+            return
+        yield window
+
+
+def simulate_window(scheduler_name, window, index, last_completion_time=0, **params):
+    from simulation import simulate
+
+    scheduler, core_stats = simulate(scheduler_name, window, batch_size=None, detail="metrics", verbose=False,
+                                     last_completion_time=last_completion_time, **params)
+    metrics = scheduler.metrics
+    summary = metrics.summary()
+    end_time = metrics.last_completion if metrics.jobs else last_completion_time
+    makespan = end_time - last_completion_time
+    busy = sum(stats["busy_time"] for stats in core_stats)
+
+    return {
+        "window": index,
+        "jobs": metrics.jobs,
+        "trace_start": window[0][0],
+        "trace_end": window[-1][0],
+        "start_time": last_completion_time,
+        "end_time": end_time,
+        "makespan": makespan,
+        "avg_turnaround": summary["avg_turnaround"],
+        "avg_waiting": summary["avg_waiting"],
+        "p95_waiting": summary["p95_waiting"],
+        "p99_waiting": summary["p99_waiting"],
+        "max_waiting": summary["max_waiting"],
+        "slices": scheduler.execution_log.slices,
+        "utilization": busy / (len(core_stats) * makespan) if makespan > 0 and core_stats else 0.0,
+        "metrics": metrics,
+    }
+
+
+def _chain(summary, offset):
+    # move a window simulated from time 0 to start at offset
+    summary["metrics"].shift(offset)
+    return {**summary, "start_time": offset, "end_time": offset + summary["makespan"]}
+
+
+def replay(scheduler_name, workload, window_jobs=25, processes=1, **params):
+    # Yields one summary dict per window, in window order.
+    windows = iter_windows(workload, window_jobs)
+    last_completion_time = 0
+
+    if processes <= 1:
+        for index, window in enumerate(windows):
+            summary = simulate_window(scheduler_name, window, index, last_completion_time, **params)
+            last_completion_time = summary["end_time"]
+            yield summary
+        return
+
+    # At most 2 windows per worker are in flight, so memory stays bounded.
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = {}
+        next_index = 0
+        for index, window in enumerate(itertools.chain(windows, [None])):
+            if window is not None:
+                pending[index] = pool.submit(simulate_window, scheduler_name, window, index, 0, **params)
+            while pending and (window is None or len(pending) >= 2 * processes):
+                summary = pending.pop(next_index).result()
+                next_index += 1
+                summary = _chain(summary, last_completion_time)
+                last_completion_time = summary["end_time"]
+                yield summary
+
+
+class ReplayTotals:
+    # Whole-trace figures built up from window summaries without keeping them.
+    def __init__(self):
+        self.windows = 0
+        self.jobs = 0
+        self.turnaround = 0.0
+        self.waiting = 0.0
+        self.max_waiting = -np.inf
+        self.slices = 0
+        self.busy = 0.0
+        self.makespan = 0.0
+        self.end_time = 0.0
+        self.metrics = None
+
+    def add(self, summary):
+        self.windows += 1
+        self.jobs += summary["jobs"]
+        if summary["jobs"]:
+            self.turnaround += summary["avg_turnaround"] * summary["jobs"]
+            self.waiting += summary["avg_waiting"] * summary["jobs"]
+            self.max_waiting = max(self.max_waiting, summary["max_waiting"])
+        self.slices += summary["slices"]
+        self.busy += summary["utilization"] * summary["makespan"]
+        self.makespan += summary["makespan"]
+        self.end_time = summary["end_time"]
+        metrics = summary.get("metrics")
+        if metrics is not None:
+            if self.metrics is None:
+                self.metrics = RunMetrics(metrics.cores)
+            self.metrics.merge(metrics)
+
+    def result(self):
+        merged = self.metrics.summary() if self.metrics is not None else {}
+        return {
+            "windows": self.windows,
+            "jobs": self.jobs,
+            "end_time": self.end_time,
+            "avg_turnaround": self.turnaround / self.jobs if self.jobs else np.nan,
+            "avg_waiting": self.waiting / self.jobs if self.jobs else np.nan,
+            "p50_waiting": merged.get("p50_waiting", np.nan),
+            "p95_waiting": merged.get("p95_waiting", np.nan),
+            "p99_waiting": merged.get("p99_waiting", np.nan),
+            "max_waiting": self.max_waiting if self.jobs else np.nan,
+            "avg_slowdown": merged.get("avg_slowdown", np.nan),
+            "fairness": merged.get("fairness", np.nan),
+            "slices": self.slices,
+            "utilization": self.busy / self.makespan if self.makespan > 0 else 0.0,
+        }
+
+
+def combine(summaries):
+    totals = ReplayTotals()
+    for summary in summaries:
+        totals.add(summary)
+    return totals.result()
+
+
+def replay_to_csv(scheduler_name, workload, out, window_jobs=25, processes=1, report_every=100, **params):
+    # Streams window summaries to a CSV as they finish and returns the whole-trace totals.
+    totals = ReplayTotals()
+    with open(out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for summary in replay(scheduler_name, workload, window_jobs, processes, **params):
+            writer.writerow(summary)
+            totals.add(summary)
+            if report_every and not totals.windows % report_every:
+                print(f"[window {summary['window']}] {totals.jobs} jobs, t={summary['end_time']:.2f}")
+    return totals.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a whole trace as a chain of scheduling windows.")
+    parser.add_argument("--scheduler", default="RoundRobin", choices=SCHEDULERS)
+    parser.add_argument("--trace", default="borg_traces_data.csv")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="JOBS",
+                        help="replay a synthetic workload of this many jobs instead of the trace")
+    parser.add_argument("--start-time", type=float, default=None)
+    parser.add_argument("--end-time", type=float, default=None)
+    parser.add_argument("--window-jobs", type=int, default=25)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--engine", default="simpy", choices=["simpy", "fast"])
+    parser.add_argument("--cores", type=int, default=1)
+    parser.add_argument("--out", default="replay_windows.csv")
+    args = parser.parse_args(argv)
+
+    if args.synthetic is not None:
+        from workload import generate_workload
+        workload = generate_workload(args.synthetic)
+    else:
+        workload = iter_trace(args.scheduler, args.trace, args.start_time, args.end_time)
+
+    totals = replay_to_csv(args.scheduler, workload, args.out, args.window_jobs, args.processes,
+                           engine=args.engine, cores=args.cores)
+    print(f"\nReplayed {totals['jobs']} jobs in {totals['windows']} windows with {args.scheduler}")
+    print(f"   - Avg Turnaround Time: {totals['avg_turnaround']:.2f} sec")
+    print(f"   - Avg Waiting Time: {totals['avg_waiting']:.2f} sec")
+    print(f"   - Waiting Time p50/p95/p99: {totals['p50_waiting']:.2f} / {totals['p95_waiting']:.2f} / "
+          f"{totals['p99_waiting']:.2f} sec")
+    print(f"   - Slowdown: {totals['avg_slowdown']:.2f} avg | Jain Fairness: {totals['fairness']:.3f}")
+    print(f"   - Utilization: {totals['utilization'] * 100:.1f}%")
+    print(f"Window summaries written to {args.out}")
+    return totals
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,5 +1,12 @@
 from .fcfs import FCFSScheduler
 from .sjf import SJFScheduler
 from .round_robin import RoundRobinScheduler
+from .multicore import MultiCoreCPU
+from .base import DispatcherScheduler
+from .mlfq import MLFQScheduler
+from .cfs import CFSScheduler
+from .execution_log import ExecutionLog, CompletedJobs
+from .metrics import RunMetrics, QuantileSketch
 
-__all__ = ["FCFSScheduler", "SJFScheduler", "RoundRobinScheduler"]
\ No newline at end of file
+__all__ = ["FCFSScheduler", "SJFScheduler", "RoundRobinScheduler", "MultiCoreCPU", "DispatcherScheduler", "ExecutionLog",
+           "CompletedJobs", "RunMetrics", "QuantileSketch", "MLFQScheduler", "CFSScheduler"]
\ No newline at end of file
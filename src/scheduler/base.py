@@ -0,0 +1,363 @@
+import heapq
+import itertools
+import simpy
+from collections import deque
+from .multicore import request_cpu, placement
+from .order_stats import TrackedQueue, get_quantum_statistic, make_order_statistics
+from .execution_log import JobNames, ExecutionLog, CompletedJobs
+from .metrics import RunMetrics
+
+# Single-dispatcher scheduling.  Instead of one SimPy process per job competing for
+# the CPU, every core gets one long-lived dispatcher process that pulls the next job
+# from a policy-defined ready structure.  Arrivals are plain enqueues (submit), so
+# the number of live processes and pending events scales with cores and dispatches,
+# not with jobs x waiters.
+#
+# A ready structure implements:
+#   push(job)   enqueue a runnable job
+#   pop()       -> (job, time_slice, quantum) for the next job to run; quantum is
+#                  what gets logged as "Quantum Used" (None if the policy has none)
+#   requeue(job, quantum)  put back a job whose slice did not finish it
+#   take()      remove some job without running it (used for rebalancing)
+#   __len__
+#
+# Preemptive policies (preemptive = True) run each job for its whole slice with a
+# single timeout; should_preempt(new_job, running_job, remaining) decides on arrival
+# whether a running job is cut short, in which case its dispatcher is interrupted.
+#
+# With a MultiCoreCPU in queue="per_core" mode every core has its own ready
+# structure; new jobs go to the least loaded core, preempted jobs stay on their core,
+# and the cpu's balancing setting picks work stealing or periodic rebalancing.
+#
+# Slices go to a columnar ExecutionLog and finished jobs to CompletedJobs (see
+# scheduler/execution_log.py); detail picks full, sampled or summary-only slice logging.
+# Both also feed self.metrics, a constant-memory RunMetrics (scheduler/metrics.py).
+# verbose=False silences the per-job console output of the on_* hooks, and an attached
+# Instrumentation (scheduler/instrumentation.py) records dispatch statistics.
+
+
+class Job:
+    __slots__ = ("name", "code", "burst_time", "remaining_time", "arrival_time", "priority", "ready_at",
+                 "policy_state")
+
+    def __init__(self, name, burst_time, arrival_time, priority=None, code=None):
+        self.name = name
+        self.code = code
+        self.burst_time = burst_time
+        self.remaining_time = burst_time
+        self.arrival_time = arrival_time
+        self.priority = priority
+        self.ready_at = arrival_time  # when the job last became runnable
+        self.policy_state = None  # the ready structure's own bookkeeping (MLFQ level, CFS vruntime)
+
+
+class FIFOReadyQueue:
+    def __init__(self):
+        self.jobs = deque()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        self.jobs.append(job)
+
+    def pop(self):
+        job = self.jobs.popleft()
+        return job, job.remaining_time, None
+
+    def requeue(self, job, quantum):
+        self.jobs.appendleft(job)
+
+    def take(self):
+        return self.jobs.pop()
+
+
+class ShortestJobReadyQueue:
+    def __init__(self):
+        # heap of (remaining_time, arrival_time, seq, job): shortest first, ties by arrival
+        self.heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, job):
+        heapq.heappush(self.heap, (job.remaining_time, job.arrival_time, next(self._seq), job))
+
+    def pop(self):
+        job = heapq.heappop(self.heap)[-1]
+        return job, job.remaining_time, None
+
+    def requeue(self, job, quantum):
+        self.push(job)
+
+    def take(self):
+        # the last list element is a leaf, so removing it keeps the heap valid
+        return self.heap.pop()[-1]
+
+
+class RoundRobinReadyQueue:
+    def __init__(self, time_quantum):
+        if time_quantum <= 0:
+            raise ValueError("time_quantum must be positive")
+        self.time_quantum = time_quantum
+        self.jobs = deque()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        self.jobs.append(job)
+
+    def pop(self):
+        job = self.jobs.popleft()
+        return job, min(self.time_quantum, job.remaining_time), None
+
+    def requeue(self, job, quantum):
+        self.jobs.append(job)
+
+    def take(self):
+        return self.jobs.pop()
+
+
+class AdaptiveReadyQueue:
+    def __init__(self, initial_time_quantum, quantum_statistic="median", statistic_param=None, smoothing=0.6,
+                 min_quantum=5):
+        if initial_time_quantum <= 0 or min_quantum <= 0:
+            raise ValueError("initial_time_quantum and min_quantum must be positive")
+        if not 0 <= smoothing < 1:
+            raise ValueError("smoothing must be in [0, 1)")
+        self.prev_quantum = initial_time_quantum
+        self.smoothing = smoothing
+        self.min_quantum = min_quantum
+        self.jobs = TrackedQueue(key=lambda job: job.remaining_time,
+                                 stats=make_order_statistics(quantum_statistic, statistic_param))
+        self.quantum_statistic = get_quantum_statistic(quantum_statistic, statistic_param)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        self.jobs.append(job)
+
+    def pop(self):
+        # Quantum Adjustment
+        statistic = self.quantum_statistic(self.jobs.stats)
+        new_quantum = (self.smoothing * self.prev_quantum) + ((1 - self.smoothing) * statistic)
+        adaptive_quantum = max(self.min_quantum, int(new_quantum))
+        self.prev_quantum = adaptive_quantum  # Update for next cycle
+
+        job = self.jobs.popleft()
+        return job, min(adaptive_quantum, job.remaining_time), adaptive_quantum
+
+    def requeue(self, job, quantum):
+        if job.remaining_time < quantum:
+            self.jobs.appendleft(job)
+        else:
+            self.jobs.append(job)
+
+    def take(self):
+        return self.jobs.pop()
+
+
+class DispatcherScheduler:
+    # True: the slice log has a "Quantum Used" column (AdaptiveRR)
+    logs_quantum = False
+    preemptive = False
+
+    def __init__(self, env, cpu, detail="full", sample_every=100, verbose=True):
+        self.env = env
+        self.cpu = cpu
+        self.verbose = verbose
+        self.instruments = None
+        self.job_names = JobNames()
+        self.completed_jobs = CompletedJobs(self.job_names, keep=detail != "metrics")
+        self.execution_log = ExecutionLog(self.job_names, detail, sample_every, self.logs_quantum)
+
+        self.cores = getattr(cpu, "capacity", 1)
+        self.metrics = RunMetrics(self.cores)
+        self.per_core = getattr(cpu, "queue", "global") == "per_core" and self.cores > 1
+        self.balancing = getattr(cpu, "balancing", None)
+        self.rebalance_interval = getattr(cpu, "rebalance_interval", 10)
+
+        self.run_queues = [self.make_ready_queue() for _ in range(self.cores if self.per_core else 1)]
+        self.ready_queue = self.run_queues[0]
+        self.busy = [False] * self.cores
+        self.running = [None] * self.cores  # (job, slice start) per core
+        self._preempting = [False] * self.cores
+
+        self._work = env.event()
+        self._dispatchers = None
+        self._rebalancing = False
+
+    def make_ready_queue(self):
+        raise NotImplementedError
+
+    # hooks for per-scheduler console output; not called when verbose is False
+    def on_submit(self, job):
+        pass
+
+    def on_dispatch(self, job):
+        pass
+
+    def on_complete(self, result):
+        pass
+
+    def on_preempt(self, job, by_job):
+        pass
+
+    def should_preempt(self, new_job, running_job, remaining_time):
+        return False
+
+    def submit(self, name, burst_time, priority=None):
+        job = Job(name, burst_time, self.env.now, priority, self.job_names.intern(name))
+        if self.verbose:
+            self.on_submit(job)
+
+        victim = self._preemption_victim(job) if self.preemptive else None
+        if victim is not None and self.per_core:
+            # the interrupted core should pick the new job up next
+            self.run_queues[victim].push(job)
+        else:
+            self._queue_for_new_job().push(job)
+
+        if self._dispatchers is None:
+            self._dispatchers = [self.env.process(self._dispatcher_process(core)) for core in range(self.cores)]
+        self._notify()
+
+        if victim is not None:
+            if self.instruments is not None:
+                self.instruments.preempted()
+            if self.verbose:
+                self.on_preempt(self.running[victim][0], job)
+            self._preempting[victim] = True
+            self._dispatchers[victim].interrupt()
+
+        if self.per_core and self.balancing == "rebalance" and not self._rebalancing:
+            self._rebalancing = True
+            self.env.process(self._rebalancer())
+
+    def process_task(self, name, burst_time):
+        # Kept for callers that env.process() every arrival; submit() is all it does.
+        self.submit(name, burst_time)
+        return
+        yield
+
+    def _notify(self):
+        if not self._work.triggered:
+            self._work.succeed()
+
+    def _queue_for_new_job(self):
+        if not self.per_core:
+            return self.run_queues[0]
+        core = min(range(self.cores), key=lambda c: len(self.run_queues[c]) + self.busy[c])
+        return self.run_queues[core]
+
+    def _preemption_victim(self, job):
+        # The core running the job with the most remaining time that should yield to job.
+        victim, most = None, None
+        for core, running in enumerate(self.running):
+            if running is None or self._preempting[core]:
+                continue
+            running_job, start_time = running
+            remaining = running_job.remaining_time - (self.env.now - start_time)
+            if remaining > 0 and self.should_preempt(job, running_job, remaining) \
+                    and (most is None or remaining > most):
+                victim, most = core, remaining
+        return victim
+
+    def _next_queue(self, core):
+        # The queue this core should run from next, or None if it has nothing to do.
+        own = self.run_queues[core if self.per_core else 0]
+        if len(own):
+            return own
+        if self.per_core and self.balancing == "steal":
+            victim = max(self.run_queues, key=len)
+            if len(victim):
+                return victim
+        return None
+
+    def _dispatcher_process(self, core):
+        if self.instruments is not None:
+            return self.instruments.timed(self.dispatcher(core))
+        return self.dispatcher(core)
+
+    def dispatcher(self, core):
+        env = self.env
+        instruments = self.instruments
+        while True:
+            queue = self._next_queue(core)
+            if queue is None:
+                if self._work.triggered:
+                    self._work = env.event()
+                yield self._work  # sleep until something is enqueued
+                continue
+
+            job, time_slice, quantum = queue.pop()
+            self.busy[core] = True
+            # the job counts as running from the moment it is picked (the core is
+            # granted at the same instant), so a shorter job arriving in between
+            # can still preempt it
+            start_time = env.now
+            self.running[core] = (job, start_time)
+
+            with request_cpu(self.cpu, job.name, core) as req:
+                try:
+                    yield req
+                    if instruments is not None:
+                        instruments.dispatched(start_time, core, job, sum(map(len, self.run_queues)))
+                    if self.verbose:
+                        self.on_dispatch(job)
+                    yield env.timeout(time_slice)
+                except simpy.Interrupt:
+                    # preempted: only the time actually spent counts
+                    time_slice = env.now - start_time
+                    self._preempting[core] = False
+                self.running[core] = None
+                end_time = env.now
+
+                job.remaining_time -= time_slice
+                if end_time > start_time or job.remaining_time <= 0:
+                    # a job preempted before it ran leaves no slice behind
+                    self._record(job, start_time, end_time, time_slice, quantum, req)
+
+            self.busy[core] = False
+            if job.remaining_time > 0:
+                job.ready_at = env.now
+                # preempted jobs stay on the core they ran on
+                self.run_queues[core if self.per_core else 0].requeue(job, quantum)
+
+    def _record(self, job, start_time, end_time, time_slice, quantum, req):
+        core, migrated = placement(req)
+        completed = job.remaining_time <= 0
+        self.execution_log.append(job.code, start_time, end_time, time_slice, job.remaining_time, quantum,
+                                  completed, core, migrated)
+        self.metrics.add_slice(start_time, end_time)
+        if not completed:
+            return
+
+        # start_time is the start of the job's final slice
+        self.completed_jobs.append(job.code, job.arrival_time, start_time, end_time, job.burst_time, core)
+        self.metrics.add_job(job.arrival_time, end_time, job.burst_time)
+        if self.verbose and self.completed_jobs.keep:
+            self.on_complete(self.completed_jobs[-1])
+
+    def _rebalancer(self):
+        # Only alive while jobs are queued, so env.run() can still finish.
+        while any(len(queue) for queue in self.run_queues):
+            yield self.env.timeout(self.rebalance_interval)
+            self.rebalance()
+        self._rebalancing = False
+
+    def rebalance(self):
+        # Move queued jobs from the most to the least loaded core until they differ by at most one.
+        def load(core):
+            return len(self.run_queues[core]) + self.busy[core]
+
+        while True:
+            longest = max(range(self.cores), key=load)
+            shortest = min(range(self.cores), key=load)
+            if load(longest) - load(shortest) <= 1 or not len(self.run_queues[longest]):
+                break
+            self.run_queues[shortest].push(self.run_queues[longest].take())
+        self._notify()
@@ -0,0 +1,180 @@
+import heapq
+from collections import deque
+import numpy as np
+from .execution_log import JobNames, ExecutionLog, CompletedJobs
+from .metrics import RunMetrics
+
+# Closed-form engine for the non-preemptive policies.  FCFS and SJF run every job in
+# one piece, so a schedule is just a start time and a core per job and no event loop
+# is needed:
+#
+#   FCFS, one core    the Lindley recursion c[i] = max(a[i], c[i - 1]) + b[i] unrolls
+#                     to c = cumsum(b) + cummax(a - cumsum(b) + b), a NumPy scan
+#   FCFS, k cores     each job in arrival order takes the core that frees up first
+#                     (a heap of k free times)
+#   SJF               a heap of waiting (burst, arrival) pairs and a heap of busy
+#                     cores, stepped from arrival to arrival
+#
+# The results land in the same completed_jobs / execution_log / metrics as
+# FastEngine and the SimPy schedulers (one slice per job, in completion order), written
+# with whole-array appends.  Job names are only interned when a log keeps rows, so
+# detail="metrics" runs never build a Python string per job.  Ties are broken as the
+# SimPy dispatchers break them (see sjf_schedule), so schedules match theirs up to
+# float rounding, except that a job arriving at the very instant another one
+# completes is always taken to arrive second.
+
+POLICIES = ("FCFS", "SJF")
+# the fields of trace_stream.RECORD_DTYPE (not imported from there: it needs pandas)
+RECORD_DTYPE = np.dtype([("time", np.float64), ("collection_id", np.int64), ("priority", np.int64),
+                         ("burst_time", np.float64)])
+
+
+def fcfs_schedule(arrivals, bursts, cores=1):
+    # (start times, cores) for time-ordered arrivals under FCFS
+    arrivals = np.asarray(arrivals, dtype=np.float64)
+    bursts = np.asarray(bursts, dtype=np.float64)
+    if cores == 1:
+        work = np.cumsum(bursts)
+        completions = work + np.maximum.accumulate(arrivals - work + bursts)
+        return completions - bursts, np.zeros(len(arrivals), dtype=np.int16)
+
+    starts = []
+    assigned = []
+    # (free at, dispatch order, core): the core that has been idle longest comes first
+    free = [(-np.inf, core - cores, core) for core in range(cores)]
+    heapreplace = heapq.heapreplace
+    for seq, (arrival, burst) in enumerate(zip(arrivals.tolist(), bursts.tolist())):
+        free_at, _, core = free[0]
+        start = arrival if arrival > free_at else free_at
+        heapreplace(free, (start + burst, seq, core))
+        starts.append(start)
+        assigned.append(core)
+    return np.array(starts), np.array(assigned, dtype=np.int16)
+
+
+def sjf_schedule(arrivals, bursts, cores=1):
+    # (start times, cores) for time-ordered arrivals under non-preemptive SJF, with the
+    # SimPy scheduler's dispatch order: a job arriving while a core is idle starts
+    # there at once (even if a shorter job arrives at the same instant), the core
+    # idle longest first; a core that finishes a job takes the shortest one waiting,
+    # ties going to the earlier arrival.  A completion at the same instant as an
+    # arrival is handled first.
+    arrival_list = np.asarray(arrivals, dtype=np.float64).tolist()
+    burst_list = np.asarray(bursts, dtype=np.float64).tolist()
+    count = len(arrival_list)
+    starts = [0.0] * count
+    assigned = [0] * count
+    idle = deque(range(cores))
+    busy = []  # (free at, dispatch order, core)
+    ready = []  # (burst, arrival order)
+    heappush, heappop = heapq.heappush, heapq.heappop
+    seq = 0
+    for i in range(count + 1):
+        arrival = arrival_list[i] if i < count else np.inf
+        while busy and busy[0][0] <= arrival and (ready or i < count):
+            free_at, _, core = heappop(busy)
+            if ready:
+                burst, j = heappop(ready)
+                starts[j] = free_at
+                assigned[j] = core
+                heappush(busy, (free_at + burst, seq, core))
+                seq += 1
+            else:
+                idle.append(core)
+        if i == count:
+            break
+        if idle:
+            core = idle.popleft()
+            starts[i] = arrival
+            assigned[i] = core
+            heappush(busy, (arrival + burst_list[i], seq, core))
+            seq += 1
+        else:
+            heappush(ready, (burst_list[i], i))
+    return np.array(starts), np.array(assigned, dtype=np.int16)
+
+
+class BatchEngine:
+    logs_quantum = False
+
+    def __init__(self, policy="FCFS", cores=1, detail="full", sample_every=100):
+        if policy not in POLICIES:
+            raise ValueError(f"The batch engine only supports {', '.join(POLICIES)}, not {policy}")
+        if cores < 1:
+            raise ValueError("cores must be at least 1")
+        self.policy = policy
+        self.cores = cores
+        self.now = 0
+        self.job_names = JobNames()
+        self.completed_jobs = CompletedJobs(self.job_names, keep=detail != "metrics")
+        self.execution_log = ExecutionLog(self.job_names, detail, sample_every, self.logs_quantum)
+        self.metrics = RunMetrics(cores)
+        self.slices = 0
+        self.busy_time = [0.0] * cores
+        self.dispatches = [0] * cores
+        self.migrations = [0] * cores
+
+    def run(self, workload, last_completion_time=0):
+        # workload: (arrival_time, job_id, priority, burst_time) tuples in time order, or
+        # a trace_stream.RECORD_DTYPE array or anything that converts to one, such as
+        # sweep.RecordView (which skips the conversion); it is simulated in one go.
+        if hasattr(workload, "__array__"):
+            workload = np.asarray(workload)
+        else:
+            workload = list(workload)
+            workload = np.fromiter(workload, dtype=RECORD_DTYPE, count=len(workload))
+        if not len(workload):
+            return self
+        times, job_ids, bursts = workload["time"], workload["collection_id"], workload["burst_time"]
+        arrivals = last_completion_time + (times - times[0])
+        # nothing may start before the engine's clock (as for a second run on the same engine)
+        arrivals = np.maximum(arrivals, self.now)
+
+        schedule = fcfs_schedule if self.policy == "FCFS" else sjf_schedule
+        starts, cores = schedule(arrivals, bursts, self.cores)
+        completions = starts + bursts
+
+        count = len(arrivals)
+        if self.completed_jobs.keep or self.execution_log.detail != "metrics":
+            codes = self._intern(job_ids)
+        else:
+            codes = np.zeros(count, dtype=np.int32)
+
+        # completed_jobs and execution_log are in completion order
+        if self.cores > 1 or self.policy == "SJF":
+            order = np.lexsort((cores, completions))
+            arrivals, bursts, starts, completions, cores, codes = (
+                arrivals[order], bursts[order], starts[order], completions[order], cores[order], codes[order])
+        done = np.ones(count, dtype=np.bool_)
+        self.execution_log.extend(codes, starts, completions, bursts, np.zeros(count), None, done, cores,
+                                  np.zeros(count, dtype=np.bool_))
+        self.completed_jobs.extend(codes, arrivals, starts, completions, bursts, cores)
+        self.metrics.add_slices(starts, completions)
+        self.metrics.add_jobs(arrivals, completions, bursts)
+
+        busy = np.bincount(cores, weights=bursts, minlength=self.cores)
+        dispatches = np.bincount(cores, minlength=self.cores)
+        for core in range(self.cores):
+            self.busy_time[core] += float(busy[core])
+            self.dispatches[core] += int(dispatches[core])
+        self.now = max(self.now, float(completions.max()))
+        self.slices += count
+        return self
+
+    def _intern(self, job_ids):
+        # "Job-<id>" codes, interning each distinct id once, in order of arrival as the
+        # SimPy schedulers' submit does
+        unique, first, inverse = np.unique(job_ids, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        codes = np.empty(len(unique), dtype=np.int32)
+        codes[order] = self.job_names.intern_many([f"Job-{job_id}" for job_id in unique[order].tolist()])
+        return codes[inverse.reshape(-1)]
+
+    def core_stats(self):
+        return [{
+            "core": core,
+            "busy_time": self.busy_time[core],
+            "utilization": self.busy_time[core] / self.now if self.now > 0 else 0.0,
+            "dispatches": self.dispatches[core],
+            "migrations": self.migrations[core],
+        } for core in range(self.cores)]
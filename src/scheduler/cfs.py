@@ -0,0 +1,72 @@
+import heapq
+import itertools
+from .base import DispatcherScheduler
+from .priority import borg_band, MONITORING, PRODUCTION, MID, BEST_EFFORT, FREE
+
+# CFS-style fair scheduling.  Every job accumulates virtual runtime: the CPU time it
+# got, scaled by NICE_0_WEIGHT / weight, so heavier jobs age more slowly.  The job
+# with the smallest vruntime runs next, for a slice of its weight's share of
+# target_latency (at least min_granularity).  New jobs start at the queue's
+# min_vruntime, so they neither starve others nor get starved.
+#
+# Ready jobs sit in a binary heap on (vruntime, arrival order), so push, pop and
+# requeue are O(log n).  Weights come from the Linux nice-to-weight table at the
+# nice level given to each Borg priority band.  With per-core queues each queue
+# has its own min_vruntime, and a job that moves keeps its vruntime.
+
+NICE_0_WEIGHT = 1024
+BAND_WEIGHTS = {MONITORING: 9548, PRODUCTION: 3121, MID: 1024, BEST_EFFORT: 335, FREE: 15}  # nice -10, -5, 0, 5, 19
+
+
+class FairReadyQueue:
+    def __init__(self, target_latency=6.0, min_granularity=0.75):
+        self.target_latency = target_latency
+        self.min_granularity = min_granularity
+        self.heap = []
+        self._seq = itertools.count()
+        self.min_vruntime = 0.0
+        self.total_weight = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, job):
+        state = job.policy_state
+        if state is None:
+            # [vruntime, weight, remaining_time when last dispatched]
+            state = job.policy_state = [self.min_vruntime, BAND_WEIGHTS[borg_band(job.priority)], job.remaining_time]
+        heapq.heappush(self.heap, (state[0], next(self._seq), job))
+        self.total_weight += state[1]
+
+    def pop(self):
+        vruntime, _, job = heapq.heappop(self.heap)
+        state = job.policy_state
+        self.total_weight -= state[1]
+        if vruntime > self.min_vruntime:
+            self.min_vruntime = vruntime
+        # share of the latency period among the jobs competing for this queue
+        time_slice = max(self.min_granularity, self.target_latency * state[1] / (self.total_weight + state[1]))
+        state[2] = job.remaining_time
+        return job, min(time_slice, job.remaining_time), None
+
+    def requeue(self, job, quantum):
+        state = job.policy_state
+        state[0] += (state[2] - job.remaining_time) * NICE_0_WEIGHT / state[1]
+        self.push(job)
+
+    def take(self):
+        # the last list element is a leaf, so removing it keeps the heap valid
+        job = self.heap.pop()[-1]
+        self.total_weight -= job.policy_state[1]
+        return job
+
+
+class CFSScheduler(DispatcherScheduler):
+    def __init__(self, env, cpu, target_latency=6.0, min_granularity=0.75, detail="full", sample_every=100,
+                 verbose=True):
+        self.target_latency = target_latency
+        self.min_granularity = min_granularity
+        super().__init__(env, cpu, detail, sample_every, verbose)
+
+    def make_ready_queue(self):
+        return FairReadyQueue(self.target_latency, self.min_granularity)
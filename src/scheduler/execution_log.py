@@ -0,0 +1,289 @@
+from array import array
+import numpy as np
+
+# Columnar scheduler logs.  Every column is an array.array that grows in place
+# (amortized, like a list) and stores raw 2-8 byte values instead of boxed objects,
+# and job names are interned to int codes, so a logged slice costs ~50 bytes instead
+# of a dict.  to_dataframe() wraps the column buffers with np.frombuffer, so the
+# numeric columns are not copied; the Job column becomes a Categorical over the
+# interned names.  A buffer cannot grow while a DataFrame shares it, so appending
+# after an export first moves the log onto fresh arrays (the DataFrame keeps the old ones).
+# pandas is imported on the first export, so runs that never build a DataFrame skip it.
+#
+# detail="full"     every slice is logged
+# detail="summary"  no slices, only the per-job records in CompletedJobs
+# detail="sampled"  every sample_every-th slice
+# detail="metrics"  neither slices nor per-job records, only CompletedJobs' running
+#                   totals (and the scheduler's RunMetrics, see scheduler/metrics.py)
+#
+# spill_to(writer, table) streams a log to disk instead (see log_writer.py): every
+# writer.batch_rows rows are handed to the writer and dropped, so memory stays bounded.
+
+DETAIL_LEVELS = ("full", "summary", "sampled", "metrics")
+
+
+class JobNames:
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def intern_many(self, names):
+        # codes for a list of distinct names; all-new names skip the per-name lookups
+        if not self.codes.keys().isdisjoint(names):
+            return [self.intern(name) for name in names]
+        start = len(self.names)
+        self.names.extend(names)
+        self.codes.update(zip(names, range(start, start + len(names))))
+        return range(start, start + len(names))
+
+    def categorical(self, codes):
+        import pandas as pd
+
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.names, dtype=object))
+
+
+class ColumnLog:
+    # (DataFrame column, array typecode, numpy dtype); the first column holds job codes
+    columns = ()
+
+    def __init__(self, job_names=None):
+        self.job_names = job_names if job_names is not None else JobNames()
+        self._arrays = [array(typecode) for _, typecode, _ in self.columns]
+        self._exported = False
+        self._bind()
+        self.flushed = 0  # rows already handed to a writer (or dropped, see CompletedJobs)
+        self._writer = None
+        self._table = None
+        # appends left before a full batch is flushed (at the next append, so the
+        # newest row stays readable); stays negative without a writer
+        self._room = -1
+
+    def _bind(self):
+        # subclasses keep bound appends of the current arrays
+        pass
+
+    def _detach(self):
+        self._arrays = [array(values.typecode, values) for values in self._arrays]
+        self._exported = False
+        self._bind()
+
+    def __len__(self):
+        return len(self._arrays[0])
+
+    @property
+    def rows(self):
+        # resident plus spilled rows
+        return self.flushed + len(self)
+
+    def spill_to(self, writer, table):
+        self._writer = writer
+        self._table = table
+        self.flush()
+
+    def flush(self):
+        if self._writer is None:
+            return
+        if len(self):
+            self._writer.write(self._table, self)
+            self.flushed += len(self)
+            self._arrays = [array(values.typecode) for values in self._arrays]
+            self._exported = False
+            self._bind()
+        self._room = self._writer.batch_rows
+
+    def _extend(self, columns):
+        # whole numpy columns at once, cut at the same batch boundaries as append
+        count = len(columns[0])
+        done = 0
+        while done < count:
+            if not self._room:
+                self.flush()
+            if self._exported:
+                self._detach()
+            take = count - done if self._room < 0 else min(self._room, count - done)
+            for values, column, (_, _, dtype) in zip(self._arrays, columns, self.columns):
+                values.frombytes(np.ascontiguousarray(column[done:done + take], dtype=dtype).tobytes())
+            done += take
+            if self._room > 0:
+                self._room -= take
+
+    def column(self, name):
+        # zero-copy numpy view of one column (job codes for the first one)
+        for i, (column, _, dtype) in enumerate(self.columns):
+            if column == name:
+                values = self._arrays[i]
+                if not len(values):
+                    return np.empty(0, dtype=dtype)
+                self._exported = True
+                return np.frombuffer(values, dtype=dtype)
+        raise KeyError(name)
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        data = {name: self.column(name) for name, _, _ in self.columns}
+        job_column = self.columns[0][0]
+        data[job_column] = self.job_names.categorical(data[job_column])
+        return pd.DataFrame(data, copy=False)
+
+    def _decode(self, values):
+        row = {}
+        for (name, _, dtype), value in zip(self.columns, values):
+            row[name] = bool(value) if dtype is np.bool_ else value
+        row[self.columns[0][0]] = self.job_names.names[values[0]]
+        return row
+
+    def __getitem__(self, i):
+        return self._decode([column[i] for column in self._arrays])
+
+    def __iter__(self):
+        for values in zip(*(column.tolist() for column in self._arrays)):
+            yield self._decode(values)
+
+
+class ExecutionLog(ColumnLog):
+    slice_columns = (
+        ("Job", "i", np.int32),
+        ("Start", "d", np.float64),
+        ("Finish", "d", np.float64),
+        ("Time Slice", "d", np.float64),
+        ("Remaining Time", "d", np.float64),
+        ("Completed", "b", np.bool_),
+        ("Core", "h", np.int16),
+        ("Migrated", "b", np.bool_),
+    )
+    quantum_column = ("Quantum Used", "d", np.float64)
+
+    def __init__(self, job_names=None, detail="full", sample_every=100, logs_quantum=False):
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"detail must be one of {DETAIL_LEVELS}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.detail = detail
+        self.logs_quantum = logs_quantum
+        self.columns = self.slice_columns + ((self.quantum_column,) if logs_quantum else ())
+        # keep every stride-th slice; 0 keeps none
+        self._stride = {"full": 1, "summary": 0, "sampled": sample_every, "metrics": 0}[detail]
+        self.slices = 0  # slices seen, logged or not
+        self.logs_slices = self._stride != 0
+        super().__init__(job_names)
+
+    def _bind(self):
+        self._appends = [values.append for values in self._arrays]
+
+    def append(self, job, start, finish, time_slice, remaining, quantum, completed, core, migrated):
+        seen = self.slices
+        self.slices = seen + 1
+        stride = self._stride
+        if stride != 1 and (not stride or seen % stride):
+            return
+        if not self._room:
+            self.flush()
+        if self._exported:
+            self._detach()
+        appends = self._appends
+        appends[0](job)
+        appends[1](start)
+        appends[2](finish)
+        appends[3](time_slice)
+        appends[4](remaining)
+        appends[5](completed)
+        appends[6](core)
+        appends[7](migrated)
+        if self.logs_quantum:
+            appends[8](quantum)
+        self._room -= 1
+
+    def skip(self, count):
+        # count slices without a call each, where none are logged (summary, metrics)
+        if self.logs_slices:
+            raise ValueError("only a log that keeps no slices can skip them")
+        self.slices += count
+
+    def extend(self, job, start, finish, time_slice, remaining, quantum, completed, core, migrated):
+        # append for arrays of slices (see scheduler/batch_engine.py)
+        seen = self.slices
+        self.slices = seen + len(job)
+        stride = self._stride
+        if not stride:
+            return
+        columns = [job, start, finish, time_slice, remaining, completed, core, migrated]
+        if self.logs_quantum:
+            columns.append(quantum)
+        if stride != 1:
+            keep = (np.arange(seen, seen + len(job)) % stride) == 0
+            columns = [np.asarray(column)[keep] for column in columns]
+        self._extend(columns)
+
+
+class CompletedJobs(ColumnLog):
+    # One record per finished job; iterating yields the same dicts completed_jobs used to hold.
+    columns = (
+        ("name", "i", np.int32),
+        ("arrival_time", "d", np.float64),
+        ("start_time", "d", np.float64),
+        ("completion_time", "d", np.float64),
+        ("turnaround_time", "d", np.float64),
+        ("waiting_time", "d", np.float64),
+        ("burst_time", "d", np.float64),
+        ("Core", "h", np.int16),
+    )
+
+    def __init__(self, job_names=None, keep=True):
+        super().__init__(job_names)
+        # keep=False counts records into flushed without storing them (detail="metrics")
+        self.keep = keep
+        # running totals, so averages survive spilling
+        self.turnaround_total = 0.0
+        self.waiting_total = 0.0
+
+    def _bind(self):
+        self._appends = [values.append for values in self._arrays]
+
+    def append(self, job, arrival_time, start_time, completion_time, burst_time, core):
+        if not self.keep:
+            turnaround_time = completion_time - arrival_time
+            self.turnaround_total += turnaround_time
+            self.waiting_total += turnaround_time - burst_time
+            self.flushed += 1
+            return
+        if not self._room:
+            self.flush()
+        if self._exported:
+            self._detach()
+        turnaround_time = completion_time - arrival_time
+        waiting_time = turnaround_time - burst_time
+        appends = self._appends
+        appends[0](job)
+        appends[1](arrival_time)
+        appends[2](start_time)
+        appends[3](completion_time)
+        appends[4](turnaround_time)
+        appends[5](waiting_time)
+        appends[6](burst_time)
+        appends[7](core)
+        self.turnaround_total += turnaround_time
+        self.waiting_total += waiting_time
+        self._room -= 1
+
+    def extend(self, job, arrival_time, start_time, completion_time, burst_time, core):
+        # append for arrays of jobs (see scheduler/batch_engine.py)
+        turnaround_time = completion_time - arrival_time
+        waiting_time = turnaround_time - burst_time
+        self.turnaround_total += float(turnaround_time.sum())
+        self.waiting_total += float(waiting_time.sum())
+        if not self.keep:
+            self.flushed += len(job)
+            return
+        self._extend([job, arrival_time, start_time, completion_time, turnaround_time, waiting_time, burst_time,
+                      core])
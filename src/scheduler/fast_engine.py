@@ -0,0 +1,330 @@
+import heapq
+from collections import deque
+from .order_stats import get_quantum_statistic, make_order_statistics
+from .execution_log import JobNames, ExecutionLog, CompletedJobs
+from .metrics import RunMetrics
+from .batch_engine import BatchEngine, POLICIES as BATCH_POLICIES
+
+# SimPy-free engine for the round robin family.  Instead of one SimPy process per
+# job competing for a Resource, a single loop pops arrival and slice-end events off
+# a binary heap (one core needs no heap, see _run_single_core) and asks the policy
+# which job runs next.  completed_jobs and execution_log hold the same records as
+# the simpy engine.  Events at the same instant are taken in SimPy's order, so the
+# slice logs are identical, including which core ran each slice.  FCFS and SJF
+# need no event loop at all; make_fast_engine hands them to BatchEngine
+# (scheduler/batch_engine.py), which has the same interface.
+
+# event kinds of the multi-core loop
+ARRIVAL = 0
+WORK = 1  # wakes the idle cores
+REQ = 2  # a core is granted to the job it picked
+SLICE_END = 3
+
+
+class RoundRobinPolicy:
+    logs_quantum = False
+    fixed_quantum = True  # lets FastEngine use the deque directly instead of pop/requeue
+
+    def __init__(self, time_quantum):
+        if time_quantum <= 0:
+            raise ValueError("time_quantum must be positive")
+        self.time_quantum = time_quantum
+        self.ready_queue = deque()
+
+    def push(self, job):
+        self.ready_queue.append(job)
+
+    def pop(self):
+        return self.ready_queue.popleft(), self.time_quantum
+
+    def requeue(self, job, quantum):
+        self.ready_queue.append(job)
+
+
+class AdaptiveRoundRobinPolicy:
+    logs_quantum = True
+    fixed_quantum = False
+
+    def __init__(self, initial_time_quantum, quantum_statistic="median", statistic_param=None, smoothing=0.6,
+                 min_quantum=5):
+        if initial_time_quantum <= 0 or min_quantum <= 0:
+            raise ValueError("initial_time_quantum and min_quantum must be positive")
+        if not 0 <= smoothing < 1:
+            raise ValueError("smoothing must be in [0, 1)")
+        self.initial_time_quantum = initial_time_quantum
+        self.prev_quantum = initial_time_quantum
+        self.smoothing = smoothing
+        self.min_quantum = min_quantum
+        # a plain deque (which FastEngine tests for emptiness on every event) with the
+        # remaining times' order statistics kept alongside, rather than a TrackedQueue
+        self.ready_queue = deque()
+        self.stats = make_order_statistics(quantum_statistic, statistic_param)
+        self.quantum_statistic = get_quantum_statistic(quantum_statistic, statistic_param)
+
+    def push(self, job):
+        self.ready_queue.append(job)
+        self.stats.add(job[1])
+
+    def pop(self):
+        # Quantum Adjustment (same rule as AdaptiveRoundRobinScheduler)
+        statistic = self.quantum_statistic(self.stats)
+        new_quantum = (self.smoothing * self.prev_quantum) + ((1 - self.smoothing) * statistic)
+        adaptive_quantum = max(self.min_quantum, int(new_quantum))
+        self.prev_quantum = adaptive_quantum
+
+        job = self.ready_queue.popleft()
+        self.stats.remove(job[1])
+        return job, adaptive_quantum
+
+    def requeue(self, job, quantum):
+        if job[1] < quantum:
+            self.ready_queue.appendleft(job)
+        else:
+            self.ready_queue.append(job)
+        self.stats.add(job[1])
+
+
+class FastEngine:
+    def __init__(self, policy, cores=1, detail="full", sample_every=100):
+        if cores < 1:
+            raise ValueError("cores must be at least 1")
+        self.policy = policy
+        self.cores = cores
+        self.now = 0
+        self.job_names = JobNames()
+        self.completed_jobs = CompletedJobs(self.job_names, keep=detail != "metrics")
+        self.execution_log = ExecutionLog(self.job_names, detail, sample_every, policy.logs_quantum)
+        self.metrics = RunMetrics(cores)
+        self.slices = 0
+        self.busy_time = [0.0] * cores
+        self.dispatches = [0] * cores
+        self.migrations = [0] * cores
+
+    def run(self, workload, last_completion_time=0):
+        # workload: iterable of (arrival_time, job_id, priority, burst_time), time ordered.
+        # Arrivals are pulled lazily so only the next one sits in the heap.
+        if self.cores == 1:
+            return self._run_single_core(workload, last_completion_time)
+        # This loop is the hot path, hence the local aliases and inlined bookkeeping.
+        # Multiple cores share one global ready queue.  Events at the same instant are
+        # taken in the order DispatcherScheduler's SimPy processes see them: a core picks
+        # its next job as soon as it is free and is granted the core in a separate event
+        # (REQ) that schedules the slice end, while idle cores wait in the order they went
+        # idle and are all woken by the WORK event the next arrival triggers.
+        policy = self.policy
+        ready_queue = policy.ready_queue
+        push, pop, requeue = policy.push, policy.pop, policy.requeue
+        fixed_quantum = policy.time_quantum if policy.fixed_quantum else None
+        popleft, append = ready_queue.popleft, ready_queue.append
+        intern = self.job_names.intern
+        log = self.execution_log.append
+        complete = self.completed_jobs.append
+        add_slice, add_job = self.metrics.add_slice, self.metrics.add_job
+        heappush, heappop = heapq.heappush, heapq.heappop
+        busy_time, dispatches, migrations = self.busy_time, self.dispatches, self.migrations
+
+        events = []  # (time, seq, kind, payload); seq keeps SimPy's scheduling order
+        seq = 0
+        slices = 0
+        now = self.now
+        waiters = []  # idle cores, in the order they went idle
+        work_triggered = False
+        arrivals = iter(workload)
+        offset = None
+
+        def dispatch(core):
+            nonlocal seq, waiters, work_triggered
+            if not ready_queue:
+                if work_triggered:
+                    waiters, work_triggered = [], False
+                waiters.append(core)
+                return
+            if fixed_quantum is None:
+                job, quantum = pop()
+            else:
+                job, quantum = popleft(), fixed_quantum
+            time_slice = quantum if quantum < job[1] else job[1]
+            migrated = job[4] is not None and job[4] != core
+            if migrated:
+                migrations[core] += 1
+            job[4] = core
+            dispatches[core] += 1
+            heappush(events, (now, seq, REQ, (job, time_slice, quantum, core, migrated)))
+            seq += 1
+
+        for arrival_time, job_id, priority, burst_time in arrivals:
+            offset = last_completion_time - arrival_time
+            heappush(events, (max(now, arrival_time + offset), seq, ARRIVAL, (f"Job-{job_id}", burst_time)))
+            seq += 1
+            break
+        started = False
+
+        while events:
+            now, _, kind, payload = heappop(events)
+
+            if kind == REQ:
+                job, time_slice, quantum, core, migrated = payload
+                heappush(events, (now + time_slice, seq, SLICE_END, (job, now, time_slice, quantum, core, migrated)))
+                seq += 1
+            elif kind == SLICE_END:
+                job, start_time, time_slice, quantum, core, migrated = payload
+                busy_time[core] += time_slice
+                slices += 1
+                remaining_time = job[1] - time_slice
+                job[1] = remaining_time
+                completed = remaining_time <= 0
+
+                log(job[0], start_time, now, time_slice, remaining_time, quantum, completed, core, migrated)
+                add_slice(start_time, now)
+
+                if not completed:
+                    if fixed_quantum is None:
+                        requeue(job, quantum)
+                    else:
+                        append(job)
+                else:
+                    complete(job[0], job[2], start_time, now, job[3], core)
+                    add_job(job[2], now, job[3])
+                dispatch(core)
+            elif kind == WORK:
+                for core in payload:
+                    dispatch(core)
+            else:
+                name, burst_time = payload
+                # [job code, remaining_time, arrival_time, burst_time, last_core]
+                push([intern(name), burst_time, now, burst_time, None])
+                if not work_triggered:
+                    work_triggered = True
+                    if waiters:
+                        heappush(events, (now, seq, WORK, waiters))
+                        seq += 1
+                for arrival_time, job_id, priority, burst_time in arrivals:
+                    heappush(events, (max(now, arrival_time + offset), seq, ARRIVAL, (f"Job-{job_id}", burst_time)))
+                    seq += 1
+                    break
+                if not started:
+                    # the dispatchers start with the first arrival, ahead of any other event
+                    started = True
+                    for core in range(self.cores):
+                        dispatch(core)
+
+        self.now = now
+        self.slices += slices
+        return self
+
+    def _run_single_core(self, workload, last_completion_time):
+        # One core needs no event heap: besides the core's own slice end, the next
+        # arrival is the only pending event, so slices run back to back and arrivals
+        # are queued as they fall due.  Events at the same instant keep SimPy's order,
+        # the order they were scheduled in (seq): an arrival is scheduled when the one
+        # before it is processed, a slice end once its job has been picked and the core
+        # granted.  So an arrival at the instant a job is picked is queued before that
+        # slice end is scheduled, and one at the instant a slice ends is queued before
+        # the job is requeued only if it was scheduled before the slice started.
+        policy = self.policy
+        ready_queue = policy.ready_queue
+        push, pop, requeue = policy.push, policy.pop, policy.requeue
+        fixed_quantum = policy.time_quantum if policy.fixed_quantum else None
+        popleft, append = ready_queue.popleft, ready_queue.append
+        intern = self.job_names.intern
+        log = self.execution_log.append if self.execution_log.logs_slices else None
+        complete = self.completed_jobs.append
+        add_slice, add_job = self.metrics.add_slice, self.metrics.add_job
+
+        arrivals = iter(workload)
+        now = self.now
+        offset = None
+        # the next arrival: its time (None once there are no more), seq and (job_id, burst_time)
+        next_time = next_seq = next_job = None
+        seq = 0
+
+        def arrive():
+            # queue the next arrival and schedule the one after it
+            nonlocal next_time, next_seq, next_job, seq
+            job_id, burst_time = next_job
+            # [job code, remaining_time, arrival_time, burst_time, last_core]
+            push([intern(f"Job-{job_id}"), burst_time, next_time, burst_time, None])
+            arrived, next_time = next_time, None
+            for arrival_time, job_id, priority, burst_time in arrivals:
+                next_time, next_seq, next_job = max(arrived, arrival_time + offset), seq, (job_id, burst_time)
+                seq += 1
+                break
+
+        for arrival_time, job_id, priority, burst_time in arrivals:
+            offset = last_completion_time - arrival_time
+            next_time, next_seq, next_job = max(now, arrival_time + offset), seq, (job_id, burst_time)
+            seq += 1
+            break
+
+        busy = self.busy_time[0]
+        slices = 0
+        while ready_queue or next_time is not None:
+            if not ready_queue:
+                # idle until the next arrival, which the core picks up at once
+                now = next_time
+                arrive()
+            if fixed_quantum is None:
+                job, quantum = pop()
+            else:
+                job, quantum = popleft(), fixed_quantum
+            remaining_time = job[1]
+            time_slice = quantum if quantum < remaining_time else remaining_time
+            start_time = now
+            end = now + time_slice
+            if next_time == now:
+                arrive()
+            slice_seq = seq
+            seq += 1
+            while next_time is not None and (next_time < end or next_time == end and next_seq < slice_seq):
+                arrive()
+
+            now = end
+            remaining_time -= time_slice
+            job[1] = remaining_time
+            job[4] = 0
+            busy += time_slice
+            slices += 1
+            completed = remaining_time <= 0
+            if log is not None:
+                log(job[0], start_time, now, time_slice, remaining_time, quantum, completed, 0, False)
+            add_slice(start_time, now)
+            if not completed:
+                if fixed_quantum is None:
+                    requeue(job, quantum)
+                else:
+                    append(job)
+            else:
+                complete(job[0], job[2], start_time, now, job[3], 0)
+                add_job(job[2], now, job[3])
+
+        if log is None:
+            self.execution_log.skip(slices)
+        self.now = now
+        self.busy_time[0] = busy
+        self.dispatches[0] += slices
+        self.slices += slices
+        return self
+
+    def core_stats(self):
+        return [{
+            "core": core,
+            "busy_time": self.busy_time[core],
+            "utilization": self.busy_time[core] / self.now if self.now > 0 else 0.0,
+            "dispatches": self.dispatches[core],
+            "migrations": self.migrations[core],
+        } for core in range(self.cores)]
+
+
+def make_fast_engine(scheduler_name, time_quantum=3, initial_time_quantum=2, cores=1,
+                     quantum_statistic="median", statistic_param=None, detail="full", sample_every=100,
+                     smoothing=0.6, min_quantum=5):
+    if scheduler_name in BATCH_POLICIES:
+        return BatchEngine(scheduler_name, cores, detail, sample_every)
+    if scheduler_name == "RoundRobin":
+        policy = RoundRobinPolicy(time_quantum)
+    elif scheduler_name == "AdaptiveRR":
+        policy = AdaptiveRoundRobinPolicy(initial_time_quantum, quantum_statistic, statistic_param, smoothing,
+                                          min_quantum)
+    else:
+        raise ValueError(f"The fast engine only supports FCFS, SJF, RoundRobin and AdaptiveRR, not {scheduler_name}")
+    return FastEngine(policy, cores, detail, sample_every)
@@ -0,0 +1,174 @@
+import sys
+import time
+from array import array
+
+# Optional run instrumentation for the SimPy schedulers.  Nothing here runs unless an
+# Instrumentation is attached: schedulers only test `self.instruments is not None`
+# once per dispatch, so a plain run pays a few attribute checks per slice.
+#
+# Once attached it records
+#   events         SimPy events processed (counted by wrapping env.step)
+#   dispatches / context_switches / preemptions
+#   dispatch latency   simulated time a job spent ready before each of its slices
+#   ready-queue length at every queue_sample_every-th dispatch, plus its time-weighted mean
+#   scheduler_time     wall time spent in scheduler code (submit and the dispatcher
+#                      processes); the rest of env.run() is the SimPy kernel and workload feed
+# and, with progress_interval set, prints a progress line every progress_interval
+# wall-clock seconds (or passes snapshot() to callback instead, e.g. for a UI).
+
+
+class Instrumentation:
+    def __init__(self, progress_interval=None, queue_sample_every=1, stream=None, callback=None):
+        self.progress_interval = progress_interval
+        self.queue_sample_every = max(1, queue_sample_every)
+        self.stream = stream
+        self.callback = callback
+
+        self.events = 0
+        self.dispatches = 0
+        self.context_switches = 0
+        self.preemptions = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.scheduler_time = 0.0
+        self.wall_time = 0.0
+
+        self.queue_times = array("d")
+        self.queue_lengths = array("l")
+        self._queue_area = 0.0
+        self._queue_last = (0.0, 0)
+
+        self.env = None
+        self.scheduler = None
+        self._last_job = {}
+        self._started = None
+        self._running = False
+        self._last_report = None
+
+    def attach(self, env, scheduler):
+        self.env = env
+        self.scheduler = scheduler
+        scheduler.instruments = self
+
+        step = env.step
+        submit = scheduler.submit
+        clock = time.perf_counter
+
+        def counted_step():
+            self.events += 1
+            if self.progress_interval is not None and not self.events & 1023:
+                self._maybe_report()
+            step()
+
+        def timed_submit(*args, **kwargs):
+            start = clock()
+            try:
+                return submit(*args, **kwargs)
+            finally:
+                self.scheduler_time += clock() - start
+
+        env.step = counted_step
+        scheduler.submit = timed_submit
+        return self
+
+    def timed(self, generator):
+        # Wraps a SimPy process generator and charges the time spent inside it to
+        # scheduler_time; values and exceptions (e.g. simpy.Interrupt) pass through.
+        clock = time.perf_counter
+        send, throw = generator.send, generator.throw
+        value, error = None, None
+        while True:
+            start = clock()
+            try:
+                event = send(value) if error is None else throw(error)
+            except StopIteration as stop:
+                self.scheduler_time += clock() - start
+                return stop.value
+            self.scheduler_time += clock() - start
+            value, error = None, None
+            try:
+                value = yield event
+            except BaseException as exc:
+                error = exc
+
+    def run(self, until=None):
+        # env.run() with wall-clock accounting; use this instead of env.run() so
+        # wall_time, events_per_sec and kernel_time are filled in
+        self._started = self._last_report = time.perf_counter()
+        self._running = True
+        try:
+            return self.env.run(until)
+        finally:
+            self._running = False
+            self.wall_time += time.perf_counter() - self._started
+            if self.progress_interval is not None:
+                self.report()
+
+    def dispatched(self, now, core, job, queued):
+        self.dispatches += 1
+        latency = now - job.ready_at
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+        previous = self._last_job.get(core)
+        if previous is not None and previous is not job:
+            self.context_switches += 1
+        self._last_job[core] = job
+
+        last_time, last_length = self._queue_last
+        self._queue_area += last_length * (now - last_time)
+        self._queue_last = (now, queued)
+        if not (self.dispatches - 1) % self.queue_sample_every:
+            self.queue_times.append(now)
+            self.queue_lengths.append(queued)
+
+    def preempted(self):
+        self.preemptions += 1
+
+    def snapshot(self):
+        now = self.env.now if self.env is not None else 0.0
+        wall = self.wall_time
+        if self._running:
+            wall += time.perf_counter() - self._started
+        last_time, last_length = self._queue_last
+        queue_area = self._queue_area + last_length * (now - last_time)
+        completed = self.scheduler.completed_jobs.rows if self.scheduler is not None else 0
+
+        return {
+            "sim_time": now,
+            "wall_time": wall,
+            "events": self.events,
+            "events_per_sec": self.events / wall if wall > 0 else 0.0,
+            "dispatches": self.dispatches,
+            "completed_jobs": completed,
+            "context_switches": self.context_switches,
+            "preemptions": self.preemptions,
+            "mean_dispatch_latency": self.latency_total / self.dispatches if self.dispatches else 0.0,
+            "max_dispatch_latency": self.latency_max,
+            "mean_queue_length": queue_area / now if now > 0 else 0.0,
+            "scheduler_time": self.scheduler_time,
+            "kernel_time": max(0.0, wall - self.scheduler_time),
+        }
+
+    def queue_length_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({"time": self.queue_times, "queue_length": self.queue_lengths})
+
+    def report(self):
+        stats = self.snapshot()
+        if self.callback is not None:
+            self.callback(stats)
+            return
+        print(f"[progress] t={stats['sim_time']:.2f} | {stats['events']} events "
+              f"({stats['events_per_sec']:.0f}/s) | {stats['completed_jobs']} jobs done | "
+              f"{stats['dispatches']} dispatches, {stats['context_switches']} switches | "
+              f"queue {self._queue_last[1]} | scheduler {stats['scheduler_time']:.2f}s, "
+              f"kernel {stats['kernel_time']:.2f}s", file=self.stream or sys.stdout)
+
+    def _maybe_report(self):
+        now = time.perf_counter()
+        if self._last_report is not None and now - self._last_report >= self.progress_interval:
+            self._last_report = now
+            self.report()
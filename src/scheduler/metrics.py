@@ -0,0 +1,359 @@
+import math
+from array import array
+import numpy as np
+
+# Streaming run metrics.  Schedulers feed every slice and every finished job into a
+# RunMetrics as the run goes.  Its memory does not grow with the number of jobs, so
+# the figures are there even when completed_jobs is not kept (detail="metrics") or
+# is spilled to disk.  Everything merges: merge() combines the metrics of parallel
+# shards or replay windows, exactly for counts, sums and extremes and within
+# relative_accuracy for quantiles.
+#
+#   QuantileSketch  DDSketch-style histogram with logarithmic buckets: every
+#                   quantile is within relative_accuracy (1% by default) of the
+#                   value at that rank, and merging two sketches loses nothing
+#   TimeSeries      a fixed number of time buckets whose width doubles whenever the
+#                   run outgrows them; completions and busy time over time
+#   RunMetrics      waiting / turnaround / slowdown quantiles, throughput,
+#                   utilization and Jain's fairness index over per-job slowdowns
+#
+# add_slice / add_job only append to small array buffers; every BATCH_ROWS rows the
+# buffers are folded into the sketches with numpy, so the per-slice cost stays a
+# couple of appends.  Anything that reads or combines the metrics flushes first.
+#
+# Slowdown is bounded: turnaround / max(burst, slowdown_threshold), at least 1, so
+# the trace's 0.01-second idle jobs don't dominate it.
+
+# values at or below this land in the sketch's zero bucket (waiting times are often 0)
+MIN_VALUE = 1e-9
+BATCH_ROWS = 4096
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        self.add_many(np.array([value], dtype=np.float64))
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        positive = values[values > MIN_VALUE]
+        self.zeros += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+        bins = self.bins
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            bins[key] = bins.get(key, 0) + count
+        if len(bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        # fold the lowest buckets together; only the lowest quantiles lose accuracy
+        keys = sorted(self.bins)
+        keep = keys[len(keys) - self.max_bins]
+        for key in keys[:len(keys) - self.max_bins]:
+            self.bins[keep] += self.bins.pop(key)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative_accuracy can be merged")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        if not self.count:
+            return [math.nan for _ in qs]
+        keys = sorted(self.bins)
+        results = []
+        for q in qs:
+            rank = q * (self.count - 1)
+            seen = self.zeros
+            value = max(self.min, 0.0) if rank < seen else self.max
+            if rank >= seen:
+                for key in keys:
+                    seen += self.bins[key]
+                    if seen > rank:
+                        # the middle of the bucket, in relative terms
+                        value = 2 * self.gamma ** key / (self.gamma + 1)
+                        break
+            results.append(min(max(value, self.min), self.max))
+        return results
+
+
+class TimeSeries:
+    def __init__(self, buckets=512, width=1.0):
+        if buckets < 2 or buckets % 2:
+            raise ValueError("buckets must be an even number of at least 2")
+        self.buckets = buckets
+        self.width = width
+        self.values = np.zeros(buckets)
+        self.end = 0.0  # latest time seen
+
+    def _fit(self, time):
+        # double the bucket width until time is covered
+        while time >= self.width * self.buckets:
+            folded = self.values.reshape(-1, 2).sum(axis=1)
+            self.values = np.concatenate([folded, np.zeros(self.buckets // 2)])
+            self.width *= 2
+
+    def add_many(self, times, amounts=None):
+        times = np.maximum(np.asarray(times, dtype=np.float64), 0.0)
+        if not len(times):
+            return
+        self._fit(float(times.max()))
+        self.end = max(self.end, float(times.max()))
+        self.values += np.bincount((times / self.width).astype(np.int64), weights=amounts, minlength=self.buckets)
+
+    def add_intervals(self, starts, ends):
+        # busy time over each [start, end), split across the buckets it covers
+        starts = np.maximum(np.asarray(starts, dtype=np.float64), 0.0)
+        ends = np.asarray(ends, dtype=np.float64)
+        if not len(starts):
+            return
+        self._fit(float(ends.max()))
+        self.end = max(self.end, float(ends.max()))
+        first = (starts / self.width).astype(np.int64)
+        last = np.minimum((ends / self.width).astype(np.int64), self.buckets - 1)
+        within = first == last
+        self.values += np.bincount(first[within], weights=(ends - starts)[within], minlength=self.buckets)
+        for start, end in zip(starts[~within].tolist(), ends[~within].tolist()):
+            self.spread(start, end, end - start)
+
+    def spread(self, start, end, amount):
+        # amount over [start, end) in proportion to each bucket's share
+        start = max(0.0, start)
+        if end <= start:
+            if amount:
+                self.add_many([start], [amount])
+            return
+        self._fit(end)
+        self.end = max(self.end, end)
+        width = self.width
+        first, last = int(start / width), min(int(end / width), self.buckets - 1)
+        if first == last:
+            self.values[first] += amount
+            return
+        rate = amount / (end - start)
+        self.values[first] += ((first + 1) * width - start) * rate
+        self.values[first + 1:last] += width * rate
+        self.values[last] += (end - last * width) * rate
+
+    def merge(self, other):
+        if other.buckets != self.buckets:
+            raise ValueError("Only time series with the same number of buckets can be merged")
+        self._fit(other.width * other.buckets - other.width / 2)
+        for i in np.flatnonzero(other.values).tolist():
+            self.spread(i * other.width, (i + 1) * other.width, float(other.values[i]))
+        self.end = max(self.end, other.end)
+        return self
+
+    def shift(self, offset):
+        # move everything offset later; exact in total, within a bucket in time
+        values, width = self.values, self.width
+        self.values = np.zeros(self.buckets)
+        self.end = 0.0
+        for i in np.flatnonzero(values).tolist():
+            self.spread(i * width + offset, (i + 1) * width + offset, float(values[i]))
+        return self
+
+    def frame(self, name="value"):
+        import pandas as pd
+
+        used = min(self.buckets, int(self.end / self.width) + 1)
+        return pd.DataFrame({"time": np.arange(used) * self.width, name: self.values[:used]})
+
+
+class RunMetrics:
+    def __init__(self, cores=1, relative_accuracy=0.01, buckets=512, slowdown_threshold=1.0):
+        self.cores = cores
+        self.slowdown_threshold = slowdown_threshold
+        self.waiting = QuantileSketch(relative_accuracy)
+        self.turnaround = QuantileSketch(relative_accuracy)
+        self.slowdown = QuantileSketch(relative_accuracy)
+        self.slowdown_squares = 0.0  # for Jain's index
+        self.completions = TimeSeries(buckets)
+        self.busy_time = TimeSeries(buckets)
+        self.slices = 0
+        self.busy = 0.0
+        self.first_arrival = math.inf
+        self.last_completion = -math.inf
+        # unflushed rows: (start, end) per slice, (arrival, completion, burst) per job
+        self._slice_rows = array("d")
+        self._job_rows = array("d")
+
+    def __getstate__(self):
+        self.flush()
+        return self.__dict__
+
+    @property
+    def jobs(self):
+        return self.waiting.count + len(self._job_rows) // 3
+
+    def add_slice(self, start, end):
+        rows = self._slice_rows
+        rows.append(start)
+        rows.append(end)
+        if len(rows) >= 2 * BATCH_ROWS:
+            self._flush_slices()
+
+    def add_job(self, arrival_time, completion_time, burst_time):
+        rows = self._job_rows
+        rows.append(arrival_time)
+        rows.append(completion_time)
+        rows.append(burst_time)
+        if len(rows) >= 3 * BATCH_ROWS:
+            self._flush_jobs()
+
+    def add_slices(self, starts, ends):
+        # whole arrays at once (see scheduler/batch_engine.py)
+        if len(starts):
+            self._add_slices(np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64))
+
+    def add_jobs(self, arrival_times, completion_times, burst_times):
+        if len(arrival_times):
+            self._add_jobs(np.asarray(arrival_times, dtype=np.float64),
+                           np.asarray(completion_times, dtype=np.float64), np.asarray(burst_times, dtype=np.float64))
+
+    def flush(self):
+        self._flush_slices()
+        self._flush_jobs()
+
+    def _flush_slices(self):
+        if not self._slice_rows:
+            return
+        rows = np.frombuffer(self._slice_rows, dtype=np.float64).reshape(-1, 2)
+        self._add_slices(rows[:, 0], rows[:, 1])
+        self._slice_rows = array("d")
+
+    def _add_slices(self, starts, ends):
+        self.slices += len(starts)
+        self.busy += float((ends - starts).sum())
+        self.busy_time.add_intervals(starts, ends)
+
+    def _flush_jobs(self):
+        if not self._job_rows:
+            return
+        rows = np.frombuffer(self._job_rows, dtype=np.float64).reshape(-1, 3)
+        self._add_jobs(rows[:, 0], rows[:, 1], rows[:, 2])
+        self._job_rows = array("d")
+
+    def _add_jobs(self, arrivals, completions, bursts):
+        turnaround = completions - arrivals
+        slowdown = np.maximum(1.0, turnaround / np.maximum(bursts, self.slowdown_threshold))
+        self.turnaround.add_many(turnaround)
+        self.waiting.add_many(turnaround - bursts)
+        self.slowdown.add_many(slowdown)
+        self.slowdown_squares += float((slowdown * slowdown).sum())
+        self.completions.add_many(completions)
+        self.first_arrival = min(self.first_arrival, float(arrivals.min()))
+        self.last_completion = max(self.last_completion, float(completions.max()))
+
+    def merge(self, other, shard=False):
+        # shard=True: other ran on its own cores at the same time (a partition of a
+        # cluster), so the cores add up; otherwise it ran on the same cores
+        # (e.g. the next replay window).
+        self.flush()
+        other.flush()
+        self.waiting.merge(other.waiting)
+        self.turnaround.merge(other.turnaround)
+        self.slowdown.merge(other.slowdown)
+        self.slowdown_squares += other.slowdown_squares
+        self.completions.merge(other.completions)
+        self.busy_time.merge(other.busy_time)
+        self.slices += other.slices
+        self.busy += other.busy
+        self.first_arrival = min(self.first_arrival, other.first_arrival)
+        self.last_completion = max(self.last_completion, other.last_completion)
+        self.cores = self.cores + other.cores if shard else max(self.cores, other.cores)
+        return self
+
+    def shift(self, offset):
+        # for runs simulated from time 0 and placed later afterwards (see replay.py)
+        self.flush()
+        self.completions.shift(offset)
+        self.busy_time.shift(offset)
+        self.first_arrival += offset
+        self.last_completion += offset
+        return self
+
+    @property
+    def makespan(self):
+        self.flush()
+        return self.last_completion - self.first_arrival if self.jobs else 0.0
+
+    def fairness(self):
+        # Jain's index over per-job slowdowns: 1 when every job is slowed down equally
+        self.flush()
+        if not self.jobs or not self.slowdown_squares:
+            return math.nan
+        return self.slowdown.total ** 2 / (self.jobs * self.slowdown_squares)
+
+    def summary(self):
+        self.flush()
+        p50, p95, p99 = self.waiting.quantiles([0.5, 0.95, 0.99])
+        makespan = self.makespan
+        return {
+            "jobs": self.jobs,
+            "slices": self.slices,
+            "avg_turnaround": self.turnaround.mean,
+            "p99_turnaround": self.turnaround.quantile(0.99),
+            "avg_waiting": self.waiting.mean,
+            "p50_waiting": p50,
+            "p95_waiting": p95,
+            "p99_waiting": p99,
+            "max_waiting": self.waiting.max if self.jobs else math.nan,
+            "avg_slowdown": self.slowdown.mean,
+            "p99_slowdown": self.slowdown.quantile(0.99),
+            "fairness": self.fairness(),
+            "makespan": makespan,
+            "throughput": self.jobs / makespan if makespan > 0 else math.nan,
+            "utilization": self.busy / (self.cores * makespan) if makespan > 0 else 0.0,
+        }
+
+    def timeline(self):
+        # completions and utilization per time bucket
+        self.flush()
+        width = max(self.completions.width, self.busy_time.width)
+        for series in (self.completions, self.busy_time):
+            series._fit(width * series.buckets - width / 2)
+        frame = self.completions.frame("completed")
+        busy = self.busy_time.frame("busy")
+        frame = frame.merge(busy, on="time", how="outer").fillna(0.0)
+        frame["throughput"] = frame["completed"] / width
+        frame["utilization"] = frame["busy"] / (width * self.cores)
+        return frame
@@ -0,0 +1,127 @@
+from collections import deque
+from .base import DispatcherScheduler
+from .priority import borg_band, MONITORING, PRODUCTION, MID, BEST_EFFORT, FREE
+
+# Multilevel feedback queue.  Level 0 runs first; level i has a quantum of
+# base_quantum * 2**i.  A job starts at the level of its Borg priority band and moves
+# down one level once it has used up its current level's quantum, however many
+# slices that took, so yielding early cannot keep a job on top.  Every
+# boost_interval time units every queued job goes back to level 0, so nothing
+# starves.  A newly arrived job preempts a running job on a lower level.
+#
+# A bitmap with bit i set while level i is non-empty finds the highest non-empty
+# level with one bit trick, so push, pop and requeue are O(1) however many jobs are
+# queued; a boost moves whole deques.
+
+BAND_LEVELS = {MONITORING: 0, PRODUCTION: 0, MID: 1, BEST_EFFORT: 2, FREE: 3}
+
+
+class MultilevelReadyQueue:
+    def __init__(self, levels=8, base_quantum=3, boost_interval=None, clock=None):
+        if levels < 1:
+            raise ValueError("levels must be at least 1")
+        if base_quantum <= 0:
+            raise ValueError("base_quantum must be positive")
+        self.queues = [deque() for _ in range(levels)]
+        self.quanta = [base_quantum * 2 ** level for level in range(levels)]
+        self.bitmap = 0
+        self.size = 0
+        self.boost_interval = boost_interval
+        self.clock = clock
+        # the boost clock starts with the first job, so a run shifted in time (a
+        # replay window) boosts at the same points of its own schedule
+        self.next_boost = None
+
+    def __len__(self):
+        return self.size
+
+    def initial_level(self, priority):
+        return min(BAND_LEVELS[borg_band(priority)], len(self.queues) - 1)
+
+    def push(self, job):
+        if self.next_boost is None and self.boost_interval:
+            self.next_boost = self.clock() + self.boost_interval
+        if job.policy_state is None:
+            # [level, time used at that level, remaining_time when last dispatched]
+            job.policy_state = [self.initial_level(job.priority), 0.0, job.remaining_time]
+        self._append(job.policy_state[0], job)
+
+    def _append(self, level, job):
+        self.queues[level].append(job)
+        self.bitmap |= 1 << level
+        self.size += 1
+
+    def pop(self):
+        if self.boost_interval and self.clock() >= self.next_boost:
+            self.boost()
+            self.next_boost = self.clock() + self.boost_interval
+
+        bitmap = self.bitmap
+        level = (bitmap & -bitmap).bit_length() - 1  # lowest set bit
+        queue = self.queues[level]
+        job = queue.popleft()
+        if not queue:
+            self.bitmap = bitmap & ~(1 << level)
+        self.size -= 1
+
+        state = job.policy_state
+        if state[0] != level:
+            # boosted since it was queued
+            state[0] = level
+            state[1] = 0.0
+        state[2] = job.remaining_time
+        quantum = self.quanta[level]
+        return job, min(quantum - state[1], job.remaining_time), quantum
+
+    def requeue(self, job, quantum):
+        state = job.policy_state
+        level = state[0]
+        state[1] += state[2] - job.remaining_time
+        if state[1] >= self.quanta[level] - 1e-9:
+            state[1] = 0.0
+            if level < len(self.queues) - 1:
+                state[0] = level + 1
+        self._append(state[0], job)
+
+    def take(self):
+        # from the lowest non-empty level, the cheapest job to move
+        level = self.bitmap.bit_length() - 1
+        queue = self.queues[level]
+        job = queue.pop()
+        if not queue:
+            self.bitmap &= ~(1 << level)
+        self.size -= 1
+        return job
+
+    def boost(self):
+        top = self.queues[0]
+        for queue in self.queues[1:]:
+            top.extend(queue)
+            queue.clear()
+        self.bitmap = 1 if top else 0
+
+    def running_level(self, job):
+        return job.policy_state[0] if job.policy_state is not None else self.initial_level(job.priority)
+
+
+class MLFQScheduler(DispatcherScheduler):
+    preemptive = True
+    # "Quantum Used" is the quantum of the level the slice ran at
+    logs_quantum = True
+
+    def __init__(self, env, cpu, levels=8, base_quantum=3, boost_interval=100, detail="full", sample_every=100,
+                 verbose=True):
+        self.levels = levels
+        self.base_quantum = base_quantum
+        self.boost_interval = boost_interval
+        super().__init__(env, cpu, detail, sample_every, verbose)
+
+    def make_ready_queue(self):
+        return MultilevelReadyQueue(self.levels, self.base_quantum, self.boost_interval, lambda: self.env.now)
+
+    def should_preempt(self, new_job, running_job, remaining_time):
+        queue = self.ready_queue
+        return queue.initial_level(new_job.priority) < queue.running_level(running_job)
+
+    def on_preempt(self, job, by_job):
+        print(f"[{round(self.env.now, 2)}] Preempting Process-{job.name} for Process-{by_job.name}")
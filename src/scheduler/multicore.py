@@ -0,0 +1,127 @@
+import simpy
+from collections import deque
+
+# N-core CPU model.  It is used like a simpy.Resource (`with cpu.request(job, core) as
+# req: yield req`), but every request names the core it runs on, and the model tracks
+# how busy every core was and how often a job moved between cores.
+#
+# Which job runs on which core is decided by the scheduler's dispatchers (see
+# scheduler/base.py), one per core: they own the ready queues and the balancing.  The
+# queue and balancing settings are kept here only as the configuration they read:
+#
+# queue="global"   one shared ready queue; any idle core takes the next job.
+# queue="per_core" every core has its own ready queue.  New jobs go to the least
+#                  loaded core, preempted jobs stay on the core they ran on.
+#                  balancing="steal" lets an idle core take work from the longest
+#                  queue, balancing="rebalance" evens the queues out every
+#                  rebalance_interval time units, balancing=None does neither.
+
+QUEUE_MODES = ("global", "per_core")
+BALANCING_MODES = (None, "steal", "rebalance")
+
+
+class CoreRequest(simpy.Event):
+    def __init__(self, cpu, job):
+        super().__init__(cpu.env)
+        self.cpu = cpu
+        self.job = job
+        self.core = None
+        self.migrated = False
+        self.granted_at = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cpu.release(self)
+        return None
+
+
+class MultiCoreCPU:
+    def __init__(self, env, cores=1, queue="global", balancing="steal", rebalance_interval=10):
+        if cores < 1:
+            raise ValueError("cores must be at least 1")
+        if queue not in QUEUE_MODES:
+            raise ValueError(f"queue must be one of {QUEUE_MODES}")
+        if balancing not in BALANCING_MODES:
+            raise ValueError(f"balancing must be one of {BALANCING_MODES}")
+
+        self.env = env
+        self.cores = cores
+        self.capacity = cores
+        self.queue = queue
+        self.balancing = balancing
+        self.rebalance_interval = rebalance_interval
+
+        self.running = [None] * cores
+        self.waiting = [deque() for _ in range(cores)]
+        self.busy_time = [0.0] * cores
+        self.dispatches = [0] * cores
+        self.migrations = [0] * cores
+        self.last_core = {}
+
+    def request(self, job, core):
+        # granted at once if the core is free, else when its current request is released
+        req = CoreRequest(self, job)
+        if self.running[core] is None:
+            self._grant(req, core)
+        else:
+            self.waiting[core].append(req)
+        return req
+
+    def release(self, req):
+        if req.core is None:
+            # never granted (e.g. the waiting process was interrupted)
+            for waiting in self.waiting:
+                if req in waiting:
+                    waiting.remove(req)
+            return
+
+        core = req.core
+        if self.running[core] is not req:
+            return
+        self.busy_time[core] += self.env.now - req.granted_at
+        self.running[core] = None
+        if self.waiting[core]:
+            self._grant(self.waiting[core].popleft(), core)
+
+    def _grant(self, req, core):
+        req.core = core
+        req.granted_at = self.env.now
+        previous = self.last_core.get(req.job)
+        if req.job is not None and previous is not None and previous != core:
+            req.migrated = True
+            self.migrations[core] += 1
+        if req.job is not None:
+            self.last_core[req.job] = core
+        self.running[core] = req
+        self.dispatches[core] += 1
+        req.succeed()
+
+    def core_stats(self):
+        now = self.env.now
+        stats = []
+        for core in range(self.cores):
+            busy = self.busy_time[core]
+            if self.running[core] is not None:
+                busy += now - self.running[core].granted_at
+            stats.append({
+                "core": core,
+                "busy_time": busy,
+                "utilization": busy / now if now > 0 else 0.0,
+                "dispatches": self.dispatches[core],
+                "migrations": self.migrations[core],
+            })
+        return stats
+
+
+def request_cpu(cpu, job, core=0):
+    # Schedulers accept either a plain simpy.Resource or a MultiCoreCPU.
+    if isinstance(cpu, MultiCoreCPU):
+        return cpu.request(job, core)
+    return cpu.request()
+
+
+def placement(req):
+    # (core, migrated) for a granted request; a plain simpy.Resource always runs on core 0
+    return getattr(req, "core", 0) or 0, getattr(req, "migrated", False)
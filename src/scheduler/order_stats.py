@@ -0,0 +1,403 @@
+import math
+import random
+from heapq import heappush, heappop, heapify
+from collections import deque
+
+# Running order statistics for AdaptiveRR's quantum update, one structure per kind of
+# statistic so each dispatch pays only for what it reads:
+#
+#   RunningSum        mean: a count and a total
+#   PercentileHeaps   median or one fixed percentile: two heaps split at the
+#                     percentile's rank, so add and remove are a few heapq calls
+#   OrderStatistics   trimmed mean (and anything else): an indexable skip list where
+#                     every link stores how many nodes it skips (width) and the sum of
+#                     the values it skips, so insert, remove, k-th smallest and prefix
+#                     sums are all O(log n)
+#
+# All of them compute a statistic exactly as OrderStatistics does, to the last bit.
+
+
+class _Node:
+    __slots__ = ("value", "next", "width", "sum")
+
+    def __init__(self, value, levels):
+        self.value = value
+        self.next = [None] * levels
+        self.width = [0] * levels
+        self.sum = [0.0] * levels
+
+
+class OrderStatistics:
+    # Only the lowest self.level levels are walked: the tallest node so far sets it,
+    # so every operation costs O(log n) steps for the n values held, not max_levels.
+    # Head links above self.level are stale until a taller node raises it again.
+    def __init__(self, max_levels=24, seed=0):
+        self.max_levels = max_levels
+        self.level = 1
+        self.size = 0
+        self.total = 0.0
+        self._random = random.Random(seed)
+        self._tail = _Node(math.inf, 0)
+        self._head = _Node(None, max_levels)
+        self._head.next[0] = self._tail
+        self._head.width[0] = 1
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self):
+        # geometric(1/2), capped at max_levels: one plus the number of trailing 1 bits
+        bits = self._random.getrandbits(32)
+        return min(self.max_levels, (~bits & (bits + 1)).bit_length())
+
+    def add(self, value):
+        head = self._head
+        levels = self._random_level()
+        if levels > self.level:
+            # a new top level: the head's link there spans the whole list
+            for level in range(self.level, levels):
+                head.next[level] = self._tail
+                head.width[level] = self.size + 1
+                head.sum[level] = self.total
+            self.level = levels
+        top = self.level
+
+        chain = [None] * top
+        steps_at_level = [0] * top
+        sums_at_level = [0.0] * top
+        node = head
+        for level in range(top - 1, -1, -1):
+            steps = 0
+            sums = 0.0
+            following = node.next[level]
+            while following.value <= value:
+                steps += node.width[level]
+                sums += node.sum[level]
+                node = following
+                following = node.next[level]
+            chain[level] = node
+            steps_at_level[level] = steps
+            sums_at_level[level] = sums
+
+        new = _Node(value, levels)
+        steps = 0
+        sums = 0.0
+        for level in range(levels):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            new.sum[level] = prev.sum[level] - sums
+            prev.width[level] = steps + 1
+            prev.sum[level] = sums + value
+            steps += steps_at_level[level]
+            sums += sums_at_level[level]
+        for level in range(levels, top):
+            chain[level].width[level] += 1
+            chain[level].sum[level] += value
+
+        self.size += 1
+        self.total += value
+
+    def remove(self, value):
+        top = self.level
+        chain = [None] * top
+        node = self._head
+        for level in range(top - 1, -1, -1):
+            following = node.next[level]
+            while following.value < value:
+                node = following
+                following = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target.value != value:
+            raise KeyError(value)
+
+        levels = len(target.next)
+        for level in range(levels):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.sum[level] += target.sum[level] - value
+            prev.next[level] = target.next[level]
+        for level in range(levels, top):
+            chain[level].width[level] -= 1
+            chain[level].sum[level] -= value
+
+        head, tail = self._head, self._tail
+        while top > 1 and head.next[top - 1] is tail:
+            top -= 1
+        self.level = top
+        self.size -= 1
+        self.total -= value
+
+    def select(self, k):
+        # k-th smallest value, 0-based
+        if not 0 <= k < self.size:
+            raise IndexError(k)
+        node = self._head
+        i = k + 1
+        for level in range(self.level - 1, -1, -1):
+            while node.width[level] <= i:
+                i -= node.width[level]
+                node = node.next[level]
+        return node.value
+
+    def prefix_sum(self, k):
+        # sum of the k smallest values
+        node = self._head
+        remaining = k
+        total = 0.0
+        for level in range(self.level - 1, -1, -1):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                total += node.sum[level]
+                node = node.next[level]
+        return total
+
+    def percentile(self, p):
+        # linear interpolation between closest ranks, like np.percentile
+        if not self.size:
+            raise ValueError("percentile of an empty collection")
+        pos = (self.size - 1) * p / 100
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, self.size - 1)
+        a, b = self.select(lo), self.select(hi)
+        return a + (b - a) * (pos - lo)
+
+    def median(self):
+        if not self.size:
+            raise ValueError("median of an empty collection")
+        mid = self.size // 2
+        if self.size % 2:
+            return self.select(mid)
+        return (self.select(mid - 1) + self.select(mid)) / 2
+
+    def mean(self):
+        if not self.size:
+            raise ValueError("mean of an empty collection")
+        return self.total / self.size
+
+    def trimmed_mean(self, proportion=0.1):
+        # drop int(proportion * n) values from each end, like scipy.stats.trim_mean
+        if not self.size:
+            raise ValueError("trimmed mean of an empty collection")
+        cut = int(proportion * self.size)
+        if 2 * cut >= self.size:
+            return self.median()
+        return (self.prefix_sum(self.size - cut) - self.prefix_sum(cut)) / (self.size - 2 * cut)
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not self._tail:
+            yield node.value
+            node = node.next[0]
+
+
+class RunningSum:
+    def __init__(self):
+        self.size = 0
+        self.total = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value):
+        self.size += 1
+        self.total += value
+
+    def remove(self, value):
+        self.size -= 1
+        self.total -= value
+
+    def mean(self):
+        if not self.size:
+            raise ValueError("mean of an empty collection")
+        return self.total / self.size
+
+
+class PercentileHeaps:
+    # low holds the floor((n - 1) * p / 100) + 1 smallest values, negated so its top is
+    # the largest of them, and high the rest: the percentile interpolates between the
+    # two tops.  Removal is lazy: a removed value is counted in its heap's removed dict
+    # and popped once it reaches the top, and the heaps are rebuilt if removed values
+    # come to outnumber the live ones.  remove() must be given a value that was added.
+    def __init__(self, p=50):
+        if not 0 <= p <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.p = p
+        self.size = 0
+        self.total = 0.0
+        self._low = []
+        self._high = []
+        self._low_size = 0
+        self._removed_low = {}
+        self._removed_high = {}
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def _prune(heap, removed):
+        while removed and heap:
+            count = removed.get(heap[0])
+            if not count:
+                return
+            if count == 1:
+                del removed[heap[0]]
+            else:
+                removed[heap[0]] = count - 1
+            heappop(heap)
+
+    def add(self, value):
+        low = self._low
+        if self._removed_low:
+            self._prune(low, self._removed_low)
+        if self._low_size and value > -low[0]:
+            heappush(self._high, value)
+        else:
+            heappush(low, -value)
+            self._low_size += 1
+        self.size += 1
+        self.total += value
+        self._balance()
+
+    def remove(self, value):
+        low = self._low
+        if self._removed_low:
+            self._prune(low, self._removed_low)
+        if value <= -low[0]:
+            self._removed_low[-value] = self._removed_low.get(-value, 0) + 1
+            self._low_size -= 1
+        else:
+            self._removed_high[value] = self._removed_high.get(value, 0) + 1
+        self.size -= 1
+        self.total -= value
+        self._balance()
+        if len(low) + len(self._high) > 2 * self.size + 64:
+            self._compact()
+
+    def _balance(self):
+        size = self.size
+        # int() is floor here: the rank is never negative
+        need = int((size - 1) * self.p / 100) + 1 if size else 0
+        while self._low_size > need:
+            if self._removed_low:
+                self._prune(self._low, self._removed_low)
+            heappush(self._high, -heappop(self._low))
+            self._low_size -= 1
+        while self._low_size < need:
+            if self._removed_high:
+                self._prune(self._high, self._removed_high)
+            heappush(self._low, -heappop(self._high))
+            self._low_size += 1
+
+    def _compact(self):
+        for heap, removed in ((self._low, self._removed_low), (self._high, self._removed_high)):
+            live = []
+            for value in heap:
+                count = removed.get(value)
+                if count:
+                    removed[value] = count - 1
+                else:
+                    live.append(value)
+            heapify(live)
+            heap[:] = live
+            removed.clear()
+
+    def _tops(self):
+        # (k-th, (k + 1)-th) smallest, k = floor((n - 1) * p / 100); the same value twice at the end
+        if self._removed_low:
+            self._prune(self._low, self._removed_low)
+        lo = -self._low[0]
+        if self._low_size == self.size:
+            return lo, lo
+        if self._removed_high:
+            self._prune(self._high, self._removed_high)
+        return lo, self._high[0]
+
+    def percentile(self, p):
+        if p != self.p:
+            raise ValueError(f"these heaps track percentile {self.p}, not {p}")
+        if not self.size:
+            raise ValueError("percentile of an empty collection")
+        pos = (self.size - 1) * p / 100
+        a, b = self._tops()
+        return a + (b - a) * (pos - math.floor(pos))
+
+    def median(self):
+        if self.p != 50:
+            raise ValueError(f"these heaps track percentile {self.p}, not the median")
+        if not self.size:
+            raise ValueError("median of an empty collection")
+        a, b = self._tops()
+        return a if self.size % 2 else (a + b) / 2
+
+    def mean(self):
+        if not self.size:
+            raise ValueError("mean of an empty collection")
+        return self.total / self.size
+
+
+# name -> (structure to track the queued values in, statistic read from it)
+QUANTUM_STATISTICS = {
+    "median": (lambda param: PercentileHeaps(50), lambda stats, param: stats.median()),
+    "mean": (lambda param: RunningSum(), lambda stats, param: stats.mean()),
+    "trimmed_mean": (lambda param: OrderStatistics(),
+                     lambda stats, param: stats.trimmed_mean(0.1 if param is None else param)),
+    "percentile": (lambda param: PercentileHeaps(50 if param is None else param),
+                   lambda stats, param: stats.percentile(50 if param is None else param)),
+}
+
+
+def _quantum_statistic(name):
+    if name not in QUANTUM_STATISTICS:
+        raise ValueError(f"Unknown quantum statistic '{name}', expected one of {list(QUANTUM_STATISTICS)}")
+    return QUANTUM_STATISTICS[name]
+
+
+def get_quantum_statistic(name, param=None):
+    statistic = _quantum_statistic(name)[1]
+    return lambda stats: statistic(stats, param)
+
+
+def make_order_statistics(name, param=None):
+    # the cheapest structure the statistic can be read from
+    return _quantum_statistic(name)[0](param)
+
+
+class TrackedQueue:
+    # A deque of jobs that keeps an order-statistic structure (OrderStatistics unless
+    # given) of one job field (by default the remaining time at index 1) in sync on
+    # every enqueue and dequeue.
+    def __init__(self, key=lambda job: job[1], stats=None):
+        self.jobs = deque()
+        self.key = key
+        self.stats = OrderStatistics() if stats is None else stats
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __bool__(self):
+        return bool(self.jobs)
+
+    def __iter__(self):
+        return iter(self.jobs)
+
+    def append(self, job):
+        self.jobs.append(job)
+        self.stats.add(self.key(job))
+
+    def appendleft(self, job):
+        self.jobs.appendleft(job)
+        self.stats.add(self.key(job))
+
+    def popleft(self):
+        job = self.jobs.popleft()
+        self.stats.remove(self.key(job))
+        return job
+
+    def pop(self):
+        job = self.jobs.pop()
+        self.stats.remove(self.key(job))
+        return job
@@ -0,0 +1,25 @@
+# Borg priority bands, as described for the 2019 cluster trace: larger numbers are
+# more important.  The priority-aware schedulers (MLFQ, CFS) only look at the band.
+
+FREE = "free"                # below 100
+BEST_EFFORT = "best_effort"  # 100-115, best-effort batch
+MID = "mid"                  # 116-119
+PRODUCTION = "production"    # 120-359
+MONITORING = "monitoring"    # 360 and up
+
+BANDS = (MONITORING, PRODUCTION, MID, BEST_EFFORT, FREE)
+
+
+def borg_band(priority):
+    # jobs submitted without a priority count as mid-tier
+    if priority is None:
+        return MID
+    if priority >= 360:
+        return MONITORING
+    if priority >= 120:
+        return PRODUCTION
+    if priority >= 116:
+        return MID
+    if priority >= 100:
+        return BEST_EFFORT
+    return FREE
@@ -0,0 +1,464 @@
+import os
+import json
+import math
+import time
+import asyncio
+import hashlib
+import argparse
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+from sweep import SharedWorkload, attach_workload
+from online import jsonable
+from simulation import SCHEDULERS
+
+# Local simulation service: a small asyncio HTTP/JSON server that keeps parsed
+# workloads resident and runs simulations on a bounded process pool, so scripts and
+# the dashboard can share one warm backend instead of re-importing everything and
+# reloading the trace for every run.
+#
+#   POST /simulate   {"scheduler": "RoundRobin", "params": {"cores": 4, ...},
+#                     "trace": {"start_time": 600, "end_time": 1200}}
+#                    or "synthetic": {"jobs": 1000, "seed": 42} instead of "trace".
+#                    The response streams one JSON object per line: "accepted", then
+#                    "progress" events, then "result" (or "error").  "stream": false
+#                    answers with just the final event.
+#   GET /runs/<id>   state, progress and (once done) the result of one run
+#   GET /status      pool size, pending runs, resident workloads
+#
+# Workloads are loaded once per (burst percentile, time window) or (jobs, seed) and
+# packed into shared memory (see sweep.SharedWorkload); workers copy a block out the
+# first time they see it and keep the last few.  Requests are keyed by their
+# canonical JSON: an identical request joins the run already in flight (or gets its
+# cached result) instead of starting a new one.  At most max_pending runs are queued
+# or running; past that a new request is turned away with 429 and Retry-After.
+
+# the simulate() parameters a request may set: a list of the allowed values, or
+# (int or float, one of RANGES) for a number (None is allowed where listed in NULLABLE).
+# A zero quantum would never finish a job, so quanta and intervals must be positive.
+PARAMS = {"engine": ["simpy", "fast"], "cores": (int, "positive"), "queue": ["global", "per_core"],
+          "balancing": ["steal", "rebalance", None], "rebalance_interval": (float, "positive"),
+          "time_quantum": (float, "positive"), "initial_time_quantum": (float, "positive"),
+          "batch_size": (int, "non-negative"),
+          "quantum_statistic": ["median", "mean", "trimmed_mean", "percentile"],
+          "statistic_param": (float, "non-negative"), "sample_every": (int, "positive"),
+          "smoothing": (float, "fraction"), "min_quantum": (float, "positive")}
+RANGES = {"positive": (lambda value: value > 0, "> 0"), "non-negative": (lambda value: value >= 0, ">= 0"),
+          "fraction": (lambda value: 0 <= value < 1, "in [0, 1)")}
+NULLABLE = {"batch_size", "statistic_param"}
+MAX_CACHED_RUNS = 32
+MAX_WORKLOADS = 8
+WORKER_WORKLOADS = 4
+PROGRESS_INTERVAL = 0.25
+MAX_BODY = 1 << 20
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               429: "Too Many Requests", 500: "Internal Server Error"}
+
+_worker_workloads = OrderedDict()
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _workload(spec):
+    # The tuple list for a shared block, copied out once per worker.
+    name = spec[0]
+    workload = _worker_workloads.get(name)
+    if workload is None:
+        shm, records = attach_workload(spec)
+        workload = [tuple(record) for record in records.tolist()]
+        shm.close()
+        _worker_workloads[name] = workload
+        while len(_worker_workloads) > WORKER_WORKLOADS:
+            _worker_workloads.popitem(last=False)
+    else:
+        _worker_workloads.move_to_end(name)
+    return workload
+
+
+def run_request(spec, scheduler_name, params, progress=None, key=None):
+    # One simulation, in a pool worker.  progress, if given, is a shared dict (a
+    # multiprocessing.Manager proxy) where progress[key] goes from 0 to 1.
+    from simulation import simulate
+    from scheduler.instrumentation import Instrumentation
+
+    workload = _workload(spec)
+    batch_size = params.get("batch_size", 25)
+    total = len(workload[:batch_size] if batch_size else workload)
+
+    callback = None
+    if progress is not None:
+        progress[key] = 0.0
+
+        def callback(stats):
+            progress[key] = min(1.0, stats["completed_jobs"] / max(1, total))
+
+    instruments = None
+    if params.get("engine", "simpy") == "simpy":
+        instruments = Instrumentation(progress_interval=PROGRESS_INTERVAL if callback else None, callback=callback)
+
+    start = time.perf_counter()
+    # nothing but the summary goes back, so neither log is kept (see scheduler/metrics.py)
+    scheduler, core_stats = simulate(scheduler_name, workload, detail="metrics", verbose=False,
+                                     instruments=instruments, **params)
+    return {
+        "scheduler": scheduler_name,
+        "params": params,
+        "metrics": scheduler.metrics.summary(),
+        "slices": scheduler.execution_log.slices,
+        "core_stats": core_stats,
+        "stats": instruments.snapshot() if instruments is not None else None,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def parse_request(body):
+    # Validated (scheduler, params, source) from a /simulate body; source is
+    # ("trace", start_time, end_time) or ("synthetic", jobs, seed).
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise RequestError(400, "body is not valid JSON")
+    if not isinstance(request, dict):
+        raise RequestError(400, "body must be a JSON object")
+
+    scheduler_name = request.get("scheduler", "RoundRobin")
+    if scheduler_name not in SCHEDULERS:
+        raise RequestError(400, f"unknown scheduler '{scheduler_name}'")
+    params = request.get("params") or {}
+    if not isinstance(params, dict) or set(params) - set(PARAMS):
+        raise RequestError(400, f"params must be an object with keys from {sorted(PARAMS)}")
+    for name, value in params.items():
+        _check_param(name, value)
+    if not isinstance(request.get("stream", True), bool):
+        raise RequestError(400, "stream must be true or false")
+
+    if "synthetic" in request:
+        synthetic = request["synthetic"] or {}
+        if not isinstance(synthetic, dict):
+            raise RequestError(400, "synthetic must be an object")
+        jobs = synthetic.get("jobs")
+        if not _is_int(jobs) or jobs < 1:
+            raise RequestError(400, "synthetic.jobs must be a positive integer")
+        seed = synthetic.get("seed", 42)
+        if not _is_int(seed):
+            raise RequestError(400, "synthetic.seed must be an integer")
+        source = ("synthetic", jobs, seed)
+    else:
+        window = request.get("trace") or {}
+        if not isinstance(window, dict):
+            raise RequestError(400, "trace must be an object")
+        for key in ("start_time", "end_time"):
+            if window.get(key) is not None and not _is_number(window[key]):
+                raise RequestError(400, f"trace.{key} must be a number")
+        source = ("trace", window.get("start_time"), window.get("end_time"))
+    return scheduler_name, params, source
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _check_param(name, value):
+    allowed = PARAMS[name]
+    if value is None and name in NULLABLE:
+        return
+    if isinstance(allowed, list):
+        if value not in allowed:
+            raise RequestError(400, f"params.{name} must be one of {allowed}")
+        return
+    kind, bounds = allowed
+    in_range, text = RANGES[bounds]
+    if not (_is_int(value) if kind is int else _is_number(value)) or not in_range(value):
+        raise RequestError(400, f"params.{name} must be {'an integer' if kind is int else 'a number'} {text}")
+
+
+class Run:
+    def __init__(self, run_id, workload_key):
+        self.run_id = run_id
+        self.workload_key = workload_key
+        self.future = None
+        self.progress = 0.0
+        self.started = False
+
+    def state(self):
+        if self.future is None or not self.future.done():
+            return "running" if self.started else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def event(self):
+        state = self.state()
+        if state == "done":
+            return {"event": "result", "run": self.run_id, "result": jsonable(self.future.result())}
+        if state == "failed":
+            return {"event": "error", "run": self.run_id, "error": str(self.future.exception())}
+        return {"event": "progress", "run": self.run_id, "state": state, "progress": self.progress}
+
+
+class SimulationService:
+    def __init__(self, trace="borg_traces_data.csv", processes=None, max_pending=None, cache_dir=None):
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.trace = trace
+        self.cache_dir = cache_dir
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.max_pending = max_pending or 4 * self.processes
+        # spawn: the event loop runs workload loads on threads, which fork does not mix with
+        context = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+        self.manager = context.Manager()
+        self.progress = self.manager.dict()
+        self.runs = OrderedDict()        # run id -> Run, in flight or finished
+        self.workloads = OrderedDict()   # workload key -> SharedWorkload
+        self.loading = {}                # workload key -> future of the load in progress
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        for block in self.workloads.values():
+            block.close()
+        self.workloads.clear()
+        self.manager.shutdown()
+
+    def pending(self):
+        return sum(1 for run in self.runs.values() if run.future is None or not run.future.done())
+
+    def status(self):
+        return {
+            "processes": self.processes,
+            "max_pending": self.max_pending,
+            "pending": self.pending(),
+            "runs": len(self.runs),
+            "workloads": [list(key) for key in self.workloads],
+        }
+
+    def _load(self, key):
+        from simulation import load_kaggle_workloads, synthetic_workload
+        from trace_cache import burst_percentile
+
+        if key[0] == "synthetic":
+            return SharedWorkload(synthetic_workload(key[1], seed=key[2]))
+        percentile, start_time, end_time = key[1:]
+        name = next(name for name in SCHEDULERS if burst_percentile(name) == percentile)
+        workload = load_kaggle_workloads([name], self.trace, start_time, end_time, self.cache_dir)[name]
+        return SharedWorkload(workload)
+
+    async def workload_spec(self, key):
+        block = self.workloads.get(key)
+        if block is not None:
+            self.workloads.move_to_end(key)
+            return block.spec
+        load = self.loading.get(key)
+        if load is None:
+            load = asyncio.get_running_loop().run_in_executor(None, self._load, key)
+            self.loading[key] = load
+        try:
+            block = await asyncio.shield(load)
+        finally:
+            self.loading.pop(key, None)
+        if key not in self.workloads:
+            self.workloads[key] = block
+        self._evict_workloads()
+        return self.workloads[key].spec
+
+    def _evict_workloads(self):
+        # oldest first, but never a block a queued or running run still needs
+        pinned = {run.workload_key for run in self.runs.values() if run.future is None or not run.future.done()}
+        for key in list(self.workloads):
+            if len(self.workloads) <= MAX_WORKLOADS:
+                break
+            if key not in pinned:
+                self.workloads.pop(key).close()
+
+    def submit(self, scheduler_name, params, source):
+        # The Run for this request: the one in flight or cached, or a new one.
+        # Returns (run, shared) and raises RequestError(429) when the queue is full.
+        from trace_cache import burst_percentile
+
+        canonical = json.dumps([scheduler_name, params, source], sort_keys=True)
+        run_id = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        run = self.runs.get(run_id)
+        if run is not None and run.state() != "failed":
+            self.runs.move_to_end(run_id)
+            return run, True
+
+        if self.pending() >= self.max_pending:
+            raise RequestError(429, f"{self.pending()} runs pending (max {self.max_pending}); retry later")
+
+        if source[0] == "trace":
+            workload_key = ("trace", burst_percentile(scheduler_name), source[1], source[2])
+        else:
+            workload_key = source
+        run = Run(run_id, workload_key)
+        self.runs[run_id] = run
+        run.future = asyncio.ensure_future(self._execute(run, scheduler_name, params))
+        while len(self.runs) > MAX_CACHED_RUNS:
+            oldest = next(iter(self.runs.values()))
+            if not oldest.future.done():
+                break
+            self.runs.popitem(last=False)
+        return run, False
+
+    async def _execute(self, run, scheduler_name, params):
+        spec = await self.workload_spec(run.workload_key)
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.pool, run_request, spec, scheduler_name, params, self.progress, run.run_id)
+        try:
+            while True:
+                done, _ = await asyncio.wait({job}, timeout=PROGRESS_INTERVAL)
+                if done:
+                    run.progress = 1.0
+                    return job.result()
+                progress = self.progress.get(run.run_id)
+                if progress is not None:
+                    run.started = True
+                    run.progress = progress
+        finally:
+            self.progress.pop(run.run_id, None)
+
+    async def stream(self, run, shared, write):
+        # "accepted", then a "progress" event whenever it moves, then the final event
+        await write({"event": "accepted", "run": run.run_id, "shared": shared, "state": run.state()})
+        last = None
+        while not run.future.done():
+            await asyncio.wait({run.future}, timeout=PROGRESS_INTERVAL)
+            event = run.event()
+            if event["event"] == "progress" and (event["state"], event["progress"]) != last:
+                last = (event["state"], event["progress"])
+                await write(event)
+        await write(run.event())
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await _read_request(reader)
+            route = urlsplit(path).path.rstrip("/")
+            if route == "/status" and method == "GET":
+                await _respond(writer, 200, self.status())
+            elif route.startswith("/runs/") and method == "GET":
+                run = self.runs.get(route[len("/runs/"):])
+                if run is None:
+                    raise RequestError(404, "no such run")
+                await _respond(writer, 200, {**run.event(), "state": run.state()})
+            elif route == "/simulate" and method == "POST":
+                scheduler_name, params, source = parse_request(body)
+                run, shared = self.submit(scheduler_name, params, source)
+                if json.loads(body or b"{}").get("stream", True):
+                    writer.write(_head(200, "application/x-ndjson"))
+
+                    async def write(event):
+                        writer.write(json.dumps(event).encode() + b"\n")
+                        await writer.drain()
+
+                    await self.stream(run, shared, write)
+                else:
+                    await asyncio.wait({run.future})
+                    await _respond(writer, 200, run.event())
+            elif route in ("/status", "/simulate") or route.startswith("/runs/"):
+                raise RequestError(405, f"{method} is not supported on {route}")
+            else:
+                raise RequestError(404, f"no route {route}")
+        except RequestError as e:
+            await _respond(writer, e.status, {"error": str(e)}, retry_after=1 if e.status == 429 else None)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            # a bug must not leave the client without an answer (nor kill the server)
+            try:
+                await _respond(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Simulation service on http://{host}:{port} ({self.processes} workers, "
+              f"max {self.max_pending} pending runs)")
+        async with server:
+            await server.serve_forever()
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        raise ConnectionError("client closed the connection")
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise RequestError(400, "malformed Content-Length")
+    if length > MAX_BODY:
+        raise RequestError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+def _head(status, content_type, length=None, retry_after=None):
+    # every response closes the connection, so a streamed body needs no length
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", f"Content-Type: {content_type}", "Connection: close"]
+    if length is not None:
+        lines.append(f"Content-Length: {length}")
+    if retry_after is not None:
+        lines.append(f"Retry-After: {retry_after}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _respond(writer, status, payload, retry_after=None):
+    body = json.dumps(jsonable(payload)).encode()
+    writer.write(_head(status, "application/json", len(body), retry_after) + body)
+    await writer.drain()
+
+
+def request_simulation(request, url="http://127.0.0.1:8765"):
+    # Client side for scripts: POSTs a /simulate request and yields its events as
+    # they arrive.  A full queue raises urllib.error.HTTPError with code 429.
+    from urllib.request import Request, urlopen
+
+    data = json.dumps(request).encode()
+    http_request = Request(url.rstrip("/") + "/simulate", data=data, headers={"Content-Type": "application/json"})
+    with urlopen(http_request) as response:
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve simulations over HTTP/JSON from a warm process pool.")
+    parser.add_argument("--trace", default="borg_traces_data.csv")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--processes", type=int, default=None, help="pool workers; default is one per core but one")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="queued plus running runs before new requests get 429; default 4 per worker")
+    args = parser.parse_args(argv)
+
+    service = SimulationService(args.trace, args.processes, args.max_pending, args.cache_dir)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,18 @@
 import simpy
-import random
+import itertools
+import contextlib
 from scheduler.fcfs import FCFSScheduler
 from scheduler.sjf import SJFScheduler
 from scheduler.round_robin import RoundRobinScheduler
 from scheduler.preemptive_sjf import PreemptiveSJFScheduler
 from scheduler.adaptive_rr import AdaptiveRoundRobinScheduler  
-import numpy as np
-import pandas as pd
-import os
-import ast
-import re
-import matplotlib.pyplot as plt
+from scheduler.mlfq import MLFQScheduler
+from scheduler.cfs import CFSScheduler
+from scheduler.fast_engine import make_fast_engine
+from scheduler.multicore import MultiCoreCPU
+
+# The trace cache, log writer and synthetic workloads are imported where they are
+# used, so a plain run does not pay for pandas or pyarrow (see cli.py).
 
 
 # Simulation parameters
@@ -22,142 +24,253 @@ ARRIVAL_RATE = 5
 # Total simulation time 
 SIM_TIME = 100    
 
-seen_jobs = set()  
-
-def process_generator(env, cpu, scheduler, scheduler_name, workload, last_completion_time):
-    base_time = workload[0][0]  
+def process_generator(env, cpu, scheduler, scheduler_name, workload, last_completion_time, verbose=True):
+    # workload may be a list or a lazy iterator (see trace_stream.stream_kaggle_trace)
+    base_time = None
 
     for job in workload:
         arrival_time, job_id, priority, burst_time = job
-        
+        if base_time is None:
+            base_time = arrival_time
+
         adjusted_arrival = last_completion_time + (arrival_time - base_time)
 
         delay = max(0, adjusted_arrival - env.now)
 
         yield env.timeout(delay)
 
-        print(f"[{round(env.now, 2)}] New Job-{job_id} | Priority: {priority} | Burst Time: {burst_time}")
-        env.process(scheduler.process_task(f"Job-{job_id}", burst_time))
+        if verbose:
+            print(f"[{round(env.now, 2)}] New Job-{job_id} | Priority: {priority} | Burst Time: {burst_time}")
+        if hasattr(scheduler, "submit"):
+            # dispatcher-based schedulers take arrivals as plain enqueues; MLFQ and CFS use the priority
+            scheduler.submit(f"Job-{job_id}", burst_time, priority)
+        else:
+            env.process(scheduler.process_task(f"Job-{job_id}", burst_time))
 
 
-def run_simulation(scheduler_name, workload):
-    print(f"\n Running {scheduler_name} Simulation...")
-    env = simpy.Environment()
-    cpu = simpy.Resource(env, capacity=1)
-    seen_jobs = set()
+# every scheduler create_scheduler builds, and the ones engine="fast" runs
+SCHEDULERS = ["FCFS", "SJF", "RoundRobin", "AdaptiveRR", "PreemptiveSJF", "MLFQ", "CFS"]
+FAST_SCHEDULERS = {"FCFS", "SJF", "RoundRobin", "AdaptiveRR"}
 
+
+def create_scheduler(scheduler_name, env, cpu, time_quantum=3, initial_time_quantum=2, quantum_statistic="median",
+                     statistic_param=None, detail="full", sample_every=100, verbose=True, smoothing=0.6,
+                     min_quantum=5):
     if scheduler_name == "FCFS":
-        scheduler = FCFSScheduler(env, cpu)
+        return FCFSScheduler(env, cpu, detail, sample_every, verbose)
     elif scheduler_name == "SJF":
-        scheduler = SJFScheduler(env, cpu)
+        return SJFScheduler(env, cpu, detail, sample_every, verbose)
     elif scheduler_name == "RoundRobin":
-        scheduler = RoundRobinScheduler(env, cpu, time_quantum=3)
+        return RoundRobinScheduler(env, cpu, time_quantum=time_quantum, detail=detail, sample_every=sample_every,
+                                   verbose=verbose)
+    elif scheduler_name == "AdaptiveRR":
+        return AdaptiveRoundRobinScheduler(env, cpu, initial_time_quantum=initial_time_quantum,
+                                           quantum_statistic=quantum_statistic, statistic_param=statistic_param,
+                                           detail=detail, sample_every=sample_every, verbose=verbose,
+                                           smoothing=smoothing, min_quantum=min_quantum)
+    elif scheduler_name == "PreemptiveSJF":
+        return PreemptiveSJFScheduler(env, cpu, detail, sample_every, verbose)
+    elif scheduler_name == "MLFQ":
+        # time_quantum is the top level's quantum
+        return MLFQScheduler(env, cpu, base_quantum=time_quantum, detail=detail, sample_every=sample_every,
+                             verbose=verbose)
+    elif scheduler_name == "CFS":
+        return CFSScheduler(env, cpu, detail=detail, sample_every=sample_every, verbose=verbose)
     else:
         raise ValueError("Invalid scheduler name!")
 
-    batch = workload[:25]  # Simpler single batch 
-
-    env.process(process_generator(env, cpu, scheduler, scheduler_name, batch, last_completion_time=0))
-    env.run()
-
-    execution_df = pd.DataFrame(scheduler.execution_log)
 
-    # summary logs
-    total_turnaround = sum(job["turnaround_time"] for job in scheduler.completed_jobs)
-    total_waiting = sum(job["waiting_time"] for job in scheduler.completed_jobs)
-
-    print("\n🔎Batch Summary:")
-    print(f"   - Jobs Processed: {len(scheduler.completed_jobs)}")
-    print(f"   - Avg Turnaround Time: {total_turnaround / len(scheduler.completed_jobs):.2f} sec")
-    print(f"   - Avg Waiting Time: {total_waiting / len(scheduler.completed_jobs):.2f} sec")
-    print("   - Completion Order: " + " → ".join(job["name"] for job in scheduler.completed_jobs))
-    print("-------------------------------------------------")
+def simulate(scheduler_name, workload, engine="simpy", cores=CPU_SPEED, queue="global", balancing="steal",
+             rebalance_interval=10, time_quantum=3, initial_time_quantum=2, batch_size=25,
+             quantum_statistic="median", statistic_param=None, detail="full", sample_every=100,
+             log_dir=None, log_format=None, log_batch_rows=65536, verbose=True, instruments=None,
+             last_completion_time=0, smoothing=0.6, min_quantum=5):
+    # Runs one configuration and returns (scheduler, core_stats) without printing a summary.
+    # engine="fast" replays RoundRobin/AdaptiveRR on the heap-based event loop
+    # in scheduler/fast_engine.py instead of SimPy, and computes FCFS/SJF schedules
+    # in closed form (scheduler/batch_engine.py); results have the same shape.
+    # cores/queue/balancing configure the MultiCoreCPU model (see scheduler/multicore.py);
+    # the fast engine only supports the global queue.  quantum_statistic picks what
+    # AdaptiveRR tracks over the ready queue ("median", "mean", "trimmed_mean", "percentile").
+    # detail picks how much of the per-slice log is kept: "full", "sampled" (every
+    # sample_every-th slice), "summary" (per-job records only) or "metrics" (neither;
+    # scheduler.metrics still has the summary figures, see scheduler/metrics.py).
+    # log_dir streams both logs to partitioned files in log_batch_rows batches while
+    # the run goes (see log_writer.py) instead of keeping them in memory.
+    # verbose=False turns off the per-job prints; instruments takes a
+    # scheduler.instrumentation.Instrumentation (SimPy engine only).
+    # last_completion_time shifts the batch so its first job arrives then (see replay.py).
+    # smoothing and min_quantum set AdaptiveRR's quantum update (see scheduler/adaptive_rr.py).
+    if not batch_size:
+        batch = workload
+    elif hasattr(workload, "__getitem__"):
+        batch = workload[:batch_size]
+    else:
+        # a lazy stream (load_kaggle_trace(..., stream=True)): only the first
+        # batch_size records are ever read
+        batch = itertools.islice(workload, batch_size)
+
+    if engine == "fast":
+        if instruments is not None:
+            raise ValueError("Instrumentation is only available for the simpy engine")
+        if queue != "global":
+            raise ValueError("The fast engine only supports a global run queue")
+        scheduler = make_fast_engine(scheduler_name, time_quantum=time_quantum,
+                                     initial_time_quantum=initial_time_quantum, cores=cores,
+                                     quantum_statistic=quantum_statistic, statistic_param=statistic_param,
+                                     detail=detail, sample_every=sample_every, smoothing=smoothing,
+                                     min_quantum=min_quantum)
+        with _log_writer(scheduler, scheduler_name, log_dir, log_format, log_batch_rows):
+            scheduler.run(batch, last_completion_time=last_completion_time)
+        return scheduler, scheduler.core_stats()
+    elif engine != "simpy":
+        raise ValueError(f"Unknown engine '{engine}'")
 
-    execution_df = pd.DataFrame(scheduler.execution_log)
+    env = simpy.Environment()
+    cpu = MultiCoreCPU(env, cores=cores, queue=queue, balancing=balancing, rebalance_interval=rebalance_interval)
+    scheduler = create_scheduler(scheduler_name, env, cpu, time_quantum, initial_time_quantum,
+                                 quantum_statistic, statistic_param, detail, sample_every, verbose, smoothing,
+                                 min_quantum)
+    if instruments is not None:
+        instruments.attach(env, scheduler)
+
+    env.process(process_generator(env, cpu, scheduler, scheduler_name, batch,
+                                  last_completion_time=last_completion_time, verbose=verbose))
+    with _log_writer(scheduler, scheduler_name, log_dir, log_format, log_batch_rows):
+        if instruments is not None:
+            instruments.run()
+        else:
+            env.run()
+
+    return scheduler, cpu.core_stats()
+
+
+def _log_writer(scheduler, scheduler_name, log_dir, log_format, log_batch_rows):
+    # closing the writer flushes the tail, also when the run is interrupted
+    if log_dir is None:
+        return contextlib.nullcontext()
+    from log_writer import LogWriter
+
+    return LogWriter(log_dir, scheduler_name, log_format, log_batch_rows).attach(scheduler)
+
+
+def run_simulation(scheduler_name, workload, engine="simpy", cores=CPU_SPEED, queue="global",
+                   balancing="steal", rebalance_interval=10, time_quantum=3, initial_time_quantum=2,
+                   batch_size=25, quantum_statistic="median", statistic_param=None, detail="full",
+                   sample_every=100, log_dir=None, log_format=None, log_batch_rows=65536, verbose=True,
+                   instruments=None, smoothing=0.6, min_quantum=5):
+    print(f"\n Running {scheduler_name} Simulation ({engine} engine, {cores} core(s), {queue} queue)...")
+    scheduler, core_stats = simulate(scheduler_name, workload, engine, cores, queue, balancing,
+                                     rebalance_interval, time_quantum, initial_time_quantum, batch_size,
+                                     quantum_statistic, statistic_param, detail, sample_every,
+                                     log_dir, log_format, log_batch_rows, verbose, instruments,
+                                     smoothing=smoothing, min_quantum=min_quantum)
+    return summarize_run(scheduler, core_stats, instruments)
+
+
+def summarize_run(scheduler, core_stats=None, instruments=None):
+    print_summary(scheduler, core_stats, instruments)
+
+    execution_df = scheduler.execution_log.to_dataframe()
+    execution_df.attrs["core_stats"] = core_stats or []
     
     return execution_df
 
 
-def parse_cpu_usage(value):
-    try:
-        if isinstance(value, str):
-            fixed_value = re.sub(r"\s+", ",", value.strip())  
-            
-            parsed_list = ast.literal_eval(fixed_value)  
-
-            if isinstance(parsed_list, list):
-                return [float(v) for v in parsed_list if isinstance(v, (int, float))]
-        
-        if isinstance(value, list):
-            return [float(v) for v in value if isinstance(v, (int, float))]
+def print_summary(scheduler, core_stats=None, instruments=None):
+    completed_jobs = scheduler.completed_jobs
 
-        return []  
-    except Exception as e:
-        print(f"⚠️ Error parsing CPU usage: {value}, {e}")
-        return []  
-
-
-
-
-def load_kaggle_trace(scheduler_name, file_path="borg_traces_data.csv"):
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Dataset file '{file_path}' not found.")
-    
-    df = pd.read_csv(file_path)
-
-    # We want only "schedule" event jobs
-    df = df[df["event"] == "SCHEDULE"]
-
-    df = df[["time", "collection_id", "priority", "cpu_usage_distribution"]].dropna()
+    # summary logs
+    print("\n🔎Batch Summary:")
+    print(f"   - Jobs Processed: {completed_jobs.rows}")
+    if completed_jobs.rows:
+        # running totals also cover records already spilled to disk
+        print(f"   - Avg Turnaround Time: {completed_jobs.turnaround_total / completed_jobs.rows:.2f} sec")
+        print(f"   - Avg Waiting Time: {completed_jobs.waiting_total / completed_jobs.rows:.2f} sec")
+    if completed_jobs.rows:
+        metrics = scheduler.metrics.summary()
+        print(f"   - Waiting Time p50/p95/p99: {metrics['p50_waiting']:.2f} / {metrics['p95_waiting']:.2f} / "
+              f"{metrics['p99_waiting']:.2f} sec")
+        print(f"   - Slowdown: {metrics['avg_slowdown']:.2f} avg, {metrics['p99_slowdown']:.2f} p99 | "
+              f"Jain Fairness: {metrics['fairness']:.3f}")
+        print(f"   - Throughput: {metrics['throughput']:.3f} jobs/sec | "
+              f"Utilization: {metrics['utilization'] * 100:.1f}%")
+    if len(completed_jobs) and not completed_jobs.flushed:
+        names = scheduler.job_names.names
+        print("   - Completion Order: " + " → ".join(names[code] for code in completed_jobs.column("name").tolist()))
+    for stats in core_stats or []:
+        print(f"   - Core {stats['core']}: {stats['utilization'] * 100:.1f}% busy, "
+              f"{stats['dispatches']} dispatches, {stats['migrations']} migrations")
+    if instruments is not None:
+        stats = instruments.snapshot()
+        print(f"   - Events: {stats['events']} ({stats['events_per_sec']:.0f}/s), "
+              f"{stats['context_switches']} context switches, {stats['preemptions']} preemptions")
+        print(f"   - Dispatch Latency: {stats['mean_dispatch_latency']:.2f} avg, "
+              f"{stats['max_dispatch_latency']:.2f} max | Mean Queue Length: {stats['mean_queue_length']:.2f}")
+        print(f"   - Wall Time: {stats['wall_time']:.2f}s ({stats['scheduler_time']:.2f}s scheduler, "
+              f"{stats['kernel_time']:.2f}s SimPy kernel and workload)")
+    print("-------------------------------------------------")
 
-    unique_jobs = df["collection_id"].nunique()
-    total_rows = len(df)
-    print(f"Unique Job IDs: {unique_jobs}, Total Rows: {total_rows}")
 
-    df["cpu_usage_distribution"] = df["cpu_usage_distribution"].apply(parse_cpu_usage)
+def load_kaggle_workloads(scheduler_names, file_path="borg_traces_data.csv", start_time=None, end_time=None,
+                          cache_dir=None):
+    # One pass over the cached trace serves every scheduler: all the burst
+    # percentiles the schedulers need are computed together, then each
+    # scheduler gets its own workload list.  The first load ingests the CSV into
+    # a memory-mapped cache keyed by the file's content hash; later loads only
+    # touch the requested time window.
+    from trace_cache import open_trace, burst_percentile
 
+    store = open_trace(file_path, cache_dir)
+    print(f"Unique Job IDs: {store.meta['unique_jobs']}, Total Rows: {store.meta['total_rows']}")
 
-    df["time"] = pd.to_numeric(df["time"], errors='coerce') / 1e9  
-    df = df.dropna(subset=["time"])
-    df = df[df["time"] > 0]
-    df["time"] = df["time"].astype(float)
+    percentiles = {name: burst_percentile(name) for name in scheduler_names}
+    lo, hi, bursts = store.burst_times(set(percentiles.values()), start_time, end_time)
 
-    
-    df = df.sort_values(by="time", ascending=True).reset_index(drop=True)
+    times = [round(t, 6) for t in store.time[lo:hi].tolist()]
+    job_ids = store.collection_id[lo:hi].tolist()
+    priorities = store.priority[lo:hi].tolist()
 
-    if scheduler_name == "AdaptiveRR":
-        df["burst_time"] = df["cpu_usage_distribution"].apply(
-            lambda x: np.percentile(x, 40) * 200 if len(x) > 0 and np.percentile(x, 40) > 0 else 0.01
-        )
-    else:
-        df["burst_time"] = df["cpu_usage_distribution"].apply(
-            lambda x: np.percentile(x, 97) * 200 if len(x) > 0 and np.percentile(x, 97) > 0 else 0.01
-        )
+    return {name: list(zip(times, job_ids, priorities, bursts[p].tolist()))
+            for name, p in percentiles.items()}
 
 
-    df = df[["time", "collection_id", "priority", "burst_time"]]
+def synthetic_workload(num_jobs=None, sim_time=SIM_TIME, seed=RANDOM_SEED, arrival_rate=ARRIVAL_RATE):
+    # Seeded stand-in for the Borg trace (see workload.py): num_jobs jobs, or
+    # every arrival in the first sim_time time units.
+    from workload import generate_workload
 
-    
-    workload = [(round(float(t), 6), int(j), int(p), float(b)) 
-                for t, j, p, b in df.itertuples(index=False, name=None)]
+    if num_jobs is not None:
+        return generate_workload(num_jobs, arrival_rate=arrival_rate, seed=seed)
+    return generate_workload(sim_time=sim_time, arrival_rate=arrival_rate, seed=seed)
 
-    return workload
 
+def load_kaggle_trace(scheduler_name, file_path="borg_traces_data.csv", start_time=None, end_time=None,
+                      cache_dir=None, stream=False):
+    # stream=True reads the CSV in bounded memory instead of through the cache and
+    # returns a lazy iterator of the same records (see trace_stream.py)
+    if stream:
+        from trace_stream import stream_kaggle_trace
 
+        return _time_window(stream_kaggle_trace(scheduler_name, file_path), start_time, end_time)
+    return load_kaggle_workloads([scheduler_name], file_path, start_time, end_time, cache_dir)[scheduler_name]
 
 
+def _time_window(records, start_time=None, end_time=None):
+    # start_time <= time < end_time of time-ordered records, read no further than needed
+    if start_time is not None:
+        records = itertools.dropwhile(lambda record: record[0] < start_time, records)
+    if end_time is not None:
+        records = itertools.takewhile(lambda record: record[0] < end_time, records)
+    return records
 
 
+# Main simulation function: `python simulation.py [options]` is `python cli.py run [options]`
+def main(argv=None):
+    import sys
+    from cli import main as cli_main
 
-# Main simulation function
-def main():
-    #run_simulation("FCFS")
-    #run_simulation("SJF")
-    #run_simulation("RoundRobin")
-    #run_simulation("PreemptiveSJF")
-    #run_simulation("AdaptiveRR")
-    workload = load_kaggle_trace("borg_traces_data.csv")
-    run_simulation("RoundRobin", workload)
+    return cli_main(["run", *(sys.argv[1:] if argv is None else argv)])
 
 
 if __name__ == '__main__':
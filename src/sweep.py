@@ -0,0 +1,210 @@
+import os
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import pandas as pd
+from trace_cache import burst_percentile
+from trace_stream import RECORD_DTYPE
+from simulation import SCHEDULERS, FAST_SCHEDULERS
+
+# Parameter sweeps over a shared workload.  The parent process packs every distinct
+# workload into a shared-memory block once; pool workers attach to the blocks in
+# their initializer instead of receiving a pickled copy with every task, so a task
+# is just a small config dict.
+
+QUANTUM_PARAMS = {"RoundRobin": "time_quantum", "AdaptiveRR": "initial_time_quantum", "MLFQ": "time_quantum"}
+
+_worker_workloads = {}
+_worker_blocks = []
+
+
+class SharedWorkload:
+    def __init__(self, workload):
+        records = np.array(workload, dtype=RECORD_DTYPE)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, records.nbytes))
+        np.ndarray(records.shape, dtype=RECORD_DTYPE, buffer=self.shm.buf)[:] = records
+        self.spec = (self.shm.name, len(records))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_workload(spec):
+    name, length = spec
+    # The parent owns the block, so the worker's resource tracker must not unlink
+    # it (or warn about a leak) when the worker exits.  Forked workers share the
+    # parent's tracker and need nothing; spawned workers have their own.
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if multiprocessing.get_start_method() != "fork":
+            resource_tracker.unregister(shm._name, "shared_memory")
+    records = np.ndarray((length,), dtype=RECORD_DTYPE, buffer=shm.buf)
+    return shm, records
+
+
+class RecordView:
+    # The (arrival_time, job_id, priority, burst_time) tuples of a RECORD_DTYPE array,
+    # converted block_rows at a time as they are iterated, so a worker reads the
+    # shared block in place instead of holding its own copy of the workload.  Slices
+    # are views too, and the batch engine takes the array itself (__array__).
+    def __init__(self, records, block_rows=4096):
+        self.records = records
+        self.block_rows = block_rows
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordView(self.records[index], self.block_rows)
+        return tuple(self.records[index].tolist())
+
+    def __iter__(self):
+        for start in range(0, len(self.records), self.block_rows):
+            yield from self.records[start:start + self.block_rows].tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        return self.records if dtype is None else self.records.astype(dtype)
+
+
+def _init_worker(specs):
+    # Attach once per worker; tasks read the blocks through RecordViews.
+    for key, spec in specs.items():
+        shm, records = attach_workload(spec)
+        _worker_blocks.append(shm)
+        _worker_workloads[key] = RecordView(records)
+
+
+def build_grid(schedulers=SCHEDULERS, quanta=(3,), batch_sizes=(25,), cores=(1,), engines=("simpy",)):
+    configs = []
+    seen = set()
+    for name, quantum, batch_size, core_count, engine in itertools.product(
+            schedulers, quanta, batch_sizes, cores, engines):
+        if engine == "fast" and name not in FAST_SCHEDULERS:
+            continue
+        # quantum only matters for the round robin family; don't repeat the others per quantum
+        config = {
+            "scheduler": name,
+            "quantum": quantum if name in QUANTUM_PARAMS else None,
+            "batch_size": batch_size,
+            "cores": core_count,
+            "engine": engine,
+        }
+        key = tuple(config.values())
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def summarize(scheduler, core_stats):
+    metrics = scheduler.metrics
+    summary = metrics.summary()
+
+    return {
+        "jobs": metrics.jobs,
+        "avg_turnaround": summary["avg_turnaround"],
+        "avg_waiting": summary["avg_waiting"],
+        "p95_waiting": summary["p95_waiting"],
+        "p99_waiting": summary["p99_waiting"],
+        "max_waiting": summary["max_waiting"],
+        "avg_slowdown": summary["avg_slowdown"],
+        "fairness": summary["fairness"],
+        "makespan": summary["makespan"] if metrics.jobs else np.nan,
+        "slices": scheduler.execution_log.slices,
+        "avg_utilization": np.mean([c["utilization"] for c in core_stats]) if core_stats else np.nan,
+        "migrations": sum(c["migrations"] for c in core_stats),
+    }
+
+
+def run_config(config, workload_key):
+    from simulation import simulate
+
+    params = {"cores": config["cores"], "batch_size": config["batch_size"], "engine": config["engine"]}
+    if config["quantum"] is not None:
+        params[QUANTUM_PARAMS[config["scheduler"]]] = config["quantum"]
+
+    start = time.perf_counter()
+    # The summary comes from scheduler.metrics, so neither log is kept.
+    scheduler, core_stats = simulate(config["scheduler"], _worker_workloads[workload_key], detail="metrics",
+                                     verbose=False, **params)
+    wall_time = time.perf_counter() - start
+
+    return {**config, **summarize(scheduler, core_stats), "wall_time": wall_time}
+
+
+def run_sweep(configs, workloads, processes=None):
+    # workloads: one workload list for every scheduler, or {scheduler_name: workload}.
+    if not isinstance(workloads, dict):
+        workloads = {config["scheduler"]: workloads for config in configs}
+
+    keys = {}
+    blocks = {}
+    try:
+        for name, workload in workloads.items():
+            key = keys.setdefault(id(workload), f"w{len(keys)}")
+            if key not in blocks:
+                blocks[key] = SharedWorkload(workload)
+        scheduler_keys = {name: keys[id(workload)] for name, workload in workloads.items()}
+        specs = {key: block.spec for key, block in blocks.items()}
+
+        results = []
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(specs,)) as pool:
+            futures = [pool.submit(run_config, config, scheduler_keys[config["scheduler"]]) for config in configs]
+            for done, future in enumerate(as_completed(futures), 1):
+                results.append(future.result())
+                print(f"[{done}/{len(futures)}] finished")
+    finally:
+        for block in blocks.values():
+            block.close()
+
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scheduler parameter sweep over a process pool.")
+    parser.add_argument("--trace", default="borg_traces_data.csv")
+    parser.add_argument("--schedulers", nargs="+", default=SCHEDULERS, choices=SCHEDULERS)
+    parser.add_argument("--quanta", nargs="+", type=float, default=[3])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[25])
+    parser.add_argument("--cores", nargs="+", type=int, default=[1])
+    parser.add_argument("--engines", nargs="+", default=["simpy"], choices=["simpy", "fast"])
+    parser.add_argument("--start-time", type=float, default=None)
+    parser.add_argument("--end-time", type=float, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args(argv)
+
+    from simulation import load_kaggle_workloads
+
+    configs = build_grid(args.schedulers, args.quanta, args.batch_sizes, args.cores, args.engines)
+    workloads = load_kaggle_workloads(args.schedulers, args.trace, args.start_time, args.end_time)
+
+    # schedulers that use the same burst percentile share one workload block
+    by_percentile = {}
+    for name in args.schedulers:
+        workloads[name] = by_percentile.setdefault(burst_percentile(name), workloads[name])
+
+    print(f"Running {len(configs)} configurations...")
+    results = run_sweep(configs, workloads, args.processes)
+    results.to_csv(args.out, index=False)
+    print(f"Results written to {args.out}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import os
+import heapq
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from trace_cache import parse_cpu_usage, pack_usage, burst_times, burst_percentile
+
+# One workload record per row: the same (arrival_time, job_id, priority, burst_time)
+# tuple that load_kaggle_trace returns, stored as a structured array for spilling.
+RECORD_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("collection_id", np.int64),
+    ("priority", np.int64),
+    ("burst_time", np.float64),
+])
+TRACE_COLUMNS = ["time", "collection_id", "priority", "event", "cpu_usage_distribution"]
+
+
+def iter_schedule_chunks(file_path, percentile, chunksize=100_000):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Dataset file '{file_path}' not found.")
+
+    for chunk in pd.read_csv(file_path, usecols=TRACE_COLUMNS, chunksize=chunksize):
+        chunk = chunk[chunk["event"] == "SCHEDULE"]
+        chunk = chunk[["time", "collection_id", "priority", "cpu_usage_distribution"]].dropna()
+
+        chunk["time"] = pd.to_numeric(chunk["time"], errors='coerce') / 1e9
+        chunk = chunk.dropna(subset=["time"])
+        chunk = chunk[chunk["time"] > 0]
+        if chunk.empty:
+            continue
+
+        records = np.empty(len(chunk), dtype=RECORD_DTYPE)
+        records["time"] = chunk["time"].to_numpy(dtype=np.float64)
+        records["collection_id"] = chunk["collection_id"].to_numpy(dtype=np.int64)
+        records["priority"] = chunk["priority"].to_numpy(dtype=np.int64)
+        offsets, values = pack_usage([parse_cpu_usage(v) for v in chunk["cpu_usage_distribution"]])
+        records["burst_time"] = burst_times(offsets, values, [percentile])[percentile]
+
+        records.sort(order="time", kind="stable")
+        yield records
+
+
+def _iter_run(path, block_size):
+    # Read a spilled run back a block at a time so only block_size rows per run are resident.
+    run = np.load(path, mmap_mode="r")
+    for start in range(0, len(run), block_size):
+        for t, j, p, b in np.array(run[start:start + block_size]).tolist():
+            yield (round(t, 6), j, p, b)
+
+
+def stream_kaggle_trace(scheduler_name, file_path="borg_traces_data.csv", chunksize=100_000,
+                        spill_dir=None, block_size=4096):
+    # Two passes over bounded memory: each CSV chunk is filtered, parsed and sorted
+    # into a run on disk, then the runs are k-way merged so records come out in
+    # time order even when the CSV is not.  Peak memory is one chunk during the
+    # first pass and one block per run during the merge.
+    percentile = burst_percentile(scheduler_name)
+    work_dir = tempfile.mkdtemp(prefix="trace-runs-", dir=spill_dir)
+
+    try:
+        runs = []
+        for records in iter_schedule_chunks(file_path, percentile, chunksize):
+            path = os.path.join(work_dir, f"run-{len(runs):05d}.npy")
+            np.save(path, records)
+            runs.append(path)
+
+        iterators = [_iter_run(path, block_size) for path in runs]
+        yield from heapq.merge(*iterators, key=lambda record: record[0])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
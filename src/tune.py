@@ -0,0 +1,244 @@
+import os
+import json
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import sweep
+from sweep import SharedWorkload
+
+# Automatic tuning of the round robin family's constants for one objective (a RunMetrics
+# summary figure where lower is better, e.g. "avg_waiting" or "p99_waiting").  A grid
+# over three AdaptiveRR parameters costs hundreds of full runs; this gets there in a
+# few dozen, most of them on small subsamples:
+#
+#   successive halving   `candidates` points (the hand-picked defaults plus a seeded
+#                        Latin hypercube over the space) are scored on the first
+#                        min_jobs jobs; the best 1/eta go on to eta times as many jobs,
+#                        until one survivor is left or the whole workload is used
+#   golden-section       each parameter of the survivor in turn is refined on the whole
+#                        workload inside a bracket around it (a quarter of its range
+#                        each way, halved every sweep), narrowing by 1/phi per run; a
+#                        sweep that improves the objective by less than rel_tol stops
+#                        the search early
+#
+# Every distinct (parameters, jobs) run is cached, so points the two phases share are
+# free.  Runs use the fast engine with detail="metrics"; with processes > 1 the
+# workload sits in shared memory once (see sweep.py) and each halving round runs in
+# parallel.
+
+SPACES = {
+    "RoundRobin": {"time_quantum": (0.5, 50.0, float)},
+    "AdaptiveRR": {"initial_time_quantum": (1.0, 50.0, float), "smoothing": (0.0, 0.95, float),
+                   "min_quantum": (1, 25, int)},
+}
+DEFAULTS = {
+    "RoundRobin": {"time_quantum": 3},
+    "AdaptiveRR": {"initial_time_quantum": 2, "smoothing": 0.6, "min_quantum": 5},
+}
+# summary keys where lower is better
+OBJECTIVES = ["avg_waiting", "p50_waiting", "p95_waiting", "p99_waiting", "max_waiting", "avg_turnaround",
+              "p99_turnaround", "avg_slowdown", "p99_slowdown", "makespan"]
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+
+def evaluate(scheduler_name, params, workload, jobs, objective, engine="fast", cores=1):
+    from simulation import simulate
+
+    scheduler, _ = simulate(scheduler_name, workload, engine=engine, cores=cores, batch_size=jobs,
+                            detail="metrics", verbose=False, **params)
+    value = scheduler.metrics.summary()[objective]
+    return float(value) if value == value else math.inf
+
+
+def _evaluate_shared(workload_key, scheduler_name, params, jobs, objective, engine, cores):
+    return evaluate(scheduler_name, params, sweep._worker_workloads[workload_key], jobs, objective, engine, cores)
+
+
+def _clip(space, name, value):
+    lo, hi, kind = space[name]
+    value = min(max(value, lo), hi)
+    return int(round(value)) if kind is int else round(float(value), 6)
+
+
+def latin_hypercube(space, count, seed=42):
+    # count points, one in each of count equal strata per parameter
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (lo, hi, kind) in space.items():
+        strata = (rng.permutation(count) + rng.random(count)) / count
+        columns[name] = lo + strata * (hi - lo)
+    return [{name: _clip(space, name, columns[name][i]) for name in space} for i in range(count)]
+
+
+class Tuner:
+    def __init__(self, scheduler_name, workload, objective="avg_waiting", engine="fast", cores=1, processes=None):
+        if scheduler_name not in SPACES:
+            raise ValueError(f"Only {', '.join(SPACES)} can be tuned, not {scheduler_name}")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        self.scheduler_name = scheduler_name
+        self.space = SPACES[scheduler_name]
+        self.workload = workload
+        self.objective = objective
+        self.engine = engine
+        self.cores = cores
+        self.processes = processes
+        self.cache = {}
+        self.history = []
+        self._pool = None
+        self._block = None
+
+    def __enter__(self):
+        if self.processes and self.processes > 1:
+            self._block = SharedWorkload(self.workload)
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=sweep._init_worker,
+                                             initargs=({"tune": self._block.spec},))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._block.close()
+            self._pool = self._block = None
+
+    @property
+    def runs(self):
+        return len(self.cache)
+
+    def score(self, points, jobs):
+        # objective of every point on the first `jobs` jobs, running only what is not cached
+        keys = [(tuple(sorted(point.items())), jobs) for point in points]
+        todo = list(dict.fromkeys(key for key in keys if key not in self.cache))
+        if self._pool is not None and len(todo) > 1:
+            values = self._pool.map(_evaluate_shared, ["tune"] * len(todo), [self.scheduler_name] * len(todo),
+                                    [dict(key[0]) for key in todo], [jobs] * len(todo),
+                                    [self.objective] * len(todo), [self.engine] * len(todo),
+                                    [self.cores] * len(todo))
+        else:
+            values = (evaluate(self.scheduler_name, dict(key[0]), self.workload, jobs, self.objective, self.engine,
+                               self.cores) for key in todo)
+        for key, value in zip(todo, values):
+            self.cache[key] = value
+            self.history.append({**dict(key[0]), "jobs": jobs, self.objective: value})
+        return [self.cache[key] for key in keys]
+
+    def successive_halving(self, candidates=27, eta=3, min_jobs=500, seed=42):
+        points = [dict(DEFAULTS[self.scheduler_name])] + latin_hypercube(self.space, candidates - 1, seed)
+        total = len(self.workload)
+        jobs = min(min_jobs, total)
+        while True:
+            scores = self.score(points, jobs)
+            ranked = [points[i] for i in np.argsort(scores, kind="stable")]
+            print(f"  {len(points)} candidate(s) on {jobs} jobs: best {self.objective} {min(scores):.4f}")
+            if len(points) == 1 or jobs >= total:
+                return ranked[0]
+            points = ranked[:max(1, len(points) // eta)]
+            jobs = min(jobs * eta, total)
+
+    def golden_section(self, point, name, lo, hi, tol):
+        # minimizes over one parameter with the others fixed; returns (point, value)
+        def at(value):
+            candidate = {**point, name: _clip(self.space, name, value)}
+            return candidate, self.score([candidate], len(self.workload))[0]
+
+        a, b = lo, hi
+        c, d = b - INV_PHI * (b - a), a + INV_PHI * (b - a)
+        (pc, fc), (pd, fd) = at(c), at(d)
+        integer = self.space[name][2] is int
+        while b - a > tol and not (integer and pc[name] == pd[name]):
+            if fc <= fd:
+                b, d, pd, fd = d, c, pc, fc
+                c = b - INV_PHI * (b - a)
+                pc, fc = at(c)
+            else:
+                a, c, pc, fc = c, d, pd, fd
+                d = a + INV_PHI * (b - a)
+                pd, fd = at(d)
+        return (pc, fc) if fc <= fd else (pd, fd)
+
+    def refine(self, point, rel_tol=0.01, max_sweeps=3):
+        best = self.score([point], len(self.workload))[0]
+        for sweep_index in range(max_sweeps):
+            start = best
+            for name, (lo, hi, kind) in self.space.items():
+                # the bracket halves with every sweep
+                width = (hi - lo) / 4 / 2 ** sweep_index
+                tol = 1 if kind is int else (hi - lo) / 50
+                candidate, value = self.golden_section(point, name, max(lo, point[name] - width),
+                                                       min(hi, point[name] + width), tol)
+                if value < best:
+                    point, best = candidate, value
+            print(f"  golden-section sweep: {self.objective} {best:.4f}")
+            if not math.isfinite(start) or start - best <= rel_tol * abs(start):
+                break
+        return point, best
+
+    def tune(self, candidates=27, eta=3, min_jobs=500, seed=42, rel_tol=0.01):
+        default = dict(DEFAULTS[self.scheduler_name])
+        survivor = self.successive_halving(candidates, eta, min_jobs, seed)
+        best, value = self.refine(survivor, rel_tol)
+        baseline = self.score([default], len(self.workload))[0]
+        return {
+            "scheduler": self.scheduler_name,
+            "objective": self.objective,
+            "jobs": len(self.workload),
+            "best": best,
+            "value": value,
+            "default": default,
+            "default_value": baseline,
+            "runs": self.runs,
+            "full_runs": sum(1 for (_, jobs) in self.cache if jobs == len(self.workload)),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune RoundRobin / AdaptiveRR parameters for one objective.")
+    parser.add_argument("--scheduler", default="AdaptiveRR", choices=list(SPACES))
+    parser.add_argument("--objective", default="avg_waiting", choices=OBJECTIVES,
+                        help="RunMetrics summary figure to minimize")
+    parser.add_argument("--trace", default="borg_traces_data.csv")
+    parser.add_argument("--start-time", type=float, default=None)
+    parser.add_argument("--end-time", type=float, default=None)
+    parser.add_argument("--synthetic", type=int, default=None, metavar="JOBS",
+                        help="tune on a seeded synthetic workload of this many jobs instead of the trace")
+    parser.add_argument("--jobs", type=int, default=None, help="use only the first JOBS jobs of the workload")
+    parser.add_argument("--engine", default="fast", choices=["simpy", "fast"])
+    parser.add_argument("--cores", type=int, default=1)
+    parser.add_argument("--candidates", type=int, default=27)
+    parser.add_argument("--eta", type=int, default=3, help="successive halving keeps 1/eta per round")
+    parser.add_argument("--min-jobs", type=int, default=500, help="jobs in the first halving round")
+    parser.add_argument("--rel-tol", type=float, default=0.01, help="stop once a sweep improves by less than this")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="tune_results.json")
+    args = parser.parse_args(argv)
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+
+    from simulation import load_kaggle_trace, synthetic_workload
+
+    if args.synthetic is not None:
+        workload = synthetic_workload(args.synthetic, seed=args.seed)
+    else:
+        workload = load_kaggle_trace(args.scheduler, args.trace, args.start_time, args.end_time)
+    workload = workload[:args.jobs] if args.jobs else workload
+    if not workload:
+        parser.error("the workload is empty")
+
+    print(f"Tuning {args.scheduler} for {args.objective} on {len(workload)} jobs...")
+    with Tuner(args.scheduler, workload, args.objective, args.engine, args.cores, args.processes) as tuner:
+        result = tuner.tune(args.candidates, args.eta, args.min_jobs, args.seed, args.rel_tol)
+        result["history"] = tuner.history
+
+    print(f"Best {args.objective}: {result['value']:.4f} with {result['best']} "
+          f"(defaults {result['default']}: {result['default_value']:.4f})")
+    print(f"{result['runs']} runs, {result['full_runs']} on the whole workload")
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {args.out}")
+    return result
+
+
+if __name__ == '__main__':
+    main()
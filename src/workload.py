@@ -0,0 +1,53 @@
+import numpy as np
+
+# Seeded synthetic workloads in the same (arrival_time, job_id, priority, burst_time)
+# shape load_kaggle_trace returns, for runs without the Borg CSV.
+#
+# arrivals    Poisson process: exponential inter-arrival times with mean arrival_rate
+#             (the "average time between process arrivals" of simulation.ARRIVAL_RATE)
+# bursts      Pareto with shape burst_shape, scaled to a mean of burst_mean; an
+#             idle_fraction of jobs gets the 0.01 burst idle trace rows get
+# priorities  drawn from BORG_PRIORITY_MIX, the priority shares of the processed trace
+
+BORG_PRIORITY_MIX = {
+    103: 0.323, 200: 0.203, 105: 0.199, 116: 0.091, 118: 0.052, 107: 0.039,
+    25: 0.025, 101: 0.022, 360: 0.020, 0: 0.011, 115: 0.010, 119: 0.005,
+}
+IDLE_BURST = 0.01
+
+
+def generate_workload(num_jobs=None, sim_time=None, arrival_rate=5, seed=42, burst_mean=4.0, burst_shape=1.5,
+                      idle_fraction=0.1, priority_mix=None, first_job_id=1):
+    # Either num_jobs jobs, or every arrival before sim_time.
+    if (num_jobs is None) == (sim_time is None):
+        raise ValueError("Pass exactly one of num_jobs or sim_time")
+    if burst_shape <= 1:
+        raise ValueError("burst_shape must be > 1 for the burst mean to exist")
+
+    rng = np.random.default_rng(seed)
+    if num_jobs is None:
+        # Draw in blocks until the horizon is passed, then cut.
+        gaps = []
+        total = 0.0
+        while total < sim_time:
+            block = rng.exponential(arrival_rate, size=max(1024, int(sim_time / arrival_rate)))
+            gaps.append(block)
+            total += block.sum()
+        arrivals = np.cumsum(np.concatenate(gaps))
+        arrivals = arrivals[arrivals < sim_time]
+    else:
+        arrivals = np.cumsum(rng.exponential(arrival_rate, size=num_jobs))
+    count = len(arrivals)
+
+    # classical Pareto with minimum x_m has mean shape * x_m / (shape - 1)
+    x_m = burst_mean * (burst_shape - 1) / burst_shape
+    bursts = x_m * (1.0 + rng.pareto(burst_shape, size=count))
+    bursts[rng.random(count) < idle_fraction] = IDLE_BURST
+
+    mix = priority_mix or BORG_PRIORITY_MIX
+    levels = np.fromiter(mix.keys(), dtype=np.int64)
+    weights = np.fromiter(mix.values(), dtype=np.float64)
+    priorities = rng.choice(levels, size=count, p=weights / weights.sum())
+
+    job_ids = np.arange(first_job_id, first_job_id + count, dtype=np.int64)
+    return list(zip(np.round(arrivals, 6).tolist(), job_ids.tolist(), priorities.tolist(), bursts.tolist()))
@@ -0,0 +1,45 @@
+import random
+import numpy as np
+import pytest
+from simulation import simulate
+from workload import generate_workload
+from scheduler.batch_engine import fcfs_schedule, sjf_schedule
+
+
+def tied_workload(jobs=600, per_instant=5, seed=4):
+    # several arrivals per instant; non-round bursts, so no job completes exactly
+    # when another one arrives
+    rng = random.Random(seed)
+    return [(float(i // per_instant), i, 0, round(rng.uniform(0.5, 12), 3) + 1e-4 * rng.random())
+            for i in range(jobs)]
+
+
+def test_sjf_idle_cores_start_at_arrival():
+    starts, cores = sjf_schedule([0.0, 0.0, 0.0], [3.0, 1.0, 2.0], cores=2)
+    assert np.isfinite(starts).all()
+    assert starts.tolist() == [0.0, 0.0, 1.0]
+    assert cores.tolist() == [0, 1, 1]
+
+
+def test_fcfs_idle_cores_start_at_arrival():
+    starts, cores = fcfs_schedule([0.0, 0.0, 0.0], [3.0, 1.0, 2.0], cores=2)
+    assert starts.tolist() == [0.0, 0.0, 1.0]
+    assert cores.tolist() == [0, 1, 1]
+
+
+@pytest.mark.parametrize("name", ["FCFS", "SJF"])
+@pytest.mark.parametrize("cores", [1, 3])
+@pytest.mark.parametrize("workload", [tied_workload(), generate_workload(1500, arrival_rate=0.5, seed=2)],
+                         ids=["tied", "synthetic"])
+def test_fast_engine_matches_simpy(name, cores, workload):
+    simpy_run, _ = simulate(name, workload, cores=cores, batch_size=None, verbose=False, detail="summary")
+    fast_run, _ = simulate(name, workload, engine="fast", cores=cores, batch_size=None, verbose=False,
+                           detail="summary")
+    expected = simpy_run.completed_jobs.to_dataframe()
+    actual = fast_run.completed_jobs.to_dataframe()
+
+    assert actual["name"].astype(str).tolist() == expected["name"].astype(str).tolist()
+    assert actual["Core"].tolist() == expected["Core"].tolist()
+    for column in ["arrival_time", "start_time", "completion_time"]:
+        np.testing.assert_allclose(actual[column], expected[column], rtol=0, atol=1e-9)
+    assert np.isfinite(fast_run.metrics.summary()["avg_waiting"])
@@ -0,0 +1,70 @@
+import time
+import numpy as np
+import pytest
+from simulation import simulate
+from workload import generate_workload
+
+
+def integer_workload(jobs=1500, seed=1):
+    # arrivals rounded to whole time units and every seventh burst zero, so arrivals
+    # tie with each other and with slice ends
+    workload = generate_workload(jobs, arrival_rate=3, seed=seed)
+    return [(float(int(arrival_time)), job_id, priority, burst_time if job_id % 7 else 0.0)
+            for arrival_time, job_id, priority, burst_time in workload]
+
+
+def slices(run):
+    frame = run.execution_log.to_dataframe()
+    return frame.drop(columns=[column for column in ("Core", "Migrated") if column in frame])
+
+
+@pytest.mark.parametrize("name, statistic", [
+    ("RoundRobin", "median"), ("AdaptiveRR", "median"), ("AdaptiveRR", "mean"),
+    ("AdaptiveRR", "trimmed_mean"), ("AdaptiveRR", "percentile"),
+])
+@pytest.mark.parametrize("workload", [generate_workload(1500, arrival_rate=1, seed=2), integer_workload()],
+                         ids=["synthetic", "tied"])
+def test_fast_engine_slices_match_simpy(name, statistic, workload):
+    simpy_run, _ = simulate(name, workload, batch_size=None, verbose=False, quantum_statistic=statistic)
+    fast_run, _ = simulate(name, workload, engine="fast", batch_size=None, verbose=False,
+                           quantum_statistic=statistic)
+    expected, actual = slices(simpy_run), slices(fast_run)
+    assert fast_run.execution_log.slices == simpy_run.execution_log.slices == len(expected)
+    assert actual["Job"].astype(str).tolist() == expected["Job"].astype(str).tolist()
+    for column in expected:
+        if column != "Job":
+            np.testing.assert_allclose(actual[column].astype(float), expected[column].astype(float),
+                                       rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", ["RoundRobin", "AdaptiveRR"])
+@pytest.mark.parametrize("cores", [2, 3])
+def test_fast_engine_dispatches_tied_arrivals_like_simpy(name, cores):
+    # several jobs per instant wake the idle cores together; each has to go to the
+    # same core as with the dispatcher processes
+    workload = integer_workload(seed=3)
+    simpy_run, simpy_cores = simulate(name, workload, cores=cores, batch_size=None, verbose=False)
+    fast_run, fast_cores = simulate(name, workload, engine="fast", cores=cores, batch_size=None, verbose=False)
+    expected = simpy_run.execution_log.to_dataframe()
+    actual = fast_run.execution_log.to_dataframe()
+    assert actual["Job"].astype(str).tolist() == expected["Job"].astype(str).tolist()
+    assert actual["Core"].tolist() == expected["Core"].tolist()
+    assert actual["Migrated"].tolist() == expected["Migrated"].tolist()
+    np.testing.assert_allclose(actual["Start"], expected["Start"], rtol=0, atol=1e-9)
+    for simpy_core, fast_core in zip(simpy_cores, fast_cores):
+        assert (fast_core["dispatches"], fast_core["migrations"]) == \
+            (simpy_core["dispatches"], simpy_core["migrations"])
+
+
+@pytest.mark.parametrize("name", ["RoundRobin", "AdaptiveRR"])
+def test_fast_engine_is_faster_than_simpy(name):
+    workload = generate_workload(5000, arrival_rate=0.5, seed=3)
+    best = {}
+    for engine in ["simpy", "fast"] * 3:
+        start = time.perf_counter()
+        run, _ = simulate(name, workload, engine=engine, batch_size=None, detail="summary", verbose=False)
+        best[engine] = min(best.get(engine, np.inf), time.perf_counter() - start)
+        assert run.execution_log.slices > len(workload)
+    # about 3x on an idle machine (and 5-6x the per-job SimPy processes the
+    # schedulers started from); the margin leaves room for a busy one
+    assert best["simpy"] > 1.5 * best["fast"]
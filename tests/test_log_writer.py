@@ -0,0 +1,55 @@
+import glob
+import os
+import numpy as np
+import pytest
+from simulation import simulate
+from workload import generate_workload
+from log_writer import TABLE_SCHEMAS, read_log, pa, pq
+
+
+def read_part(path):
+    if path.endswith(".npy"):
+        records = np.load(path)
+        return list(records.dtype.names), {name: records[name].tolist() for name in records.dtype.names}
+    if path.endswith(".parquet"):
+        table = pq.read_table(path)
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+    return table.column_names, table.to_pydict()
+
+
+@pytest.mark.parametrize("log_format", ["parquet", "arrow", "npy"])
+@pytest.mark.parametrize("name", ["RoundRobin", "AdaptiveRR"])
+def test_part_files_round_trip(tmp_path, log_format, name):
+    if log_format != "npy" and pa is None:
+        pytest.skip("needs pyarrow")
+    workload = generate_workload(300, arrival_rate=1, seed=6)
+    kept, _ = simulate(name, workload, batch_size=None, verbose=False)
+    simulate(name, workload, batch_size=None, verbose=False, log_dir=str(tmp_path), log_format=log_format,
+             log_batch_rows=100)
+    expected = {"slices": kept.execution_log.to_dataframe(), "jobs": kept.completed_jobs.to_dataframe()}
+    assert len(expected["slices"]) > 300
+
+    for table, frame in expected.items():
+        paths = sorted(glob.glob(os.path.join(tmp_path, table, f"scheduler={name}", "*")))
+        assert all(path.endswith("." + log_format) for path in paths)
+        # one part per 100 rows, the last one holding the rest
+        assert len(paths) == -(-len(frame) // 100)
+        columns = [column for column, _, _ in TABLE_SCHEMAS[table]]
+        rows = {column: [] for column in columns}
+        for i, path in enumerate(paths):
+            names, part = read_part(path)
+            assert names == columns
+            assert len(part[columns[0]]) == (100 if i < len(paths) - 1 else len(frame) - 100 * i)
+            for column in columns:
+                rows[column] += part[column]
+
+        for column in frame:
+            if frame[column].dtype.name == "category":
+                assert rows[column] == frame[column].astype(str).tolist()
+            else:
+                np.testing.assert_array_equal(rows[column], frame[column].to_numpy())
+        if table == "slices" and name == "RoundRobin":
+            assert np.isnan(rows["Quantum Used"]).all()
+        assert len(read_log(str(tmp_path), table, name)) == len(frame)
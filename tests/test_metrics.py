@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from scheduler.metrics import QuantileSketch, RunMetrics
+
+QUANTILES = [0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1]
+
+
+def samples(seed, size=20000):
+    # heavy-tailed, spread over several orders of magnitude, with plenty of zeros
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(mean=1, sigma=2, size=size)
+    values[rng.random(size) < 0.2] = 0.0
+    return values
+
+
+@pytest.mark.parametrize("alpha", [0.01, 0.05])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_quantiles_within_relative_accuracy(alpha, seed):
+    values = samples(seed)
+    sketch = QuantileSketch(alpha)
+    sketch.add_many(values)
+    # the sketch answers with the value at rank q * (n - 1), rounded down
+    expected = np.percentile(values, [q * 100 for q in QUANTILES], method="lower")
+    for estimate, exact in zip(sketch.quantiles(QUANTILES), expected):
+        assert abs(estimate - exact) <= alpha * exact + 1e-12
+    assert sketch.mean == pytest.approx(values.mean())
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+
+
+def test_collapsing_keeps_the_high_quantiles():
+    values = samples(2)
+    sketch = QuantileSketch(0.01, max_bins=200)
+    sketch.add_many(values)
+    assert len(sketch.bins) <= 200
+    for q in [0.9, 0.99, 1]:
+        exact = np.percentile(values, q * 100, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+
+
+def test_merged_sketches_equal_one_sketch_over_all_the_data():
+    values = samples(3)
+    whole = QuantileSketch()
+    whole.add_many(values)
+    merged = QuantileSketch()
+    for part in np.array_split(values, 7):
+        sketch = QuantileSketch()
+        for value in part[:10]:
+            sketch.add(value)
+        sketch.add_many(part[10:])
+        merged.merge(sketch)
+    assert merged.bins == whole.bins
+    assert (merged.zeros, merged.count, merged.min, merged.max) == (whole.zeros, whole.count, whole.min, whole.max)
+    assert merged.quantiles(QUANTILES) == whole.quantiles(QUANTILES)
+    assert merged.mean == pytest.approx(whole.mean)
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(0.05))
+
+
+def test_run_metrics_merge_equals_one_run():
+    rng = np.random.default_rng(4)
+    arrivals = np.sort(rng.uniform(0, 5000, 10000))
+    bursts = rng.exponential(3, 10000)
+    completions = arrivals + bursts + rng.exponential(10, 10000) * (rng.random(10000) < 0.7)
+
+    whole = RunMetrics(cores=2)
+    for arrival, completion, burst in zip(arrivals, completions, bursts):
+        whole.add_job(arrival, completion, burst)
+        whole.add_slice(completion - burst, completion)
+    merged = RunMetrics(cores=2)
+    for part in np.array_split(np.arange(10000), 3):
+        window = RunMetrics(cores=2)
+        for i in part:
+            window.add_job(arrivals[i], completions[i], bursts[i])
+            window.add_slice(completions[i] - bursts[i], completions[i])
+        merged.merge(window)
+
+    expected, actual = whole.summary(), merged.summary()
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value, rel=1e-9), name
+    assert merged.waiting.bins == whole.waiting.bins
+    # the summary's waiting quantiles are within the sketch's 1% of the exact ones
+    waiting = completions - arrivals - bursts
+    for q in [0.5, 0.95, 0.99]:
+        exact = np.percentile(waiting, q * 100, method="lower")
+        assert abs(actual[f"p{round(q * 100)}_waiting"] - exact) <= 0.01 * exact + 1e-12
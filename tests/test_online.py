@@ -0,0 +1,50 @@
+import json
+import numpy as np
+from online import TraceTail, _complete_length, jsonable
+
+HEADER = "time,instance_events_type,collection_id,priority,event,machine_id,cpu_usage_distribution\n"
+
+
+def row(time, collection_id, event="SCHEDULE", usage="[0.02 0.01 0.03]"):
+    # usage with more than a few values is quoted and wrapped, as in the Borg CSV
+    return f'{time},1,{collection_id},0,{event},7,{usage}\n'
+
+
+ROWS = [
+    row(2_000_000_000, 1),
+    row(1_000_000_000, 2, usage='"[0.01 0.02 0.03\n 0.04]"'),
+    row(3_000_000_000, 3, event="SUBMIT"),
+    row(4_000_000_000, 4, usage='"[0.05\n 0.06\n 0.07]"'),
+]
+
+
+def test_complete_length_stops_at_the_last_whole_row():
+    data = (HEADER + "".join(ROWS)).encode()
+    ends = np.cumsum([len(line.encode()) for line in [HEADER] + ROWS])
+    for size in range(len(data) + 1):
+        whole = ends[ends <= size]
+        assert _complete_length(data[:size]) == (whole[-1] if len(whole) else 0)
+
+
+def test_skip_starts_after_the_rows_already_written(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text(HEADER + "".join(ROWS[:2]) + ROWS[3][:30])
+    tail = TraceTail(str(path)).skip()
+    assert tail.columns is not None
+    assert tail.rows == 0  # nothing parsed
+    assert tail.offset == len((HEADER + "".join(ROWS[:2])).encode())
+
+    with open(path, "a") as f:
+        f.write(ROWS[3][30:] + ROWS[2] + row(5_000_000_000, 5)[:10])
+    records = tail.poll()
+    assert [record[:3] for record in records] == [(4.0, 4, 0)]
+    assert tail.rows == 2
+
+    with open(path, "a") as f:
+        f.write(row(5_000_000_000, 5)[10:])
+    assert [record[:3] for record in tail.poll()] == [(5.0, 5, 0)]
+
+
+def test_jsonable():
+    value = {"mean": np.float64(2.5), "p99": float("nan"), "cores": (np.int64(1), float("inf"))}
+    assert json.loads(json.dumps(jsonable(value))) == {"mean": 2.5, "p99": None, "cores": [1, None]}
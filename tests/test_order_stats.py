@@ -0,0 +1,99 @@
+import random
+import numpy as np
+import pytest
+from scheduler.order_stats import OrderStatistics, PercentileHeaps, RunningSum, TrackedQueue, make_order_statistics
+
+
+def random_history(seed, steps=3000, distinct=None):
+    # yields the values held after each random add or remove; distinct caps the
+    # number of different values, to get plenty of duplicates
+    rng = random.Random(seed)
+    held = []
+    for _ in range(steps):
+        if held and rng.random() < 0.45:
+            yield "remove", held.pop(rng.randrange(len(held))), held
+        else:
+            value = rng.randrange(distinct) / 4 if distinct else rng.expovariate(0.1)
+            held.append(value)
+            yield "add", value, held
+
+
+@pytest.mark.parametrize("distinct", [None, 5])
+def test_skip_list_matches_numpy(distinct):
+    stats = OrderStatistics()
+    for step, (op, value, held) in enumerate(random_history(1, distinct=distinct)):
+        getattr(stats, op)(value)
+        assert len(stats) == len(held)
+        if not held or step % 7:
+            continue
+        ordered = sorted(held)
+        k = step % len(held)
+        assert stats.select(k) == ordered[k]
+        assert stats.prefix_sum(k) == pytest.approx(sum(ordered[:k]))
+        assert stats.median() == np.median(held)
+        assert stats.percentile(90) == pytest.approx(np.percentile(held, 90))
+        assert stats.mean() == pytest.approx(np.mean(held))
+    assert list(stats) == sorted(held)
+
+
+@pytest.mark.parametrize("p", [50, 0, 25, 90, 99.5, 100])
+@pytest.mark.parametrize("distinct", [None, 5])
+def test_heaps_match_numpy_and_skip_list(p, distinct):
+    heaps = PercentileHeaps(p)
+    stats = OrderStatistics()
+    for op, value, held in random_history(2, distinct=distinct):
+        getattr(heaps, op)(value)
+        getattr(stats, op)(value)
+        assert len(heaps) == len(held)
+        if not held:
+            continue
+        # bit for bit what the skip list gives, so AdaptiveRR's quanta do not change
+        assert heaps.percentile(p) == stats.percentile(p)
+        assert heaps.percentile(p) == pytest.approx(np.percentile(held, p))
+        if p == 50:
+            assert heaps.median() == stats.median() == np.median(held)
+    # lazily removed values are dropped, not kept forever
+    assert len(heaps._low) + len(heaps._high) <= 2 * len(held) + 64
+
+
+def test_running_sum_mean():
+    total = RunningSum()
+    for op, value, held in random_history(3):
+        getattr(total, op)(value)
+        if held:
+            assert total.mean() == pytest.approx(np.mean(held))
+    with pytest.raises(ValueError):
+        RunningSum().mean()
+
+
+def test_empty_and_out_of_range():
+    with pytest.raises(ValueError):
+        PercentileHeaps(101)
+    with pytest.raises(ValueError):
+        PercentileHeaps(50).median()
+    with pytest.raises(ValueError):
+        PercentileHeaps(90).percentile(50)
+    with pytest.raises(IndexError):
+        OrderStatistics().select(0)
+    with pytest.raises(KeyError):
+        OrderStatistics().remove(1.0)
+
+
+@pytest.mark.parametrize("name, param, kind", [
+    ("median", None, PercentileHeaps), ("percentile", 95, PercentileHeaps), ("mean", None, RunningSum),
+    ("trimmed_mean", 0.2, OrderStatistics),
+])
+def test_tracked_queue_keeps_its_statistic(name, param, kind):
+    queue = TrackedQueue(stats=make_order_statistics(name, param))
+    assert isinstance(queue.stats, kind)
+    rng = random.Random(4)
+    for job_id in range(500):
+        queue.append([job_id, rng.expovariate(0.2)])
+        if rng.random() < 0.3:
+            queue.popleft()
+    values = [job[1] for job in queue]
+    reference = OrderStatistics()
+    for value in values:
+        reference.add(value)
+    args = () if param is None else (param,)
+    assert getattr(queue.stats, name)(*args) == pytest.approx(getattr(reference, name)(*args))
@@ -0,0 +1,28 @@
+import pytest
+from simulation import simulate
+from workload import generate_workload
+
+
+def slices(scheduler):
+    frame = scheduler.execution_log.to_dataframe()
+    return list(zip(frame["Job"].astype(str), frame["Start"], frame["Finish"]))
+
+
+def test_same_instant_arrival_preempts():
+    # Job-1 is picked the moment it arrives; Job-2, shorter, arrives at the same instant
+    workload = [(0.0, 1, 0, 10.0), (0.0, 2, 0, 1.0), (5.0, 3, 0, 2.0), (5.0, 4, 0, 0.5)]
+    scheduler, _ = simulate("PreemptiveSJF", workload, batch_size=None, verbose=False)
+    assert slices(scheduler) == [("Job-2", 0.0, 1.0), ("Job-1", 1.0, 5.0), ("Job-4", 5.0, 5.5),
+                                 ("Job-3", 5.5, 7.5), ("Job-1", 7.5, 13.5)]
+
+
+@pytest.mark.parametrize("name", ["PreemptiveSJF", "MLFQ"])
+@pytest.mark.parametrize("cores", [1, 3])
+def test_no_zero_length_slices(name, cores):
+    # integer arrival times, so many jobs arrive together
+    workload = [(float(int(t)), job_id, priority, burst)
+                for t, job_id, priority, burst in generate_workload(2000, arrival_rate=2, seed=7)]
+    scheduler, _ = simulate(name, workload, cores=cores, batch_size=None, verbose=False)
+    assert all(end > start for _, start, end in slices(scheduler))
+    assert scheduler.metrics.summary()["slices"] == scheduler.execution_log.slices
+    assert scheduler.completed_jobs.rows == len(workload)
@@ -0,0 +1,80 @@
+import pytest
+import simpy
+from simulation import simulate, process_generator
+from scheduler.mlfq import MLFQScheduler
+from scheduler.multicore import MultiCoreCPU
+
+# Hand-worked schedules for MLFQ and CFS, which only the simpy engine runs.
+# Priorities by Borg band: 200 production, 117 mid, 0 free.  With time_quantum=2
+# MLFQ's levels have quanta 2, 4, 8, 16, ...; production starts on level 0, free on 3.
+# CFS weighs production 3121, mid 1024 and free 15, over a 6-unit latency period.
+
+
+def slices(scheduler, quantum=False):
+    frame = scheduler.execution_log.to_dataframe()
+    columns = ["Job", "Start", "Finish"] + (["Quantum Used"] if quantum else [])
+    return [(str(row[0]),) + tuple(float(value) for value in row[1:]) for row in frame[columns].itertuples(index=False)]
+
+
+def test_mlfq_demotes_after_a_full_quantum():
+    scheduler, _ = simulate("MLFQ", [(0.0, 1, 200, 7.0)], time_quantum=2, batch_size=None, verbose=False)
+    assert slices(scheduler, quantum=True) == [("Job-1", 0, 2, 2), ("Job-1", 2, 6, 4), ("Job-1", 6, 7, 8)]
+
+
+def test_mlfq_runs_higher_levels_first():
+    # Job-2 starts on level 3, below Job-1 even after Job-1 is demoted once
+    workload = [(0.0, 1, 200, 5.0), (0.0, 2, 0, 3.0)]
+    scheduler, _ = simulate("MLFQ", workload, time_quantum=2, batch_size=None, verbose=False)
+    assert slices(scheduler) == [("Job-1", 0, 2), ("Job-1", 2, 5), ("Job-2", 5, 8)]
+
+
+def test_mlfq_arrival_on_a_higher_level_preempts():
+    # Job-1 keeps the 3 units it used of its level's 16 when it is preempted
+    workload = [(0.0, 1, 0, 10.0), (3.0, 2, 200, 1.0)]
+    scheduler, _ = simulate("MLFQ", workload, time_quantum=2, batch_size=None, verbose=False)
+    assert slices(scheduler, quantum=True) == [("Job-1", 0, 3, 16), ("Job-2", 3, 4, 2), ("Job-1", 4, 11, 16)]
+
+
+@pytest.mark.parametrize("start", [0.0, 1000.0])
+def test_mlfq_boost_returns_jobs_to_the_top_level(start):
+    # boosts every 10 units from the first arrival, wherever the run starts
+    env = simpy.Environment()
+    cpu = MultiCoreCPU(env)
+    scheduler = MLFQScheduler(env, cpu, base_quantum=2, boost_interval=10, verbose=False)
+    env.process(process_generator(env, cpu, scheduler, "MLFQ", [(0.0, 1, 200, 30.0)], start, verbose=False))
+    env.run()
+    expected = [(0, 2, 2), (2, 6, 4), (6, 14, 8), (14, 16, 2), (16, 20, 4), (20, 28, 8), (28, 30, 2)]
+    assert slices(scheduler, quantum=True) == [("Job-1", start + s, start + f, q) for s, f, q in expected]
+
+
+def test_cfs_runs_the_smallest_vruntime_first():
+    # equal weights: Job-2 (vruntime 0) catches up with Job-1 (6), then they take
+    # turns, half the latency period each, the earlier one first on a tie
+    workload = [(0.0, 1, 117, 10.0), (0.0, 2, 117, 10.0)]
+    scheduler, _ = simulate("CFS", workload, batch_size=None, verbose=False)
+    assert slices(scheduler) == [("Job-1", 0, 6), ("Job-2", 6, 9), ("Job-2", 9, 12), ("Job-1", 12, 15),
+                                 ("Job-2", 15, 18), ("Job-1", 18, 19), ("Job-2", 19, 20)]
+
+
+def test_cfs_heavier_jobs_age_slower():
+    # the free job's 0.75-unit minimum slice puts it 51.2 units of vruntime ahead,
+    # more than the production job gathers in its whole burst
+    workload = [(0.0, 1, 200, 20.0), (0.0, 2, 0, 20.0)]
+    scheduler, _ = simulate("CFS", workload, batch_size=None, verbose=False)
+    runs = slices(scheduler)
+    assert runs[:2] == [("Job-1", 0, 6), ("Job-2", 6, 6.75)]
+    assert [job for job, _, _ in runs[2:5]] == ["Job-1"] * 3
+    assert runs[2][2] - runs[2][1] == pytest.approx(6 * 3121 / (3121 + 15))
+    assert runs[4][2] == pytest.approx(20.75)
+    assert runs[5:] == [("Job-2", 20.75, 26.75), ("Job-2", 26.75, 32.75), ("Job-2", 32.75, 38.75),
+                        ("Job-2", 38.75, 40)]
+
+
+def test_cfs_new_job_starts_at_min_vruntime():
+    # Job-2 starts at vruntime 18, not 0, so it shares the core with Job-1 instead
+    # of running its whole burst first
+    workload = [(0.0, 1, 117, 30.0), (20.0, 2, 117, 12.0)]
+    scheduler, _ = simulate("CFS", workload, batch_size=None, verbose=False)
+    assert slices(scheduler) == [("Job-1", 0, 6), ("Job-1", 6, 12), ("Job-1", 12, 18), ("Job-1", 18, 24),
+                                 ("Job-2", 24, 27), ("Job-2", 27, 30), ("Job-1", 30, 33), ("Job-2", 33, 36),
+                                 ("Job-1", 36, 39), ("Job-2", 39, 42)]
@@ -0,0 +1,17 @@
+import pytest
+from replay import replay
+from workload import generate_workload
+
+
+@pytest.mark.parametrize("name", ["RoundRobin", "MLFQ"])
+def test_parallel_replay_matches_sequential(name):
+    # windows run from time 0 in the workers and are chained afterwards, which is
+    # only the same timeline if a window's schedule does not depend on its start
+    # (MLFQ's priority boosts included)
+    workload = generate_workload(600, arrival_rate=1, seed=5)
+    sequential = list(replay(name, workload, window_jobs=150))
+    parallel = list(replay(name, workload, window_jobs=150, processes=2))
+    assert len(sequential) == len(parallel) == 4
+    for one, other in zip(sequential, parallel):
+        for field in ["jobs", "start_time", "end_time", "makespan", "avg_waiting", "max_waiting", "slices"]:
+            assert other[field] == pytest.approx(one[field], rel=1e-9, abs=1e-9)
@@ -0,0 +1,88 @@
+import json
+import asyncio
+import pytest
+from simulation import simulate
+from service import RequestError, SimulationService, parse_request
+
+
+@pytest.mark.parametrize("body", [
+    {"synthetic": {"jobs": 10, "seed": "x"}},
+    {"synthetic": {"jobs": True}},
+    {"synthetic": [1, 2]},
+    {"trace": [1, 2]},
+    {"trace": {"start_time": "600"}},
+    {"params": {"cores": "4"}},
+    {"params": {"cores": -1}},
+    {"params": {"time_quantum": [3]}},
+    {"params": {"time_quantum": 0}},
+    {"params": {"min_quantum": 0}},
+    {"params": {"initial_time_quantum": -2}},
+    {"params": {"rebalance_interval": 0}},
+    {"params": {"cores": 0}},
+    {"params": {"sample_every": 0}},
+    {"params": {"smoothing": 1}},
+    {"params": {"smoothing": -0.1}},
+    {"params": {"engine": "gpu"}},
+    {"stream": "no"},
+])
+def test_parse_request_rejects_wrong_types(body):
+    with pytest.raises(RequestError) as error:
+        parse_request(json.dumps(body).encode())
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize("name, params", [
+    ("RoundRobin", {"time_quantum": 0}),
+    ("AdaptiveRR", {"min_quantum": 0}),
+    ("AdaptiveRR", {"smoothing": 1}),
+    ("MLFQ", {"time_quantum": -1}),
+])
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+def test_simulate_rejects_a_quantum_that_never_finishes(name, params, engine):
+    if engine == "fast" and name == "MLFQ":
+        pytest.skip("MLFQ runs on the SimPy engine only")
+    with pytest.raises(ValueError):
+        simulate(name, [(1.0, 1, 0, 5.0)], batch_size=None, verbose=False, engine=engine, **params)
+
+
+def test_parse_request_accepts_valid_body():
+    body = {"scheduler": "CFS", "params": {"cores": 4, "time_quantum": 2.5, "balancing": None, "batch_size": None},
+            "synthetic": {"jobs": 100, "seed": 7}}
+    assert parse_request(json.dumps(body).encode()) == ("CFS", body["params"], ("synthetic", 100, 7))
+
+
+async def _exchange(port, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"POST /simulate HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(payload)
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = SimulationService(processes=1)
+    yield service
+    service.close()
+
+
+def test_bad_bodies_get_an_http_answer(service, monkeypatch):
+    def broken_submit(*args):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            answers = [await _exchange(port, body) for body in
+                       [b'{"synthetic": {"jobs": 10, "seed": "x"}}', b'{"trace": [1, 2]}', b"[1, 2]"]]
+            monkeypatch.setattr(service, "submit", broken_submit)
+            answers.append(await _exchange(port, b'{"synthetic": {"jobs": 10}}'))
+        return answers
+
+    answers = asyncio.run(scenario())
+    assert [status for status, _ in answers] == [400, 400, 400, 500]
+    assert all("error" in payload for _, payload in answers)
+    assert "boom" in answers[-1][1]["error"]
@@ -0,0 +1,31 @@
+import numpy as np
+from simulation import simulate
+from sweep import RecordView, build_grid, run_sweep
+from trace_stream import RECORD_DTYPE
+from workload import generate_workload
+
+
+def test_record_view_reads_the_array_in_place():
+    workload = generate_workload(1000, seed=3)
+    records = np.array(workload, dtype=RECORD_DTYPE)
+    view = RecordView(records, block_rows=64)
+    assert list(view) == workload
+    assert list(view[:100]) == workload[:100]
+    assert view[5] == workload[5]
+    assert np.asarray(view) is records
+
+
+def test_sweep_matches_direct_runs():
+    workload = generate_workload(400, arrival_rate=1, seed=5)
+    configs = build_grid(["FCFS", "RoundRobin", "CFS"], quanta=[2], batch_sizes=[0, 150], cores=[2],
+                         engines=["simpy", "fast"])
+    results = run_sweep(configs, workload, processes=2)
+    assert len(results) == len(configs)
+    for row in results.to_dict("records"):
+        params = {"time_quantum": row["quantum"]} if row["scheduler"] == "RoundRobin" else {}
+        scheduler, _ = simulate(row["scheduler"], workload, engine=row["engine"], cores=row["cores"],
+                                batch_size=row["batch_size"] or None, verbose=False, **params)
+        summary = scheduler.metrics.summary()
+        assert row["jobs"] == summary["jobs"]
+        assert row["avg_waiting"] == summary["avg_waiting"]
+        assert row["makespan"] == summary["makespan"]
@@ -0,0 +1,38 @@
+from simulation import load_kaggle_trace, simulate
+
+ROWS = [
+    (3_000_000_000, 11, 0, "SCHEDULE", "[0.01 0.02]"),
+    (1_000_000_000, 12, 100, "SCHEDULE", '"[0.05 0.01\n 0.03]"'),
+    (2_000_000_000, 13, 0, "SUBMIT", "[0.02]"),
+    (2_000_000_000, 14, 25, "SCHEDULE", "[]"),
+    (5_000_000_000, 15, 0, "SCHEDULE", "[0.04]"),
+]
+
+
+def write_trace(path):
+    with open(path, "w") as f:
+        f.write("time,collection_id,priority,event,machine_id,cpu_usage_distribution\n")
+        for time, job_id, priority, event, usage in ROWS:
+            f.write(f"{time},{job_id},{priority},{event},1,{usage}\n")
+    return str(path)
+
+
+def test_streamed_trace_matches_cached_load(tmp_path):
+    trace = write_trace(tmp_path / "trace.csv")
+    cached = load_kaggle_trace("RoundRobin", trace, cache_dir=str(tmp_path / "cache"))
+    streamed = load_kaggle_trace("RoundRobin", trace, stream=True)
+    assert not isinstance(streamed, list)
+    assert list(streamed) == cached
+    assert [record[1] for record in cached] == [12, 14, 11, 15]
+    assert list(load_kaggle_trace("RoundRobin", trace, start_time=2, end_time=5, stream=True)) == cached[1:3]
+
+
+def test_simulate_takes_a_stream(tmp_path):
+    trace = write_trace(tmp_path / "trace.csv")
+    cached = load_kaggle_trace("SJF", trace, cache_dir=str(tmp_path / "cache"))
+    for engine in ("simpy", "fast"):
+        expected, _ = simulate("SJF", cached, engine=engine, batch_size=3, verbose=False)
+        actual, _ = simulate("SJF", load_kaggle_trace("SJF", trace, stream=True), engine=engine, batch_size=3,
+                             verbose=False)
+        assert actual.completed_jobs.rows == 3
+        assert actual.metrics.summary() == expected.metrics.summary()